@@ -0,0 +1,5 @@
+"""
+Dataflow pipelines package.
+
+Contains the Apache Beam pipelines and their shared utilities.
+"""
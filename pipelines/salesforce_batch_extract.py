@@ -5,7 +5,7 @@ This Apache Beam pipeline extracts data from Salesforce REST API,
 writes to Cloud Storage in Parquet format, and loads into BigQuery.
 
 Usage:
-    python pipelines/salesforce_batch_extract.py \
+    python -m pipelines.salesforce_batch_extract \
         --config=config/salesforce_config.yaml \
         --runner=DataflowRunner \
         --project=<project-id> \
@@ -14,17 +14,26 @@ Usage:
 """
 
 import argparse
-import json
 import logging
 from collections.abc import Iterator
 from datetime import datetime, timezone
-from typing import Any
+from typing import Any, Union
+from urllib.parse import urljoin
 
 import apache_beam as beam
 import requests
 import yaml
 from apache_beam.io.gcp.bigquery import BigQueryDisposition, WriteToBigQuery
 from apache_beam.options.pipeline_options import PipelineOptions, SetupOptions
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from pipelines.utils import json_codec
+
+try:
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:  # pragma: no cover - depends on libyaml being available
+    from yaml import SafeLoader
 
 
 class SalesforceAPIConfig:
@@ -33,7 +42,7 @@ class SalesforceAPIConfig:
     def __init__(self, config_path: str):
         """Initialize configuration from YAML file."""
         with open(config_path) as f:
-            self.config = yaml.safe_load(f)
+            self.config = yaml.load(f, Loader=SafeLoader)
 
         self.api_config = self.config['api']
         self.objects = self.config['objects']
@@ -52,8 +61,20 @@ class ExtractSalesforceObject(beam.DoFn):
         self.session = None
 
     def setup(self):
-        """Set up HTTP session for API calls."""
+        """Set up HTTP session with retry strategy for API calls."""
         self.session = requests.Session()
+
+        # Retry transient failures with backoff instead of failing the bundle
+        retry_strategy = Retry(
+            total=self.api_config.get('max_retries', 3),
+            backoff_factor=0.5,
+            status_forcelist=[429, 500, 502, 503, 504]
+        )
+
+        adapter = HTTPAdapter(max_retries=retry_strategy)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
         self.session.headers.update({
             'Content-Type': 'application/json',
             'Accept': 'application/json'
@@ -78,24 +99,38 @@ class ExtractSalesforceObject(beam.DoFn):
         logging.info(f"Extracting {object_name} from {url}")
 
         try:
-            response = self.session.get(
-                url,
-                timeout=self.api_config['timeout_seconds']
-            )
-            response.raise_for_status()
-
-            data = response.json()
-            records = data.get('records', [])
-
-            logging.info(f"Extracted {len(records)} {object_name} records")
-
-            # Add metadata to each record
             ingestion_timestamp = datetime.now(timezone.utc).isoformat()
-            for record in records:
-                record['ingestion_timestamp'] = ingestion_timestamp
-                record['source'] = 'salesforce_api'
-                record['object_type'] = object_name
-                yield record
+            record_count = 0
+
+            # Follow nextRecordsUrl until the query result is exhausted
+            while url:
+                # Stream so error statuses fail before the body is downloaded
+                with self.session.get(
+                    url,
+                    timeout=self.api_config['timeout_seconds'],
+                    stream=True
+                ) as response:
+                    response.raise_for_status()
+
+                    # Parse the raw body directly; requests has already undone
+                    # the gzip transfer encoding it negotiates by default
+                    data = json_codec.loads(response.content)
+
+                next_records_url = data.get('nextRecordsUrl')
+
+                # Add metadata to each record in place and yield it. Popping
+                # the list means the page's records are freed after the loop
+                # instead of living on while the next page is fetched.
+                for record in data.pop('records', ()):
+                    record['ingestion_timestamp'] = ingestion_timestamp
+                    record['source'] = 'salesforce_api'
+                    record['object_type'] = object_name
+                    record_count += 1
+                    yield record
+
+                url = urljoin(url, next_records_url) if next_records_url else None
+
+            logging.info(f"Extracted {record_count} {object_name} records")
 
         except requests.exceptions.RequestException as e:
             logging.error(f"Failed to extract {object_name}: {str(e)}")
@@ -110,50 +145,150 @@ class ExtractSalesforceObject(beam.DoFn):
 class ValidateRecord(beam.DoFn):
     """DoFn to validate record data quality."""
 
-    def __init__(self, object_config: dict[str, Any], validation_rules: dict[str, Any]):
+    TIMESTAMP_FIELDS = ('created_date', 'last_modified_date', 'system_modstamp')
+
+    # Set per bundle; falls back to the current time outside a bundle
+    _validation_timestamp = None
+
+    def __init__(
+        self,
+        object_config: dict[str, Any],
+        validation_rules: Union[dict[str, Any], list[dict[str, Any]]]
+    ):
         """Initialize with object configuration and validation rules."""
         self.object_config = object_config
         self.validation_rules = validation_rules
         self.primary_key = object_config['primary_key']
 
-    def process(self, record: dict[str, Any]) -> Iterator[dict[str, Any]]:
+        # Resolve enabled checks once instead of per record
+        rules = self._merge_rules(validation_rules)
+        self._validators = []
+        if rules.get('check_null_primary_keys', False):
+            self._validators.append(self._check_primary_key)
+        if rules.get('validate_timestamps', False):
+            self._validators.append(self._check_timestamps)
+
+    def start_bundle(self):
+        """Capture one validation timestamp for all records in the bundle."""
+        self._validation_timestamp = datetime.now(timezone.utc).isoformat()
+
+    @staticmethod
+    def _merge_rules(
+        validation_rules: Union[dict[str, Any], list[dict[str, Any]], None]
+    ) -> dict[str, Any]:
         """
-        Validate record and tag with validation results.
+        Merge validation rules into a single mapping.
+
+        The YAML configuration lists rules as single-key mappings.
+
+        Args:
+            validation_rules: Rules as a mapping or a list of mappings
+
+        Returns:
+            Mapping of rule name to setting
+        """
+        if isinstance(validation_rules, dict):
+            return validation_rules
+
+        merged = {}
+        for rule in validation_rules or []:
+            merged.update(rule)
+        return merged
+
+    def _check_primary_key(self, record: dict[str, Any]) -> list[str]:
+        """Check the primary key is present."""
+        if not record.get(self.primary_key):
+            return [f"Null primary key: {self.primary_key}"]
+        return []
+
+    def _check_timestamps(self, record: dict[str, Any]) -> list[str]:
+        """Check timestamp fields are ISO 8601 formatted."""
+        errors = []
+        for field in self.TIMESTAMP_FIELDS:
+            value = record.get(field)
+            if value:
+                try:
+                    datetime.fromisoformat(value.replace('Z', '+00:00'))
+                except (ValueError, AttributeError):
+                    errors.append(f"Invalid timestamp format: {field}")
+        return errors
+
+    def validate(self, record: dict[str, Any]) -> dict[str, Any]:
+        """
+        Validate record and add validation metadata in place.
 
         Args:
             record: Data record to validate
 
-        Yields:
+        Returns:
             Record with validation metadata
         """
         validation_errors = []
-
-        # Check null primary keys
-        if self.validation_rules.get('check_null_primary_keys', False):
-            if not record.get(self.primary_key):
-                validation_errors.append(f"Null primary key: {self.primary_key}")
-
-        # Validate timestamps
-        if self.validation_rules.get('validate_timestamps', False):
-            timestamp_fields = ['created_date', 'last_modified_date', 'system_modstamp']
-            for field in timestamp_fields:
-                if field in record and record[field]:
-                    try:
-                        datetime.fromisoformat(record[field].replace('Z', '+00:00'))
-                    except (ValueError, AttributeError):
-                        validation_errors.append(f"Invalid timestamp format: {field}")
+        for validator in self._validators:
+            validation_errors.extend(validator(record))
 
         # Add validation metadata
         record['_validation_errors'] = validation_errors
         record['_is_valid'] = len(validation_errors) == 0
-        record['_validation_timestamp'] = datetime.now(timezone.utc).isoformat()
+        record['_validation_timestamp'] = (
+            self._validation_timestamp or datetime.now(timezone.utc).isoformat()
+        )
+
+        return record
+
+    def process(self, record: dict[str, Any]) -> Iterator[dict[str, Any]]:
+        """
+        Validate record and tag with validation results.
+
+        Args:
+            record: Data record to validate
 
-        yield record
+        Yields:
+            Record with validation metadata
+        """
+        yield self.validate(record)
 
 
 class FormatForBigQuery(beam.DoFn):
     """DoFn to format records for BigQuery insertion."""
 
+    @staticmethod
+    def format_record(record: dict[str, Any]) -> dict[str, Any]:
+        """
+        Format record for BigQuery schema compatibility.
+
+        Args:
+            record: Data record
+
+        Returns:
+            Formatted record
+        """
+        # Convert nested dictionaries and lists to JSON strings for BigQuery
+        return {
+            key: json_codec.dumps(value) if isinstance(value, (dict, list)) else value
+            for key, value in record.items()
+        }
+
+    @staticmethod
+    def format_record_in_place(record: dict[str, Any]) -> dict[str, Any]:
+        """
+        Format record for BigQuery schema compatibility without copying it.
+
+        Only for records the caller owns, e.g. ones it has already modified.
+
+        Args:
+            record: Data record
+
+        Returns:
+            The same record with nested values JSON-encoded
+        """
+        # Replacing values of existing keys is safe while iterating
+        for key, value in record.items():
+            if isinstance(value, (dict, list)):
+                record[key] = json_codec.dumps(value)
+
+        return record
+
     def process(self, record: dict[str, Any]) -> Iterator[dict[str, Any]]:
         """
         Format record for BigQuery schema compatibility.
@@ -164,97 +299,150 @@ class FormatForBigQuery(beam.DoFn):
         Yields:
             Formatted record
         """
-        # Convert nested dictionaries to JSON strings for BigQuery
-        formatted_record = {}
-        for key, value in record.items():
-            if isinstance(value, dict):
-                formatted_record[key] = json.dumps(value)
-            elif isinstance(value, list):
-                formatted_record[key] = json.dumps(value)
-            else:
-                formatted_record[key] = value
+        yield self.format_record(record)
 
-        yield formatted_record
+
+class ValidateAndFormatRecord(ValidateRecord):
+    """DoFn that validates and formats a record for BigQuery in one step."""
+
+    def process(self, record: dict[str, Any]) -> Iterator[dict[str, Any]]:
+        """
+        Validate record and format it for BigQuery.
+
+        Args:
+            record: Data record to validate
+
+        Yields:
+            Formatted record with validation metadata
+        """
+        # validate() already modifies the record in place, so format it in
+        # place too instead of copying it
+        yield FormatForBigQuery.format_record_in_place(self.validate(record))
+
+
+# Common fields for all objects
+_BASE_SCHEMA_FIELDS = [
+    {'name': 'id', 'type': 'STRING', 'mode': 'REQUIRED'},
+    {'name': 'created_date', 'type': 'TIMESTAMP', 'mode': 'NULLABLE'},
+    {'name': 'last_modified_date', 'type': 'TIMESTAMP', 'mode': 'NULLABLE'},
+    {'name': 'system_modstamp', 'type': 'TIMESTAMP', 'mode': 'NULLABLE'},
+    {'name': 'ingestion_timestamp', 'type': 'TIMESTAMP', 'mode': 'REQUIRED'},
+    {'name': 'source', 'type': 'STRING', 'mode': 'REQUIRED'},
+    {'name': 'object_type', 'type': 'STRING', 'mode': 'REQUIRED'},
+    {'name': '_is_valid', 'type': 'BOOLEAN', 'mode': 'REQUIRED'},
+    {'name': '_validation_errors', 'type': 'STRING', 'mode': 'REPEATED'},
+    {'name': '_validation_timestamp', 'type': 'TIMESTAMP', 'mode': 'REQUIRED'},
+]
+
+# Object-specific fields
+_OBJECT_SCHEMA_FIELDS = {
+    'Account': [
+        {'name': 'name', 'type': 'STRING', 'mode': 'NULLABLE'},
+        {'name': 'type', 'type': 'STRING', 'mode': 'NULLABLE'},
+        {'name': 'industry', 'type': 'STRING', 'mode': 'NULLABLE'},
+        {'name': 'annual_revenue', 'type': 'INTEGER', 'mode': 'NULLABLE'},
+        {'name': 'phone', 'type': 'STRING', 'mode': 'NULLABLE'},
+        {'name': 'website', 'type': 'STRING', 'mode': 'NULLABLE'},
+        {'name': 'billing_address', 'type': 'STRING', 'mode': 'NULLABLE'},
+        {'name': 'shipping_address', 'type': 'STRING', 'mode': 'NULLABLE'},
+    ],
+    'Contact': [
+        {'name': 'account_id', 'type': 'STRING', 'mode': 'NULLABLE'},
+        {'name': 'first_name', 'type': 'STRING', 'mode': 'NULLABLE'},
+        {'name': 'last_name', 'type': 'STRING', 'mode': 'NULLABLE'},
+        {'name': 'email', 'type': 'STRING', 'mode': 'NULLABLE'},
+        {'name': 'phone', 'type': 'STRING', 'mode': 'NULLABLE'},
+        {'name': 'title', 'type': 'STRING', 'mode': 'NULLABLE'},
+        {'name': 'lead_source', 'type': 'STRING', 'mode': 'NULLABLE'},
+    ],
+    'Opportunity': [
+        {'name': 'account_id', 'type': 'STRING', 'mode': 'NULLABLE'},
+        {'name': 'name', 'type': 'STRING', 'mode': 'NULLABLE'},
+        {'name': 'stage_name', 'type': 'STRING', 'mode': 'NULLABLE'},
+        {'name': 'type', 'type': 'STRING', 'mode': 'NULLABLE'},
+        {'name': 'lead_source', 'type': 'STRING', 'mode': 'NULLABLE'},
+        {'name': 'amount', 'type': 'INTEGER', 'mode': 'NULLABLE'},
+        {'name': 'probability', 'type': 'INTEGER', 'mode': 'NULLABLE'},
+        {'name': 'close_date', 'type': 'DATE', 'mode': 'NULLABLE'},
+        {'name': 'is_won', 'type': 'BOOLEAN', 'mode': 'NULLABLE'},
+        {'name': 'is_closed', 'type': 'BOOLEAN', 'mode': 'NULLABLE'},
+    ],
+    'Case': [
+        {'name': 'account_id', 'type': 'STRING', 'mode': 'NULLABLE'},
+        {'name': 'contact_id', 'type': 'STRING', 'mode': 'NULLABLE'},
+        {'name': 'subject', 'type': 'STRING', 'mode': 'NULLABLE'},
+        {'name': 'description', 'type': 'STRING', 'mode': 'NULLABLE'},
+        {'name': 'status', 'type': 'STRING', 'mode': 'NULLABLE'},
+        {'name': 'origin', 'type': 'STRING', 'mode': 'NULLABLE'},
+        {'name': 'priority', 'type': 'STRING', 'mode': 'NULLABLE'},
+        {'name': 'is_escalated', 'type': 'BOOLEAN', 'mode': 'NULLABLE'},
+        {'name': 'is_closed', 'type': 'BOOLEAN', 'mode': 'NULLABLE'},
+        {'name': 'closed_date', 'type': 'TIMESTAMP', 'mode': 'NULLABLE'},
+    ],
+}
+
+# Schemas are built once at import time and shared between callers
+_BASE_SCHEMA = {'fields': _BASE_SCHEMA_FIELDS}
+_SCHEMAS = {
+    object_name: {'fields': _BASE_SCHEMA_FIELDS + fields}
+    for object_name, fields in _OBJECT_SCHEMA_FIELDS.items()
+}
+
+
+# Clustering of the raw tables provisioned in infrastructure/salesforce.tf
+_OBJECT_CLUSTERING_FIELDS = {
+    'Account': ['id', 'type'],
+    'Contact': ['id', 'account_id'],
+    'Opportunity': ['id', 'account_id', 'stage_name'],
+    'Case': ['id', 'account_id', 'status'],
+}
+
+
+def _table_parameters(clustering_fields: list[str]) -> dict[str, Any]:
+    """Build the parameters applied when the write creates a raw table."""
+    return {
+        'timePartitioning': {'type': 'DAY', 'field': 'ingestion_timestamp'},
+        'clustering': {'fields': clustering_fields},
+    }
+
+
+# Applied when the write creates a table; matches the raw tables provisioned
+# in infrastructure/salesforce.tf
+_BASE_TABLE_PARAMETERS = _table_parameters(['id'])
+_BQ_TABLE_PARAMETERS = {
+    object_name: _table_parameters(fields)
+    for object_name, fields in _OBJECT_CLUSTERING_FIELDS.items()
+}
 
 
 def get_bigquery_schema(object_name: str) -> dict[str, Any]:
     """
     Get BigQuery schema for a Salesforce object.
 
+    The returned schema is shared and must not be modified.
+
     Args:
         object_name: Name of the Salesforce object
 
     Returns:
         BigQuery schema definition
     """
-    # Common fields for all objects
-    base_schema = {
-        'fields': [
-            {'name': 'id', 'type': 'STRING', 'mode': 'REQUIRED'},
-            {'name': 'created_date', 'type': 'TIMESTAMP', 'mode': 'NULLABLE'},
-            {'name': 'last_modified_date', 'type': 'TIMESTAMP', 'mode': 'NULLABLE'},
-            {'name': 'system_modstamp', 'type': 'TIMESTAMP', 'mode': 'NULLABLE'},
-            {'name': 'ingestion_timestamp', 'type': 'TIMESTAMP', 'mode': 'REQUIRED'},
-            {'name': 'source', 'type': 'STRING', 'mode': 'REQUIRED'},
-            {'name': 'object_type', 'type': 'STRING', 'mode': 'REQUIRED'},
-            {'name': '_is_valid', 'type': 'BOOLEAN', 'mode': 'REQUIRED'},
-            {'name': '_validation_errors', 'type': 'STRING', 'mode': 'REPEATED'},
-            {'name': '_validation_timestamp', 'type': 'TIMESTAMP', 'mode': 'REQUIRED'},
-        ]
-    }
+    return _SCHEMAS.get(object_name, _BASE_SCHEMA)
 
-    # Object-specific fields
-    object_schemas = {
-        'Account': [
-            {'name': 'name', 'type': 'STRING', 'mode': 'NULLABLE'},
-            {'name': 'type', 'type': 'STRING', 'mode': 'NULLABLE'},
-            {'name': 'industry', 'type': 'STRING', 'mode': 'NULLABLE'},
-            {'name': 'annual_revenue', 'type': 'INTEGER', 'mode': 'NULLABLE'},
-            {'name': 'phone', 'type': 'STRING', 'mode': 'NULLABLE'},
-            {'name': 'website', 'type': 'STRING', 'mode': 'NULLABLE'},
-            {'name': 'billing_address', 'type': 'STRING', 'mode': 'NULLABLE'},
-            {'name': 'shipping_address', 'type': 'STRING', 'mode': 'NULLABLE'},
-        ],
-        'Contact': [
-            {'name': 'account_id', 'type': 'STRING', 'mode': 'NULLABLE'},
-            {'name': 'first_name', 'type': 'STRING', 'mode': 'NULLABLE'},
-            {'name': 'last_name', 'type': 'STRING', 'mode': 'NULLABLE'},
-            {'name': 'email', 'type': 'STRING', 'mode': 'NULLABLE'},
-            {'name': 'phone', 'type': 'STRING', 'mode': 'NULLABLE'},
-            {'name': 'title', 'type': 'STRING', 'mode': 'NULLABLE'},
-            {'name': 'lead_source', 'type': 'STRING', 'mode': 'NULLABLE'},
-        ],
-        'Opportunity': [
-            {'name': 'account_id', 'type': 'STRING', 'mode': 'NULLABLE'},
-            {'name': 'name', 'type': 'STRING', 'mode': 'NULLABLE'},
-            {'name': 'stage_name', 'type': 'STRING', 'mode': 'NULLABLE'},
-            {'name': 'type', 'type': 'STRING', 'mode': 'NULLABLE'},
-            {'name': 'lead_source', 'type': 'STRING', 'mode': 'NULLABLE'},
-            {'name': 'amount', 'type': 'INTEGER', 'mode': 'NULLABLE'},
-            {'name': 'probability', 'type': 'INTEGER', 'mode': 'NULLABLE'},
-            {'name': 'close_date', 'type': 'DATE', 'mode': 'NULLABLE'},
-            {'name': 'is_won', 'type': 'BOOLEAN', 'mode': 'NULLABLE'},
-            {'name': 'is_closed', 'type': 'BOOLEAN', 'mode': 'NULLABLE'},
-        ],
-        'Case': [
-            {'name': 'account_id', 'type': 'STRING', 'mode': 'NULLABLE'},
-            {'name': 'contact_id', 'type': 'STRING', 'mode': 'NULLABLE'},
-            {'name': 'subject', 'type': 'STRING', 'mode': 'NULLABLE'},
-            {'name': 'description', 'type': 'STRING', 'mode': 'NULLABLE'},
-            {'name': 'status', 'type': 'STRING', 'mode': 'NULLABLE'},
-            {'name': 'origin', 'type': 'STRING', 'mode': 'NULLABLE'},
-            {'name': 'priority', 'type': 'STRING', 'mode': 'NULLABLE'},
-            {'name': 'is_escalated', 'type': 'BOOLEAN', 'mode': 'NULLABLE'},
-            {'name': 'is_closed', 'type': 'BOOLEAN', 'mode': 'NULLABLE'},
-            {'name': 'closed_date', 'type': 'TIMESTAMP', 'mode': 'NULLABLE'},
-        ],
-    }
 
-    # Combine base and object-specific schemas
-    if object_name in object_schemas:
-        base_schema['fields'].extend(object_schemas[object_name])
+def get_bigquery_table_parameters(object_name: str) -> dict[str, Any]:
+    """
+    Get the partitioning and clustering applied when creating an object's table.
 
-    return base_schema
+    The returned parameters are shared and must not be modified.
+
+    Args:
+        object_name: Name of the Salesforce object
+
+    Returns:
+        Additional BigQuery table parameters
+    """
+    return _BQ_TABLE_PARAMETERS.get(object_name, _BASE_TABLE_PARAMETERS)
 
 
 def run_pipeline(config_path: str, pipeline_args: list[str]) -> None:
@@ -270,7 +458,9 @@ def run_pipeline(config_path: str, pipeline_args: list[str]) -> None:
 
     # Set up pipeline options
     pipeline_options = PipelineOptions(pipeline_args)
-    pipeline_options.view_as(SetupOptions).save_main_session = True
+    # cloudpickle captures what each DoFn references, so the __main__
+    # module does not need to be pickled and shipped to workers
+    pipeline_options.view_as(SetupOptions).pickle_library = 'cloudpickle'
 
     # Create pipeline
     with beam.Pipeline(options=pipeline_options) as p:
@@ -290,13 +480,18 @@ def run_pipeline(config_path: str, pipeline_args: list[str]) -> None:
                 | f'Extract{object_name}' >> beam.ParDo(
                     ExtractSalesforceObject(config.config, obj_config)
                 )
-                | f'Validate{object_name}' >> beam.ParDo(
-                    ValidateRecord(obj_config, config.data_quality_config['validation_rules'])
+                # Break fusion so records extracted on one worker are
+                # validated and written in parallel across workers
+                | f'Reshuffle{object_name}' >> beam.Reshuffle()
+                | f'ValidateAndFormat{object_name}' >> beam.ParDo(
+                    ValidateAndFormatRecord(
+                        obj_config, config.data_quality_config['validation_rules']
+                    )
                 )
-                | f'Format{object_name}ForBigQuery' >> beam.ParDo(FormatForBigQuery())
                 | f'Write{object_name}ToBigQuery' >> WriteToBigQuery(
                     table=f"{config.bigquery_config['project_id']}:{config.bigquery_config['dataset_id']}.{config.bigquery_config['raw_table_prefix']}{object_name.lower()}",
                     schema=get_bigquery_schema(object_name),
+                    additional_bq_parameters=get_bigquery_table_parameters(object_name),
                     write_disposition=BigQueryDisposition.WRITE_APPEND,
                     create_disposition=BigQueryDisposition.CREATE_IF_NEEDED
                 )
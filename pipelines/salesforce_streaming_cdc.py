@@ -5,7 +5,7 @@ Apache Beam streaming pipeline for processing Salesforce CDC events.
 Implements real-time ingestion to BigQuery and hourly SCD Type 2 updates.
 
 Usage:
-    python pipelines/salesforce_streaming_cdc.py \
+    python -m pipelines.salesforce_streaming_cdc \
         --config=config/salesforce_cdc_config.yaml \
         --runner=DataflowRunner \
         --project=<project-id> \
@@ -13,26 +13,36 @@ Usage:
 """
 
 import argparse
-import json
 import logging
-from collections.abc import Iterator
+import threading
+from collections.abc import Iterable, Iterator
 from datetime import datetime, timezone
-from typing import Any
+from typing import Any, Optional
 
 import apache_beam as beam
 import yaml
 from apache_beam import window
 from apache_beam.io import ReadFromPubSub, WriteToBigQuery
 from apache_beam.io.gcp.bigquery import BigQueryDisposition
+from apache_beam.io.gcp.bigquery_tools import RetryStrategy
 from apache_beam.options.pipeline_options import (
     PipelineOptions,
     SetupOptions,
     StandardOptions,
 )
+from google.cloud import pubsub_v1
 
+from pipelines.utils import json_codec
+from pipelines.utils.cdc_event_parser import SOURCE_KEY_BY_EVENT_TYPE
 from pipelines.utils.cdc_validators import CDCValidator
+from pipelines.utils.profiling import ProfiledDoFn
 from pipelines.utils.scd_type2_handler import SCDType2Handler
 
+try:
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:  # pragma: no cover - depends on libyaml being available
+    from yaml import SafeLoader
+
 
 class CDCConfig:
     """Configuration for CDC streaming pipeline."""
@@ -40,7 +50,7 @@ class CDCConfig:
     def __init__(self, config_path: str):
         """Load configuration from YAML file."""
         with open(config_path) as f:
-            self.config = yaml.safe_load(f)
+            self.config = yaml.load(f, Loader=SafeLoader)
 
         self.pubsub = self.config['pubsub']
         self.windowing = self.config['windowing']
@@ -52,200 +62,430 @@ class CDCConfig:
         self.error_handling = self.config.get('error_handling', {})
 
 
-class ParseCDCEvent(beam.DoFn):
-    """Parse CDC event from Pub/Sub message."""
+def extract_record(
+    event: dict[str, Any],
+    ingestion_timestamp: Optional[str] = None
+) -> Optional[dict[str, Any]]:
+    """
+    Build the BigQuery record for a CDC event.
 
-    def process(self, element: bytes) -> Iterator[dict[str, Any]]:
-        """
-        Parse JSON CDC event.
+    Args:
+        event: CDC event dictionary
+        ingestion_timestamp: Ingestion timestamp; defaults to the current time
 
-        Args:
-            element: Raw message bytes
+    Returns:
+        Record formatted for BigQuery, or None if the event cannot be extracted
+    """
+    try:
+        event_type = event.get('event_type')
+
+        # Extract appropriate data based on event type
+        source_key = SOURCE_KEY_BY_EVENT_TYPE.get(event_type)
+        if source_key is None:
+            logging.error(f"Unknown event type: {event_type}")
+            return None
+        source = event.get(source_key) or {}
+
+        # Copy the record and format complex fields for BigQuery in one pass
+        record = {
+            key: json_codec.dumps(value) if isinstance(value, (dict, list)) else value
+            for key, value in source.items()
+        }
 
-        Yields:
-            Parsed CDC event dictionary
-        """
-        try:
-            event = json.loads(element.decode('utf-8'))
-            yield event
-        except json.JSONDecodeError as e:
-            logging.error(f"Failed to parse CDC event: {str(e)}")
-        except Exception as e:
-            logging.error(f"Error processing CDC event: {str(e)}")
+        # Add metadata
+        record['ingestion_timestamp'] = (
+            ingestion_timestamp or datetime.now(timezone.utc).isoformat()
+        )
+        record['source'] = 'salesforce_cdc'
+        record['_cdc_event_id'] = event.get('event_id')
+        record['_cdc_event_type'] = event_type
+        record['_cdc_event_timestamp'] = event.get('event_timestamp')
 
+        return record
 
-class ValidateCDCEvent(beam.DoFn):
-    """Validate CDC event using data quality rules."""
+    except Exception as e:
+        logging.error(f"Failed to extract record: {str(e)}")
+        return None
 
-    def __init__(self, alert_threshold: float = 0.05):
-        """Initialize validator."""
-        self.alert_threshold = alert_threshold
-        self.validator = None
 
-    def setup(self):
-        """Set up validator instance."""
-        self.validator = CDCValidator(alert_threshold=self.alert_threshold)
+def build_alert(event: dict[str, Any], timestamp: Optional[str] = None) -> dict[str, Any]:
+    """
+    Build alert message for invalid event.
 
-    def process(self, element: dict[str, Any]) -> Iterator[dict[str, Any]]:
-        """
-        Validate CDC event.
+    Args:
+        event: Invalid CDC event with validation errors
+        timestamp: Alert timestamp; defaults to the current time
 
-        Args:
-            element: CDC event dictionary
+    Returns:
+        Alert dictionary
+    """
+    return {
+        'alert_type': 'data_quality_violation',
+        'severity': 'ERROR',
+        'timestamp': timestamp or datetime.now(timezone.utc).isoformat(),
+        'event_id': event.get('event_id'),
+        'object_type': event.get('object_type'),
+        'record_id': event.get('record_id'),
+        'validation_errors': event.get('_validation_errors', []),
+        'event_data': event
+    }
+
+
+def build_dead_letter(event: dict[str, Any], timestamp: Optional[str] = None) -> dict[str, Any]:
+    """
+    Build dead letter message for an event whose SCD Type 2 history was not applied.
+
+    Args:
+        event: CDC event dictionary
+        timestamp: Dead letter timestamp; defaults to the current time
+
+    Returns:
+        Dead letter dictionary
+    """
+    return {
+        'error_type': 'scd2_history_failure',
+        'timestamp': timestamp or datetime.now(timezone.utc).isoformat(),
+        'event_id': event.get('event_id'),
+        'object_type': event.get('object_type'),
+        'record_id': event.get('record_id'),
+        'event_data': event
+    }
 
-        Yields:
-            Tagged tuple: ('valid', event) or ('invalid', event)
-        """
-        is_valid, errors = self.validator.validate_event(element)
 
-        if is_valid:
-            yield beam.pvalue.TaggedOutput('valid', element)
-        else:
-            # Add validation errors to event
-            element['_validation_errors'] = errors
-            element['_validation_timestamp'] = datetime.now(timezone.utc).isoformat()
-            yield beam.pvalue.TaggedOutput('invalid', element)
+class ParseValidateExtract(beam.DoFn):
+    """
+    Parse, validate, route and extract CDC events in a single step.
+
+    Each message is handled in one DoFn call. Outputs are tagged:
+        <object type>: BigQuery record for the object's raw table
+        <object type>_history: validated event for SCD Type 2 processing
+        invalid: event that failed validation, with its errors attached
+    """
 
+    OBJECT_TYPES = ('Account', 'Contact', 'Opportunity', 'Case')
 
-class ExtractRecordForBigQuery(beam.DoFn):
-    """Extract record data for BigQuery insertion."""
+    # Set per bundle; fall back to the current time outside a bundle
+    _bundle_timestamp = None
 
-    def process(self, element: dict[str, Any]) -> Iterator[dict[str, Any]]:
+    def __init__(
+        self,
+        alert_threshold: float = 0.05,
+        history_object_types: tuple[str, ...] = (),
+        early_exit: bool = False,
+        validation_cache_size: int = 0
+    ):
         """
-        Extract record from CDC event.
+        Initialize fused CDC processor.
 
         Args:
-            element: CDC event dictionary
+            alert_threshold: Validation failure rate that triggers alerts
+            history_object_types: Object types whose events feed SCD Type 2 history
+            early_exit: Stop validating an event at its first failing rule
+            validation_cache_size: Number of recent valid events remembered so
+                duplicates skip their event-level checks except the
+                timestamp's age; 0 disables it
+        """
+        self.alert_threshold = alert_threshold
+        self.history_object_types = frozenset(history_object_types)
+        self.early_exit = early_exit
+        self.validation_cache_size = validation_cache_size
+        self.validator = None
 
-        Yields:
-            Record formatted for BigQuery
+    @staticmethod
+    def history_tag(object_type: str) -> str:
         """
-        try:
-            event_type = element.get('event_type')
-
-            # Extract appropriate data based on event type
-            if event_type in ['INSERT', 'UPDATE']:
-                record = element.get('after', {}).copy()
-            elif event_type == 'DELETE':
-                record = element.get('before', {}).copy()
-            else:
-                logging.error(f"Unknown event type: {event_type}")
-                return
-
-            # Add metadata
-            record['ingestion_timestamp'] = datetime.now(timezone.utc).isoformat()
-            record['source'] = 'salesforce_cdc'
-            record['_cdc_event_id'] = element.get('event_id')
-            record['_cdc_event_type'] = event_type
-            record['_cdc_event_timestamp'] = element.get('event_timestamp')
-
-            # Format complex fields for BigQuery
-            for key, value in record.items():
-                if isinstance(value, (dict, list)):
-                    record[key] = json.dumps(value)
-
-            yield record
+        Get the output tag for an object type's history events.
 
-        except Exception as e:
-            logging.error(f"Failed to extract record: {str(e)}")
+        Args:
+            object_type: Salesforce object type
 
+        Returns:
+            Output tag name
+        """
+        return f"{object_type}_history"
 
-class RouteByObjectType(beam.DoFn):
-    """Route events to different outputs based on object type."""
+    def setup(self):
+        """Set up validator instance."""
+        self.validator = CDCValidator(
+            alert_threshold=self.alert_threshold,
+            cache_size=self.validation_cache_size
+        )
+
+    def start_bundle(self):
+        """Capture one timestamp for all events in the bundle."""
+        now = datetime.now(timezone.utc)
+        self._bundle_timestamp = now.isoformat()
+        self.validator.reference_time = now
 
-    def process(self, element: dict[str, Any]) -> Iterator[dict[str, Any]]:
+    def process(self, element: bytes) -> Iterator[beam.pvalue.TaggedOutput]:
         """
-        Route event by object type.
+        Process a raw CDC message.
 
         Args:
-            element: CDC event or record dictionary
+            element: Raw message bytes
 
         Yields:
-            Tagged tuple with object type
+            Tagged BigQuery records, history events and invalid events
         """
-        object_type = element.get('object_type')
+        try:
+            event = json_codec.loads(element)
+        except json_codec.JSONDecodeError as e:
+            logging.error(f"Failed to parse CDC event: {str(e)}")
+            return
+        except Exception as e:
+            logging.error(f"Error processing CDC event: {str(e)}")
+            return
 
-        if object_type in ['Account', 'Contact', 'Opportunity', 'Case']:
-            yield beam.pvalue.TaggedOutput(object_type, element)
-        else:
+        timestamp = self._bundle_timestamp or datetime.now(timezone.utc).isoformat()
+        is_valid, errors = self.validator.validate_event(event, early_exit=self.early_exit)
+
+        if not is_valid:
+            event['_validation_errors'] = errors
+            event['_validation_timestamp'] = timestamp
+            yield beam.pvalue.TaggedOutput('invalid', event)
+            return
+
+        object_type = event.get('object_type')
+        if object_type not in self.OBJECT_TYPES:
             logging.warning(f"Unknown object type: {object_type}")
+            return
+
+        record = extract_record(event, timestamp)
+        if record is not None:
+            yield beam.pvalue.TaggedOutput(object_type, record)
+
+        if object_type in self.history_object_types:
+            yield beam.pvalue.TaggedOutput(self.history_tag(object_type), event)
+
+
+# BigQuery clients shared by all DoFns in a worker process, keyed by project
+_bigquery_clients: dict[str, Any] = {}
+_bigquery_clients_lock = threading.Lock()
+
+
+def _get_bigquery_client(project_id: str):
+    """
+    Get the worker's shared BigQuery client for a project.
+
+    Each object type has its own SCD Type 2 DoFn; sharing one client lets
+    them reuse its connection pool and credentials.
+
+    Args:
+        project_id: GCP project ID
+
+    Returns:
+        bigquery.Client instance
+    """
+    with _bigquery_clients_lock:
+        client = _bigquery_clients.get(project_id)
+        if client is None:
+            from google.cloud import bigquery
+
+            client = bigquery.Client(project=project_id)
+            _bigquery_clients[project_id] = client
+        return client
 
 
 class ProcessSCDType2Changes(beam.DoFn):
-    """Process CDC events for SCD Type 2 history tracking."""
+    """
+    Process CDC events for SCD Type 2 history tracking.
+
+    Each object type's window is processed as one group, so its history
+    table sees a single MERGE at a time. Outputs:
+        main: processing statistics
+        dead_letter: events whose history changes were not applied
+    """
+
+    def __init__(
+        self,
+        project_id: str,
+        dataset_id: str,
+        table_name: str,
+        object_type: str,
+        max_retry_attempts: int = 3,
+        retry_delay_seconds: float = 5.0
+    ):
+        """
+        Initialize SCD Type 2 processor.
 
-    def __init__(self, project_id: str, dataset_id: str, table_name: str, object_type: str):
-        """Initialize SCD Type 2 processor."""
+        Args:
+            project_id: GCP project ID
+            dataset_id: BigQuery dataset ID
+            table_name: History table name
+            object_type: Salesforce object type
+            max_retry_attempts: Retries of a history MERGE aborted by a
+                concurrent update
+            retry_delay_seconds: Delay before the first retry
+        """
         self.project_id = project_id
         self.dataset_id = dataset_id
         self.table_name = table_name
         self.object_type = object_type
+        self.max_retry_attempts = max_retry_attempts
+        self.retry_delay_seconds = retry_delay_seconds
         self.handler = None
 
     def setup(self):
         """Set up SCD Type 2 handler."""
-        from google.cloud import bigquery
-
-        bigquery_client = bigquery.Client(project=self.project_id)
+        bigquery_client = _get_bigquery_client(self.project_id)
         self.handler = SCDType2Handler(
             project_id=self.project_id,
             dataset_id=self.dataset_id,
-            bigquery_client=bigquery_client
+            bigquery_client=bigquery_client,
+            max_retry_attempts=self.max_retry_attempts,
+            retry_delay_seconds=self.retry_delay_seconds
         )
 
-    def process(self, element: tuple[str, list[dict[str, Any]]]) -> Iterator[dict[str, Any]]:
+    def process(self, element: tuple[str, Iterable[dict[str, Any]]]) -> Iterator[Any]:
         """
         Process windowed CDC events for SCD Type 2.
 
         Args:
-            element: Tuple of (object_type, list of CDC events)
+            element: Tuple of (object type, CDC events in the window)
 
         Yields:
-            Processing statistics
+            Processing statistics, and dead letter events tagged 'dead_letter'
         """
-        object_type, events = element
+        _, events = element
+        events = list(events)
 
         if not events:
             return
 
-        logging.info(f"Processing {len(events)} CDC events for {object_type} SCD Type 2 history")
+        logging.info(
+            f"Processing {len(events)} CDC events for {self.object_type} SCD Type 2 history"
+        )
 
         # Process the hourly batch
         stats = self.handler.process_hourly_changes(
             object_type=self.object_type,
-            events=list(events),
-            table_name=self.table_name
+            events=events
         )
 
         logging.info(f"SCD Type 2 processing completed: {stats}")
         yield stats
 
+        failed_record_ids = set(stats.get('failed_record_ids', ()))
+        if failed_record_ids:
+            logging.error(
+                f"SCD Type 2 history not applied for {len(failed_record_ids)} "
+                f"{self.object_type} records; sending their events to the dead letter output"
+            )
+            for event in events:
+                if event.get('record_id') in failed_record_ids:
+                    yield beam.pvalue.TaggedOutput('dead_letter', event)
+
+
+class PublishMessages(beam.DoFn):
+    """Publish messages as JSON with a batching Pub/Sub client."""
+
+    def __init__(
+        self,
+        topic_path: str,
+        max_messages: int = 1000,
+        max_bytes: int = 1024 * 1024,
+        max_latency: float = 0.05,
+        publish_timeout: float = 60.0
+    ):
+        """
+        Initialize message publisher.
 
-class CreateDataQualityAlert(beam.DoFn):
-    """Create data quality alert for invalid events."""
+        Args:
+            topic_path: Topic (projects/PROJECT/topics/TOPIC)
+            max_messages: Max messages per publish request
+            max_bytes: Max bytes per publish request
+            max_latency: Max seconds a message waits for its batch to fill
+            publish_timeout: Seconds to wait for pending publishes at bundle end
+        """
+        self.topic_path = topic_path
+        self.max_messages = max_messages
+        self.max_bytes = max_bytes
+        self.max_latency = max_latency
+        self.publish_timeout = publish_timeout
+        self.publisher = None
+        self._futures = []
+        self._bundle_timestamp = None
+
+    def setup(self):
+        """Set up Pub/Sub publisher client."""
+        batch_settings = pubsub_v1.types.BatchSettings(
+            max_messages=self.max_messages,
+            max_bytes=self.max_bytes,
+            max_latency=self.max_latency,
+        )
+        self.publisher = pubsub_v1.PublisherClient(batch_settings)
 
-    def process(self, element: dict[str, Any]) -> Iterator[bytes]:
+    def start_bundle(self):
+        """Reset pending publishes and capture the bundle's timestamp."""
+        self._futures = []
+        self._bundle_timestamp = datetime.now(timezone.utc).isoformat()
+
+    def build_message(self, element: dict[str, Any]) -> dict[str, Any]:
         """
-        Create alert message for invalid event.
+        Build the message published for an element.
+
+        Args:
+            element: Input element
+
+        Returns:
+            Message dictionary
+        """
+        return element
+
+    def process(self, element: dict[str, Any]) -> None:
+        """
+        Queue the element's message on the batching publisher.
+
+        Args:
+            element: Input element
+        """
+        message = self.build_message(element)
+        self._futures.append(
+            self.publisher.publish(self.topic_path, json_codec.dumps_bytes(message))
+        )
+
+    def finish_bundle(self):
+        """Wait for the bundle's messages so a committed bundle never loses them."""
+        for future in self._futures:
+            future.result(timeout=self.publish_timeout)
+        self._futures = []
+
+    def teardown(self):
+        """Flush and stop the publisher."""
+        if self.publisher:
+            self.publisher.stop()
+
+
+class PublishDataQualityAlerts(PublishMessages):
+    """Create data quality alerts and publish them with a batching Pub/Sub client."""
+
+    def build_message(self, element: dict[str, Any]) -> dict[str, Any]:
+        """
+        Build alert for invalid event.
 
         Args:
             element: Invalid CDC event with validation errors
 
-        Yields:
-            Alert message as bytes
+        Returns:
+            Alert dictionary
         """
-        alert = {
-            'alert_type': 'data_quality_violation',
-            'severity': 'ERROR',
-            'timestamp': datetime.now(timezone.utc).isoformat(),
-            'event_id': element.get('event_id'),
-            'object_type': element.get('object_type'),
-            'record_id': element.get('record_id'),
-            'validation_errors': element.get('_validation_errors', []),
-            'event_data': element
-        }
+        return build_alert(element, self._bundle_timestamp)
 
-        yield json.dumps(alert).encode('utf-8')
+
+class PublishDeadLetters(PublishMessages):
+    """Publish events whose SCD Type 2 history was not applied to the dead letter topic."""
+
+    def build_message(self, element: dict[str, Any]) -> dict[str, Any]:
+        """
+        Build dead letter message for an event.
+
+        Args:
+            element: CDC event dictionary
+
+        Returns:
+            Dead letter dictionary
+        """
+        return build_dead_letter(element, self._bundle_timestamp)
 
 
 def get_bigquery_table(project_id: str, dataset_id: str, object_type: str, table_prefix: str = 'raw_') -> str:
@@ -278,7 +518,9 @@ def run_pipeline(config_path: str, pipeline_args: list[str]) -> None:
 
     # Set up pipeline options
     pipeline_options = PipelineOptions(pipeline_args)
-    pipeline_options.view_as(SetupOptions).save_main_session = True
+    # cloudpickle captures what each DoFn references, so the __main__
+    # module does not need to be pickled and shipped to workers
+    pipeline_options.view_as(SetupOptions).pickle_library = 'cloudpickle'
     pipeline_options.view_as(StandardOptions).streaming = True
 
     # Construct Pub/Sub subscription path
@@ -287,41 +529,45 @@ def run_pipeline(config_path: str, pipeline_args: list[str]) -> None:
     # Create pipeline
     with beam.Pipeline(options=pipeline_options) as p:
 
-        # Read CDC events from Pub/Sub
-        cdc_events = (
-            p
-            | 'ReadFromPubSub' >> ReadFromPubSub(subscription=subscription_path)
-            | 'ParseJSON' >> beam.ParDo(ParseCDCEvent())
+        objects = {obj['name']: obj for obj in config.objects}
+        history_object_types = tuple(
+            object_type for object_type in ParseValidateExtract.OBJECT_TYPES
+            if objects.get(object_type, {}).get('track_history', False)
         )
 
-        # Validate events
-        validated = (
-            cdc_events
-            | 'ValidateEvents' >> beam.ParDo(ValidateCDCEvent(
-                alert_threshold=config.data_quality['alert_threshold']
-            )).with_outputs('valid', 'invalid')
+        parse_validate_extract = ParseValidateExtract(
+            alert_threshold=config.data_quality['alert_threshold'],
+            history_object_types=history_object_types,
+            early_exit=config.data_quality.get('early_exit', False),
+            validation_cache_size=config.data_quality.get('validation_cache_size', 0)
         )
+        if config.monitoring.get('enable_profiling', False):
+            parse_validate_extract = ProfiledDoFn(
+                parse_validate_extract,
+                sample_rate=config.monitoring.get('profile_sample_rate', 0.01)
+            )
 
-        # Process valid events - Real-time path to BigQuery
-        valid_events = validated.valid
-
-        # Route by object type
-        routed = (
-            valid_events
-            | 'RouteByObjectType' >> beam.ParDo(RouteByObjectType()).with_outputs(
-                'Account', 'Contact', 'Opportunity', 'Case'
+        # Read CDC events from Pub/Sub, then parse, validate, route and
+        # extract records in one fused step
+        processed = (
+            p
+            | 'ReadFromPubSub' >> ReadFromPubSub(
+                subscription=subscription_path,
+                id_label=config.pubsub.get('id_label'),
+                timestamp_attribute=config.pubsub.get('timestamp_attribute')
+            )
+            | 'ParseValidateExtract' >> beam.ParDo(parse_validate_extract).with_outputs(
+                'invalid',
+                *ParseValidateExtract.OBJECT_TYPES,
+                *(ParseValidateExtract.history_tag(t) for t in history_object_types)
             )
         )
 
         # Process each object type - Real-time ingestion
-        for object_type in ['Account', 'Contact', 'Opportunity', 'Case']:
-            obj_config = next((obj for obj in config.objects if obj['name'] == object_type), None)
+        for object_type in ParseValidateExtract.OBJECT_TYPES:
+            obj_config = objects.get(object_type)
 
             if obj_config and obj_config.get('enabled', True):
-                # Get the routed events for this object type
-                object_events = getattr(routed, object_type)
-
-                # Extract records and write to BigQuery
                 table_ref = get_bigquery_table(
                     config.bigquery['project_id'],
                     config.bigquery['dataset_id'],
@@ -329,44 +575,64 @@ def run_pipeline(config_path: str, pipeline_args: list[str]) -> None:
                     'raw_'
                 )
 
-                (
-                    object_events
-                    | f'Extract{object_type}Record' >> beam.ParDo(ExtractRecordForBigQuery())
-                    | f'Window{object_type}' >> beam.WindowInto(
-                        window.FixedWindows(10)  # 10-second windows for micro-batching
-                    )
+                write_result = (
+                    processed[object_type]
                     | f'WriteTo{object_type}BigQuery' >> WriteToBigQuery(
                         table=table_ref,
-                        write_disposition=BigQueryDisposition.WRITE_APPEND,
-                        create_disposition=BigQueryDisposition.CREATE_IF_NEEDED
+                        method=WriteToBigQuery.Method.STREAMING_INSERTS,
+                        batch_size=config.performance.get('bq_batch_rows', 500),
+                        with_auto_sharding=True,
+                        insert_retry_strategy=RetryStrategy.RETRY_ON_TRANSIENT_ERROR,
+                        write_disposition=config.bigquery.get(
+                            'write_disposition', BigQueryDisposition.WRITE_APPEND
+                        ),
+                        create_disposition=config.bigquery.get(
+                            'create_disposition', BigQueryDisposition.CREATE_NEVER
+                        )
                     )
                 )
 
-        # Hourly batch processing for SCD Type 2 history tables
-        for object_type in ['Account', 'Contact', 'Opportunity', 'Case']:
-            obj_config = next((obj for obj in config.objects if obj['name'] == object_type), None)
-
-            if obj_config and obj_config.get('track_history', False):
-                # Get the routed events for this object type
-                object_events = getattr(routed, object_type)
-
-                # Window events into 1-hour batches
-                history_table = f"{config.bigquery['project_id']}:{config.bigquery['dataset_id']}.{config.bigquery['history_tables'][object_type]}"
-
+                # Rows rejected for non-transient errors are not retried
                 (
-                    object_events
-                    | f'Window{object_type}Hourly' >> beam.WindowInto(
-                        window.FixedWindows(int(config.windowing['history']['window_duration'].replace('s', '')))
+                    write_result.failed_rows_with_errors
+                    | f'Log{object_type}FailedRows' >> beam.Map(
+                        lambda row: logging.error(f"BigQuery insert failed: {row}")
                     )
-                    | f'Group{object_type}ByWindow' >> beam.GroupBy(lambda x: x.get('object_type'))
-                    | f'Process{object_type}SCD2' >> beam.ParDo(
-                        ProcessSCDType2Changes(
-                            project_id=config.bigquery['project_id'],
-                            dataset_id=config.bigquery['dataset_id'],
-                            table_name=config.bigquery['history_tables'][object_type],
-                            object_type=object_type
-                        )
+                )
+
+        # Hourly batch processing for SCD Type 2 history tables. Each object
+        # type's window is one group, so only one MERGE at a time mutates
+        # its history table; BigQuery aborts concurrent DML on a table
+        dead_letter_topic = config.error_handling.get('dead_letter_topic')
+        for object_type in history_object_types:
+            object_events = processed[ParseValidateExtract.history_tag(object_type)]
+
+            history_results = (
+                object_events
+                | f'Window{object_type}Hourly' >> beam.WindowInto(
+                    window.FixedWindows(int(config.windowing['history']['window_duration'].replace('s', ''))),
+                    allowed_lateness=int(config.windowing['history'].get('allowed_lateness', '0s').replace('s', ''))
+                )
+                | f'Key{object_type}ByType' >> beam.WithKeys(object_type)
+                | f'Group{object_type}ByWindow' >> beam.GroupByKey()
+                | f'Process{object_type}SCD2' >> beam.ParDo(
+                    ProcessSCDType2Changes(
+                        project_id=config.bigquery['project_id'],
+                        dataset_id=config.bigquery['dataset_id'],
+                        table_name=config.bigquery['history_tables'][object_type],
+                        object_type=object_type,
+                        max_retry_attempts=config.error_handling.get('max_retry_attempts', 3),
+                        retry_delay_seconds=config.error_handling.get('retry_delay_seconds', 5)
                     )
+                ).with_outputs('dead_letter', main='stats')
+            )
+
+            # Events whose history was not applied are kept for replay
+            if dead_letter_topic:
+                dead_letter_path = f"projects/{config.pubsub['project_id']}/topics/{dead_letter_topic}"
+                (
+                    history_results.dead_letter
+                    | f'Publish{object_type}DeadLetters' >> beam.ParDo(PublishDeadLetters(dead_letter_path))
                 )
 
         # Handle invalid events - Publish to alerts topic
@@ -374,9 +640,8 @@ def run_pipeline(config_path: str, pipeline_args: list[str]) -> None:
             alerts_topic = f"projects/{config.pubsub['project_id']}/topics/{config.data_quality['alerts_topic']}"
 
             (
-                validated.invalid
-                | 'CreateAlerts' >> beam.ParDo(CreateDataQualityAlert())
-                | 'PublishAlerts' >> beam.io.WriteToPubSub(topic=alerts_topic)
+                processed.invalid
+                | 'PublishAlerts' >> beam.ParDo(PublishDataQualityAlerts(alerts_topic))
             )
 
     logging.info("CDC streaming pipeline execution started")
@@ -10,11 +10,63 @@ Usage:
     parsed_event = parser.parse_event(raw_event)
 """
 
-import json
 import logging
 from datetime import datetime, timezone
+from functools import lru_cache
 from typing import Any, Optional
 
+from pipelines.utils import json_codec
+
+# Record state that holds the row data for each CDC event type: the new
+# state for INSERT/UPDATE and the last known state for DELETE
+SOURCE_KEY_BY_EVENT_TYPE = {'INSERT': 'after', 'UPDATE': 'after', 'DELETE': 'before'}
+
+
+def _utc_now_iso() -> str:
+    """
+    Get the current UTC time as an ISO 8601 string with a Z suffix.
+
+    Returns:
+        Timestamp string, e.g. 2025-10-30T10:00:00.123456Z
+    """
+    # isoformat() of an aware UTC datetime always ends in '+00:00'
+    return datetime.now(timezone.utc).isoformat()[:-6] + 'Z'
+
+
+@lru_cache(maxsize=2048)
+def _publish_time_iso(publish_time: datetime) -> str:
+    """
+    Format a Pub/Sub publish time as ISO 8601.
+
+    Messages pulled in the same batch often share a publish time, so
+    formatted values are cached by the datetime itself. Pub/Sub publish
+    times are always UTC, so equal instants format identically.
+
+    Args:
+        publish_time: Message publish time
+
+    Returns:
+        ISO 8601 timestamp string
+    """
+    return publish_time.isoformat()
+
+
+@lru_cache(maxsize=4096)
+def _to_snake(key: str) -> str:
+    """
+    Convert a camelCase field name to snake_case.
+
+    Salesforce objects repeat the same few dozen field names on every
+    event, so results are cached and conversion is usually a dict lookup.
+
+    Args:
+        key: Field name, e.g. LastModifiedDate
+
+    Returns:
+        Normalized field name, e.g. last_modified_date
+    """
+    return ''.join(['_' + c.lower() if c.isupper() else c for c in key]).lstrip('_')
+
 
 class CDCEventParser:
     """Parse CDC events from Pub/Sub messages."""
@@ -35,15 +87,12 @@ class CDCEventParser:
             Parsed CDC event dictionary or None if parsing fails
         """
         try:
-            # Decode message data
-            data = message.data.decode('utf-8')
-
-            # Parse JSON
-            event = json.loads(data)
+            # Parse JSON straight from the message bytes
+            event = json_codec.loads(message.data)
 
             # Add Pub/Sub metadata
             event['_pubsub_message_id'] = message.message_id
-            event['_pubsub_publish_time'] = message.publish_time.isoformat()
+            event['_pubsub_publish_time'] = _publish_time_iso(message.publish_time)
 
             # Add message attributes
             if message.attributes:
@@ -53,7 +102,7 @@ class CDCEventParser:
 
             return event
 
-        except json.JSONDecodeError as e:
+        except json_codec.JSONDecodeError as e:
             self.error_count += 1
             logging.error(f"Failed to parse JSON from message {message.message_id}: {str(e)}")
             return None
@@ -79,29 +128,30 @@ class CDCEventParser:
         """
         try:
             event_type = event.get('event_type')
-            event.get('object_type')
-
-            # For INSERT and UPDATE, use 'after' data
-            if event_type in ['INSERT', 'UPDATE']:
-                record_data = event.get('after', {}).copy()
-            # For DELETE, use 'before' data
-            elif event_type == 'DELETE':
-                record_data = event.get('before', {}).copy()
-            else:
+
+            # 'after' data for INSERT and UPDATE, 'before' data for DELETE
+            source_key = SOURCE_KEY_BY_EVENT_TYPE.get(event_type)
+            if source_key is None:
                 logging.error(f"Unknown event type: {event_type}")
                 return None
+            source = event.get(source_key, {})
+
+            if not include_metadata:
+                return dict(source)
+
+            # Copy the record data and add ingestion metadata in one step
+            record_data = {
+                **source,
+                'ingestion_timestamp': _utc_now_iso(),
+                'source': 'salesforce_cdc',
+                '_cdc_event_id': event.get('event_id'),
+                '_cdc_event_type': event_type,
+                '_cdc_event_timestamp': event.get('event_timestamp'),
+            }
 
-            # Add ingestion metadata if requested
-            if include_metadata:
-                record_data['ingestion_timestamp'] = datetime.now(timezone.utc).isoformat().replace('+00:00', 'Z')
-                record_data['source'] = 'salesforce_cdc'
-                record_data['_cdc_event_id'] = event.get('event_id')
-                record_data['_cdc_event_type'] = event_type
-                record_data['_cdc_event_timestamp'] = event.get('event_timestamp')
-
-                # Add Pub/Sub metadata if available
-                if '_pubsub_message_id' in event:
-                    record_data['_pubsub_message_id'] = event['_pubsub_message_id']
+            # Add Pub/Sub metadata if available
+            if '_pubsub_message_id' in event:
+                record_data['_pubsub_message_id'] = event['_pubsub_message_id']
 
             return record_data
 
@@ -123,12 +173,10 @@ class CDCEventParser:
             event_type = event.get('event_type')
 
             # Determine record data based on event type
-            if event_type in ['INSERT', 'UPDATE']:
-                record_data = event.get('after', {})
-            elif event_type == 'DELETE':
-                record_data = event.get('before', {})
-            else:
+            source_key = SOURCE_KEY_BY_EVENT_TYPE.get(event_type)
+            if source_key is None:
                 return None
+            record_data = event.get(source_key, {})
 
             # Create history record
             history_record = {
@@ -137,9 +185,9 @@ class CDCEventParser:
                 'valid_to': None,  # Will be set during SCD Type 2 processing
                 'is_current': True,  # Will be updated during SCD Type 2 processing
                 'change_type': event_type,
-                'changed_fields': json.dumps(event.get('changed_fields', [])),
-                'record_data': json.dumps(record_data),
-                'ingestion_timestamp': datetime.now(timezone.utc).isoformat().replace('+00:00', 'Z')
+                'changed_fields': json_codec.dumps(event.get('changed_fields', [])),
+                'record_data': json_codec.dumps(record_data),
+                'ingestion_timestamp': _utc_now_iso()
             }
 
             return history_record
@@ -184,12 +232,7 @@ class CDCEventParser:
         Returns:
             Record with normalized field names
         """
-        normalized = {}
-        for key, value in record.items():
-            # Convert camelCase to snake_case
-            normalized_key = ''.join(['_' + c.lower() if c.isupper() else c for c in key]).lstrip('_')
-            normalized[normalized_key] = value
-        return normalized
+        return {_to_snake(key): value for key, value in record.items()}
 
     def format_for_json_field(self, value: Any) -> str:
         """
@@ -202,7 +245,7 @@ class CDCEventParser:
             JSON string representation
         """
         if isinstance(value, (dict, list)):
-            return json.dumps(value)
+            return json_codec.dumps(value)
         return str(value)
 
     def get_statistics(self) -> dict[str, int]:
@@ -242,7 +285,7 @@ class BeamCDCEventParser:
         Returns:
             Parsed dictionary
         """
-        return json.loads(element.decode('utf-8'))
+        return json_codec.loads(element)
 
     @staticmethod
     def extract_record(element: dict[str, Any]) -> dict[str, Any]:
@@ -257,19 +300,15 @@ class BeamCDCEventParser:
         """
         event_type = element.get('event_type')
 
-        if event_type in ['INSERT', 'UPDATE']:
-            record = element.get('after', {}).copy()
-        elif event_type == 'DELETE':
-            record = element.get('before', {}).copy()
-        else:
-            record = {}
-
-        # Add metadata
-        record['ingestion_timestamp'] = datetime.now(timezone.utc).isoformat().replace('+00:00', 'Z')
-        record['source'] = 'salesforce_cdc'
-        record['_cdc_event_type'] = event_type
+        source_key = SOURCE_KEY_BY_EVENT_TYPE.get(event_type)
 
-        return record
+        # Copy the record data and add metadata in one step
+        return {
+            **(element.get(source_key, {}) if source_key else {}),
+            'ingestion_timestamp': _utc_now_iso(),
+            'source': 'salesforce_cdc',
+            '_cdc_event_type': event_type,
+        }
 
     @staticmethod
     def add_processing_timestamp(element: dict[str, Any]) -> dict[str, Any]:
@@ -282,5 +321,5 @@ class BeamCDCEventParser:
         Returns:
             Record with processing timestamp
         """
-        element['_processing_timestamp'] = datetime.now(timezone.utc).isoformat().replace('+00:00', 'Z')
+        element['_processing_timestamp'] = _utc_now_iso()
         return element
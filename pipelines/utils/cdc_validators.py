@@ -12,28 +12,53 @@ Usage:
 """
 
 import re
+from collections import OrderedDict, defaultdict
 from datetime import datetime
-from typing import Any, Optional
+from typing import Any, NamedTuple, Optional
+
+
+class _CompiledSchema(NamedTuple):
+    """Record checks for one object type, precompiled as flat tuples."""
+
+    required: tuple[str, ...]
+    # (field, primary type, expected type or tuple of types)
+    field_types: tuple[tuple[str, type, Any], ...]
+    # (field, primary type, expected type or None, is required, is foreign key)
+    # for a single pass over 'after'
+    after_fields: tuple[tuple[str, Optional[type], Any, bool, bool], ...]
+
+
+_EMPTY_SCHEMA = _CompiledSchema((), (), ())
 
 
 class CDCValidator:
     """Validate CDC events for data quality."""
 
+    __slots__ = (
+        'alert_threshold', 'validation_stats', 'reference_time', '_schemas',
+        '_reorder_interval', '_rule_order', '_record_rule_order',
+        '_cache_size', '_passed_events'
+    )
+
     # Valid event types
     VALID_EVENT_TYPES = ['INSERT', 'UPDATE', 'DELETE']
 
     # Valid object types
     VALID_OBJECT_TYPES = ['Account', 'Contact', 'Opportunity', 'Case']
 
-    # Salesforce ID pattern (18 chars alphanumeric)
+    # Set forms for membership checks; the lists above are shown in errors
+    _EVENT_TYPE_SET = frozenset(VALID_EVENT_TYPES)
+    _OBJECT_TYPE_SET = frozenset(VALID_OBJECT_TYPES)
+
+    # Salesforce ID pattern (18 chars alphanumeric); checked by is_salesforce_id
     SALESFORCE_ID_PATTERN = re.compile(r'^[a-zA-Z0-9]{15,18}$')
 
     # Required fields by object type
     REQUIRED_FIELDS = {
-        'Account': ['id', 'name', 'created_date', 'last_modified_date'],
-        'Contact': ['id', 'first_name', 'last_name', 'created_date', 'last_modified_date'],
-        'Opportunity': ['id', 'name', 'stage_name', 'created_date', 'last_modified_date'],
-        'Case': ['id', 'subject', 'status', 'created_date', 'last_modified_date']
+        'Account': ('id', 'name', 'created_date', 'last_modified_date'),
+        'Contact': ('id', 'first_name', 'last_name', 'created_date', 'last_modified_date'),
+        'Opportunity': ('id', 'name', 'stage_name', 'created_date', 'last_modified_date'),
+        'Case': ('id', 'subject', 'status', 'created_date', 'last_modified_date')
     }
 
     # Expected field types by object type
@@ -89,20 +114,103 @@ class CDCValidator:
         }
     }
 
-    def __init__(self, alert_threshold: float = 0.05):
+    # Foreign key fields by object type
+    FOREIGN_KEYS = {
+        'Contact': ('account_id',),
+        'Opportunity': ('account_id',),
+        'Case': ('account_id', 'contact_id')
+    }
+
+    def __init__(
+        self,
+        alert_threshold: float = 0.05,
+        reorder_interval: int = 1024,
+        cache_size: int = 0
+    ):
         """
         Initialize CDC validator.
 
         Args:
             alert_threshold: Error rate threshold (0-1) for alerting
+            reorder_interval: Number of events between re-sorting rules by
+                failure count for early-exit validation
+            cache_size: Number of recently valid events whose event type,
+                object type, record ID and parsed timestamp are remembered,
+                so duplicates skip those checks and only have their
+                timestamp's age re-checked; 0 disables the cache
         """
         self.alert_threshold = alert_threshold
         self.validation_stats = {
             'total': 0,
             'valid': 0,
             'invalid': 0,
-            'error_types': {}
+            'error_types': defaultdict(int)
         }
+        self._schemas = self._compile_schemas()
+        self._reorder_interval = reorder_interval
+        self._rule_order = list(self._RULES)
+        self._record_rule_order = list(self._RECORD_RULES)
+        self._cache_size = cache_size
+        # Passed-event keys mapped to their parsed timestamps; the keys do
+        # not depend on the time, so entries outlive reference time changes
+        self._passed_events: OrderedDict[tuple, datetime] = OrderedDict()
+        # Current time for timestamp checks, e.g. set once per bundle;
+        # None reads the clock for every event
+        self.reference_time: Optional[datetime] = None
+
+    @staticmethod
+    def is_salesforce_id(value: Any) -> bool:
+        """
+        Check whether a value has the Salesforce ID format.
+
+        Equivalent to SALESFORCE_ID_PATTERN, but uses str methods instead of
+        the regex engine. Non-str values are checked by their str form.
+
+        Args:
+            value: Value to check
+
+        Returns:
+            True if the value is 15-18 ASCII alphanumeric characters
+        """
+        if value.__class__ is not str:
+            value = str(value)
+        return 15 <= len(value) <= 18 and value.isascii() and value.isalnum()
+
+    @classmethod
+    def _compile_schemas(cls) -> dict[str, _CompiledSchema]:
+        """
+        Compile required, type and foreign key checks per object type.
+
+        Type checks carry the first expected type as a primary type, so
+        the common exact match is an identity test rather than isinstance.
+        The 'after' checks are merged into one entry per field, in
+        FIELD_TYPES order with any other required or foreign key fields
+        appended, so each field is looked up once.
+
+        Returns:
+            Mapping of object type to its compiled schema
+        """
+        schemas = {}
+        for object_type in cls.VALID_OBJECT_TYPES:
+            required = tuple(cls.REQUIRED_FIELDS.get(object_type, ()))
+            foreign_keys = cls.FOREIGN_KEYS.get(object_type, ())
+            field_types = tuple(
+                (field, expected[0] if isinstance(expected, tuple) else expected, expected)
+                for field, expected in cls.FIELD_TYPES.get(object_type, {}).items()
+            )
+            typed = {field: (primary, expected) for field, primary, expected in field_types}
+            fields = list(typed)
+            fields.extend(f for f in (*required, *foreign_keys) if f not in fields)
+            schemas[object_type] = _CompiledSchema(
+                required=required,
+                field_types=field_types,
+                after_fields=tuple(
+                    (field, *typed.get(field, (None, None)),
+                     field in required, field in foreign_keys)
+                    for field in fields
+                )
+            )
+        return schemas
 
     def validate_event_type(self, event: dict[str, Any]) -> tuple[bool, Optional[str]]:
         """
@@ -121,7 +229,7 @@ class CDCValidator:
             return False, "Missing required field: event_type"
 
         # Check if event_type is valid
-        if event_type not in self.VALID_EVENT_TYPES:
+        if not isinstance(event_type, str) or event_type not in self._EVENT_TYPE_SET:
             return False, f"Invalid event_type: '{event_type}'. Must be one of {self.VALID_EVENT_TYPES}"
 
         return True, None
@@ -143,7 +251,7 @@ class CDCValidator:
             return False, "Missing required field: object_type"
 
         # Check if object_type is valid
-        if object_type not in self.VALID_OBJECT_TYPES:
+        if not isinstance(object_type, str) or object_type not in self._OBJECT_TYPE_SET:
             return False, f"Invalid object_type: '{object_type}'. Must be one of {self.VALID_OBJECT_TYPES}"
 
         return True, None
@@ -165,7 +273,7 @@ class CDCValidator:
             return False, "Missing required field: record_id"
 
         # Check if record_id matches Salesforce ID format
-        if not self.SALESFORCE_ID_PATTERN.match(str(record_id)):
+        if not self.is_salesforce_id(record_id):
             return False, f"Invalid record_id format: '{record_id}'. Must be 15-18 alphanumeric characters"
 
         return True, None
@@ -188,14 +296,29 @@ class CDCValidator:
 
         # Check if timestamp is valid ISO 8601 format
         try:
-            datetime.fromisoformat(event_timestamp.replace('Z', '+00:00'))
+            ts = datetime.fromisoformat(event_timestamp.replace('Z', '+00:00'))
         except (ValueError, AttributeError):
             return False, f"Invalid event_timestamp format: '{event_timestamp}'. Must be ISO 8601 format"
 
-        # Check if timestamp is reasonable (not in future, not too old)
+        return self._check_timestamp_age(ts, event_timestamp)
+
+    def _check_timestamp_age(self, ts: datetime, event_timestamp: str) -> tuple[bool, Optional[str]]:
+        """
+        Check a parsed event timestamp is not in the future or too old.
+
+        Args:
+            ts: Parsed event timestamp
+            event_timestamp: Timestamp as given in the event, for errors
+
+        Returns:
+            Tuple of (is_valid, error_message)
+        """
         try:
-            ts = datetime.fromisoformat(event_timestamp.replace('Z', '+00:00'))
-            now = datetime.now(ts.tzinfo)
+            now = self.reference_time
+            if now is None or ts.tzinfo is None or ts > now or (now - ts).days >= 365:
+                # The reference time lags the clock, so read the clock
+                # before rejecting an event against it
+                now = datetime.now(ts.tzinfo)
 
             # Check if in future
             if ts > now:
@@ -210,6 +333,15 @@ class CDCValidator:
 
         return True, None
 
+    def _record_field_errors(self, event: dict[str, Any]) -> tuple[list[str], list[str], list[str]]:
+        """Run the compiled record checks on an event's fields."""
+        return self._validate_record_fields(
+            event.get('object_type'),
+            event.get('event_type'),
+            event.get('after'),
+            event.get('before')
+        )
+
     def validate_null_required_fields(self, event: dict[str, Any]) -> tuple[bool, list[str]]:
         """
         Check for null values in required fields.
@@ -220,41 +352,8 @@ class CDCValidator:
         Returns:
             Tuple of (is_valid, list of error messages)
         """
-        errors = []
-
-        # Get object type
-        object_type = event.get('object_type')
-        if not object_type:
-            return False, ["Cannot validate required fields without object_type"]
-
-        # Get event type
-        event_type = event.get('event_type')
-        if not event_type:
-            return False, ["Cannot validate required fields without event_type"]
-
-        # Check 'after' data for INSERT and UPDATE
-        if event_type in ['INSERT', 'UPDATE']:
-            after_data = event.get('after')
-
-            if after_data is None:
-                errors.append(f"Missing 'after' data for {event_type} event")
-                return False, errors
-
-            # Check required fields for this object type
-            required_fields = self.REQUIRED_FIELDS.get(object_type, [])
-            for field in required_fields:
-                if field not in after_data or after_data[field] is None:
-                    errors.append(f"Required field '{field}' is null or missing in 'after' data")
-
-        # Check 'before' data for UPDATE and DELETE
-        if event_type in ['UPDATE', 'DELETE']:
-            before_data = event.get('before')
-
-            if before_data is None:
-                errors.append(f"Missing 'before' data for {event_type} event")
-                return False, errors
-
-        return len(errors) == 0, errors
+        errors = self._record_field_errors(event)[0]
+        return not errors, errors
 
     def validate_field_types(self, event: dict[str, Any]) -> tuple[bool, list[str]]:
         """
@@ -266,40 +365,8 @@ class CDCValidator:
         Returns:
             Tuple of (is_valid, list of error messages)
         """
-        errors = []
-
-        # Get object type
-        object_type = event.get('object_type')
-        if not object_type or object_type not in self.FIELD_TYPES:
-            return True, []  # Skip if unknown object type
-
-        expected_types = self.FIELD_TYPES[object_type]
-
-        # Check 'after' data if present
-        after_data = event.get('after')
-        if after_data:
-            for field_name, expected_type in expected_types.items():
-                if field_name in after_data:
-                    value = after_data[field_name]
-                    if value is not None and not isinstance(value, expected_type):
-                        errors.append(
-                            f"Field '{field_name}' has wrong type in 'after': "
-                            f"expected {expected_type}, got {type(value).__name__}"
-                        )
-
-        # Check 'before' data if present
-        before_data = event.get('before')
-        if before_data:
-            for field_name, expected_type in expected_types.items():
-                if field_name in before_data:
-                    value = before_data[field_name]
-                    if value is not None and not isinstance(value, expected_type):
-                        errors.append(
-                            f"Field '{field_name}' has wrong type in 'before': "
-                            f"expected {expected_type}, got {type(value).__name__}"
-                        )
-
-        return len(errors) == 0, errors
+        errors = self._record_field_errors(event)[1]
+        return not errors, errors
 
     def validate_changed_fields(self, event: dict[str, Any]) -> tuple[bool, Optional[str]]:
         """
@@ -338,91 +405,230 @@ class CDCValidator:
         Returns:
             Tuple of (is_valid, list of error messages)
         """
-        errors = []
-        object_type = event.get('object_type')
+        errors = self._record_field_errors(event)[2]
+        return not errors, errors
+
+    def _validate_record_fields(
+        self,
+        object_type: Any,
+        event_type: Any,
+        after_data: Any,
+        before_data: Any
+    ) -> tuple[list[str], list[str], list[str]]:
+        """
+        Run required field, type and foreign key checks from the compiled schema.
 
-        # Define foreign key fields by object type
-        foreign_keys = {
-            'Contact': ['account_id'],
-            'Opportunity': ['account_id'],
-            'Case': ['account_id', 'contact_id']
-        }
+        validate_null_required_fields, validate_field_types and
+        validate_foreign_keys each report one of the returned lists.
+
+        Args:
+            object_type: Event object type
+            event_type: Event type
+            after_data: Record state after the change
+            before_data: Record state before the change
 
-        if object_type not in foreign_keys:
-            return True, []  # No foreign keys to validate
+        Returns:
+            Tuple of (null field errors, field type errors, foreign key errors)
+        """
+        null_errors = []
+        type_errors = []
+        fk_errors = []
+        required, field_types, after_fields = self._schemas.get(object_type, _EMPTY_SCHEMA)
+        check_required = False
+        missing_before = False
+
+        if not object_type:
+            null_errors.append("Cannot validate required fields without object_type")
+        elif not event_type:
+            null_errors.append("Cannot validate required fields without event_type")
+        else:
+            check_after = event_type in ('INSERT', 'UPDATE')
+            if check_after and after_data is None:
+                null_errors.append(f"Missing 'after' data for {event_type} event")
+            else:
+                check_required = check_after
+                missing_before = event_type in ('UPDATE', 'DELETE') and before_data is None
 
-        # Check 'after' data if present
-        after_data = event.get('after')
         if after_data:
-            for fk_field in foreign_keys[object_type]:
-                fk_value = after_data.get(fk_field)
-                if fk_value is not None:
-                    # Validate format
-                    if not self.SALESFORCE_ID_PATTERN.match(str(fk_value)):
-                        errors.append(
-                            f"Foreign key '{fk_field}' has invalid format: '{fk_value}'"
+            for field, primary_type, expected_type, is_required, is_foreign_key in after_fields:
+                value = after_data.get(field)
+                if value is None:
+                    if is_required and check_required:
+                        null_errors.append(
+                            f"Required field '{field}' is null or missing in 'after' data"
                         )
+                    continue
+                if (
+                    expected_type is not None
+                    and type(value) is not primary_type
+                    and not isinstance(value, expected_type)
+                ):
+                    type_errors.append(
+                        f"Field '{field}' has wrong type in 'after': "
+                        f"expected {expected_type}, got {type(value).__name__}"
+                    )
+                if is_foreign_key and not self.is_salesforce_id(value):
+                    fk_errors.append(
+                        f"Foreign key '{field}' has invalid format: '{value}'"
+                    )
+        elif check_required:
+            for field in required:
+                if after_data.get(field) is None:
+                    null_errors.append(
+                        f"Required field '{field}' is null or missing in 'after' data"
+                    )
+        if missing_before:
+            null_errors.append(f"Missing 'before' data for {event_type} event")
 
-        return len(errors) == 0, errors
+        if before_data:
+            for field, primary_type, expected_type in field_types:
+                value = before_data.get(field)
+                if (
+                    value is not None
+                    and type(value) is not primary_type
+                    and not isinstance(value, expected_type)
+                ):
+                    type_errors.append(
+                        f"Field '{field}' has wrong type in 'before': "
+                        f"expected {expected_type}, got {type(value).__name__}"
+                    )
+
+        return null_errors, type_errors, fk_errors
+
+    def _validate_record_data(self, event: dict[str, Any]) -> tuple[bool, list[tuple[str, list[str]]]]:
+        """
+        Run the compiled record checks as a single rule.
+
+        Args:
+            event: CDC event dictionary
 
-    def validate_event(self, event: dict[str, Any]) -> tuple[bool, list[str]]:
+        Returns:
+            Tuple of (is_valid, list of (error type, error messages))
+        """
+        null_errors, type_errors, fk_errors = self._record_field_errors(event)
+        failures = [
+            (error_type, rule_errors)
+            for error_type, rule_errors in (
+                ('null_fields', null_errors),
+                ('field_types', type_errors),
+                ('foreign_keys', fk_errors)
+            )
+            if rule_errors
+        ]
+        return not failures, failures
+
+    def _reorder_rules(self):
+        """Sort rules so the most frequently failing ones run first."""
+        # get() rather than subscripting, which would add zero counts
+        error_types = self.validation_stats['error_types']
+        self._rule_order.sort(
+            key=lambda rule: sum(error_types.get(error_type, 0) for error_type in rule[0]),
+            reverse=True
+        )
+        self._record_rule_order = [rule for rule in self._rule_order if rule in self._RECORD_RULES]
+
+    def validate_event(
+        self,
+        event: dict[str, Any],
+        early_exit: bool = False
+    ) -> tuple[bool, list[str]]:
         """
         Run all validation rules on a CDC event.
 
+        With early_exit, rules run in order of observed failure frequency,
+        re-sorted every reorder_interval events, and validation stops at the
+        first failing rule. Statistics then only count that rule. Without it,
+        all rules run in a fixed order and every error is reported.
+
+        With a cache_size, an event whose event type, object type, record
+        ID and timestamp match a recent valid event skips those checks
+        except for the timestamp's age, which is re-checked first against
+        the current reference time; the remaining rules still run.
+
         Args:
             event: CDC event dictionary
+            early_exit: Stop at the first failing rule
 
         Returns:
             Tuple of (is_valid, list of error messages)
         """
-        self.validation_stats['total'] += 1
+        stats = self.validation_stats
+        stats['total'] += 1
+        error_counts = stats['error_types']
         errors = []
 
-        # Run all validations
-        validations = [
-            ('event_type', self.validate_event_type),
-            ('object_type', self.validate_object_type),
-            ('record_id', self.validate_record_id_format),
-            ('timestamp', self.validate_timestamp_format),
-            ('changed_fields', self.validate_changed_fields),
-        ]
-
-        for error_type, validation_func in validations:
-            is_valid, error = validation_func(event)
-            if not is_valid:
-                if isinstance(error, list):
-                    errors.extend(error)
-                else:
+        if early_exit:
+            if stats['total'] % self._reorder_interval == 0:
+                self._reorder_rules()
+            rules = self._rule_order
+        else:
+            rules = self._RULES
+
+        key = None
+        if self._cache_size:
+            key = (
+                event.get('event_type'),
+                event.get('object_type'),
+                event.get('record_id'),
+                event.get('event_timestamp')
+            )
+            try:
+                ts = self._passed_events.get(key)
+            except TypeError:
+                # Unhashable field values fail validation anyway
+                key = ts = None
+            if ts is not None:
+                self._passed_events.move_to_end(key)
+                rules = self._record_rule_order if early_exit else self._RECORD_RULES
+                is_valid, error = self._check_timestamp_age(ts, key[3])
+                if not is_valid:
                     errors.append(error)
-                self.validation_stats['error_types'][error_type] = \
-                    self.validation_stats['error_types'].get(error_type, 0) + 1
-
-        # Run multi-error validations
-        is_valid, null_errors = self.validate_null_required_fields(event)
-        if not is_valid:
-            errors.extend(null_errors)
-            self.validation_stats['error_types']['null_fields'] = \
-                self.validation_stats['error_types'].get('null_fields', 0) + 1
-
-        is_valid, type_errors = self.validate_field_types(event)
-        if not is_valid:
-            errors.extend(type_errors)
-            self.validation_stats['error_types']['field_types'] = \
-                self.validation_stats['error_types'].get('field_types', 0) + 1
-
-        is_valid, fk_errors = self.validate_foreign_keys(event)
-        if not is_valid:
-            errors.extend(fk_errors)
-            self.validation_stats['error_types']['foreign_keys'] = \
-                self.validation_stats['error_types'].get('foreign_keys', 0) + 1
+                    error_counts['timestamp'] += 1
+                    if early_exit:
+                        rules = ()
+                key = None
+
+        for error_types, validation_func in rules:
+            is_valid, result = validation_func(self, event)
+            if is_valid:
+                continue
+
+            if validation_func is CDCValidator._validate_record_data:
+                for error_type, rule_errors in result:
+                    errors.extend(rule_errors)
+                    error_counts[error_type] += 1
+            else:
+                errors.append(result)
+                error_counts[error_types[0]] += 1
+
+            if early_exit:
+                break
 
         # Update statistics
-        if len(errors) == 0:
-            self.validation_stats['valid'] += 1
+        if errors:
+            stats['invalid'] += 1
         else:
-            self.validation_stats['invalid'] += 1
-
-        return len(errors) == 0, errors
+            stats['valid'] += 1
+            if key is not None:
+                self._passed_events[key] = datetime.fromisoformat(key[3].replace('Z', '+00:00'))
+                if len(self._passed_events) > self._cache_size:
+                    self._passed_events.popitem(last=False)
+
+        return not errors, errors
+
+    # Rules run by validate_event, with the error types each one counts
+    _RULES = (
+        (('event_type',), validate_event_type),
+        (('object_type',), validate_object_type),
+        (('record_id',), validate_record_id_format),
+        (('timestamp',), validate_timestamp_format),
+        (('changed_fields',), validate_changed_fields),
+        (('null_fields', 'field_types', 'foreign_keys'), _validate_record_data),
+    )
+
+    # Rules that read more than the fields in the passed-event cache key;
+    # cached events re-check only their timestamp's age before these
+    _RECORD_RULES = _RULES[4:]
 
     def get_error_rate(self) -> float:
         """
@@ -459,14 +665,16 @@ class CDCValidator:
             'invalid_events': self.validation_stats['invalid'],
             'error_rate': error_rate,
             'exceeds_threshold': error_rate > self.alert_threshold,
-            'error_types': self.validation_stats['error_types'].copy()
+            'error_types': dict(self.validation_stats['error_types'])
         }
 
     def reset_statistics(self):
-        """Reset validation statistics."""
+        """Reset validation statistics and the early-exit rule order."""
         self.validation_stats = {
             'total': 0,
             'valid': 0,
             'invalid': 0,
-            'error_types': {}
+            'error_types': defaultdict(int)
         }
+        self._rule_order = list(self._RULES)
+        self._record_rule_order = list(self._RECORD_RULES)
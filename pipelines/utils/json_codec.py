@@ -0,0 +1,94 @@
+"""
+JSON Codec
+
+Fast JSON encoding and decoding for pipeline hot paths.
+Uses orjson when it is installed and falls back to the standard library.
+
+Usage:
+    from pipelines.utils.json_codec import dumps, loads
+
+    event = loads(message_bytes)
+    payload = dumps(event)
+"""
+
+import json
+from collections.abc import Callable
+from typing import Any, Optional, Union
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - depends on the worker image
+    orjson = None
+
+# orjson.JSONDecodeError subclasses json.JSONDecodeError, so callers can
+# catch either one regardless of which backend is active.
+JSONDecodeError = json.JSONDecodeError
+
+
+def loads(data: Union[bytes, bytearray, memoryview, str]) -> Any:
+    """
+    Parse a JSON document.
+
+    Bytes are parsed directly without an intermediate UTF-8 decode.
+
+    Args:
+        data: JSON document as bytes or str
+
+    Returns:
+        Parsed Python object
+    """
+    if orjson is not None:
+        return orjson.loads(data)
+    if isinstance(data, memoryview):
+        data = data.tobytes()
+    return json.loads(data)
+
+
+def dumps_bytes(value: Any, default: Optional[Callable[[Any], Any]] = None) -> bytes:
+    """
+    Serialize a value to compact UTF-8 JSON bytes.
+
+    Follows the same rules as dumps(); use it where bytes are needed, e.g.
+    Pub/Sub payloads, to skip a str round trip.
+
+    Args:
+        value: Value to serialize
+        default: Optional callable for objects that are not natively serializable
+
+    Returns:
+        JSON document as bytes
+    """
+    if orjson is not None:
+        try:
+            return orjson.dumps(value, default=default, option=orjson.OPT_NON_STR_KEYS)
+        except TypeError:
+            # e.g. integers beyond 64 bits; let the stdlib encoder decide
+            pass
+    return json.dumps(value, default=default, separators=(',', ':')).encode('utf-8')
+
+
+def dumps(value: Any, default: Optional[Callable[[Any], Any]] = None) -> str:
+    """
+    Serialize a value to a compact JSON string.
+
+    Non-str dict keys are converted to strings as the standard library does.
+    Integers beyond the 64-bit range fall back to the standard library
+    encoder. With orjson, NaN and Infinity are written as null rather than
+    the non-standard NaN/Infinity tokens.
+
+    Args:
+        value: Value to serialize
+        default: Optional callable for objects that are not natively serializable
+
+    Returns:
+        JSON document as str
+    """
+    if orjson is not None:
+        try:
+            return orjson.dumps(
+                value, default=default, option=orjson.OPT_NON_STR_KEYS
+            ).decode('utf-8')
+        except TypeError:
+            # e.g. integers beyond 64 bits; let the stdlib encoder decide
+            pass
+    return json.dumps(value, default=default, separators=(',', ':'))
@@ -11,24 +11,67 @@ Usage:
     handler.process_hourly_changes(events)
 """
 
-import json
+import io
 import logging
+import time
+import uuid
 from collections import defaultdict
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
 from typing import Any, Optional
 
 from google.cloud import bigquery
 
+from pipelines.utils import json_codec
+
+# changed_fields JSON for INSERT history records
+_EMPTY_FIELDS_JSON = '[]'
+
+# History columns of BigQuery type JSON, held as JSON text in history records
+_JSON_COLUMNS = ('changed_fields', 'record_data')
+
+# Fields ignored by change detection
+_METADATA_FIELDS = frozenset({
+    'ingestion_timestamp', 'source', '_cdc_event_id',
+    '_cdc_event_type', '_cdc_event_timestamp', '_pubsub_message_id',
+    '_processing_timestamp', 'system_modstamp'
+})
+
+
+def _utc_now_iso() -> str:
+    """
+    Get the current UTC time as an ISO 8601 string with a Z suffix.
+
+    Returns:
+        Timestamp string, e.g. 2025-10-30T10:00:00.123456Z
+    """
+    # isoformat() of an aware UTC datetime always ends in '+00:00'
+    return datetime.now(timezone.utc).isoformat()[:-6] + 'Z'
+
 
 class SCDType2Handler:
     """Handle SCD Type 2 history updates for CDC events."""
 
+    __slots__ = (
+        'client', 'project_id', 'dataset_id', 'history_table_suffix',
+        'max_retry_attempts', 'retry_delay_seconds'
+    )
+
+    # Batches of at least this many history records are written with a load
+    # job rather than streaming inserts
+    LOAD_JOB_MIN_ROWS = 500
+
+    # Error text of a DML statement aborted by another statement mutating
+    # the same table; the statement changed nothing and can be rerun
+    CONCURRENT_UPDATE_ERROR = 'due to concurrent update'
+
     def __init__(
         self,
         bigquery_client: bigquery.Client,
         project_id: str,
         dataset_id: str,
-        history_table_suffix: str = '_history'
+        history_table_suffix: str = '_history',
+        max_retry_attempts: int = 3,
+        retry_delay_seconds: float = 5.0
     ):
         """
         Initialize SCD Type 2 handler.
@@ -38,11 +81,40 @@ class SCDType2Handler:
             project_id: GCP project ID
             dataset_id: BigQuery dataset ID
             history_table_suffix: Suffix for history tables
+            max_retry_attempts: Retries of a DML statement aborted by a
+                concurrent update
+            retry_delay_seconds: Delay before the first retry, growing
+                linearly with each further retry
         """
         self.client = bigquery_client
         self.project_id = project_id
         self.dataset_id = dataset_id
         self.history_table_suffix = history_table_suffix
+        self.max_retry_attempts = max_retry_attempts
+        self.retry_delay_seconds = retry_delay_seconds
+
+    def _run_dml(self, query: str, job_config: bigquery.QueryJobConfig) -> None:
+        """
+        Run a DML statement, retrying it when a concurrent update aborts it.
+
+        Args:
+            query: DML statement
+            job_config: Query job configuration with the statement's parameters
+
+        Raises:
+            Exception: The statement's error once it is not a concurrent
+                update or no retries are left
+        """
+        for attempt in range(self.max_retry_attempts + 1):
+            try:
+                self.client.query(query, job_config=job_config).result()
+                return
+            except Exception as e:
+                if attempt == self.max_retry_attempts or self.CONCURRENT_UPDATE_ERROR not in str(e):
+                    raise
+                delay = self.retry_delay_seconds * (attempt + 1)
+                logging.warning(f"History DML aborted by a concurrent update, retrying in {delay}s: {e}")
+                time.sleep(delay)
 
     def group_events_by_record(
         self,
@@ -59,15 +131,13 @@ class SCDType2Handler:
         """
         grouped = defaultdict(list)
 
-        for event in events:
+        # One stable sort by timestamp leaves each group in timestamp order,
+        # instead of sorting every group separately
+        for event in sorted(events, key=lambda e: e.get('event_timestamp', '')):
             record_id = event.get('record_id')
             if record_id:
                 grouped[record_id].append(event)
 
-        # Sort events by timestamp within each group
-        for record_id in grouped:
-            grouped[record_id].sort(key=lambda e: e.get('event_timestamp', ''))
-
         return dict(grouped)
 
     def detect_changes(
@@ -93,19 +163,15 @@ class SCDType2Handler:
             'field_changes': {}
         }
 
-        # Determine which fields to check
+        # Identical states, e.g. CDC echoes, have no changes to look for
+        if before is after or before == after:
+            return changes
+
+        # Determine which fields to check, skipping metadata fields
         if tracked_fields:
-            fields_to_check = set(tracked_fields)
+            fields_to_check = set(tracked_fields) - _METADATA_FIELDS
         else:
-            fields_to_check = set(before.keys()) | set(after.keys())
-
-        # Skip metadata fields
-        metadata_fields = {
-            'ingestion_timestamp', 'source', '_cdc_event_id',
-            '_cdc_event_type', '_cdc_event_timestamp', '_pubsub_message_id',
-            '_processing_timestamp', 'system_modstamp'
-        }
-        fields_to_check = fields_to_check - metadata_fields
+            fields_to_check = (before.keys() | after.keys()) - _METADATA_FIELDS
 
         # Compare fields
         for field in fields_to_check:
@@ -167,6 +233,50 @@ class SCDType2Handler:
             logging.error(f"Failed to get current record {record_id}: {str(e)}")
             return None
 
+    def get_current_record_ids(
+        self,
+        object_type: str,
+        record_ids: list[str]
+    ) -> set[str]:
+        """
+        Get which records have a current version in the history table.
+
+        Looks up all records in one query instead of one query per record.
+
+        Args:
+            object_type: Salesforce object type
+            record_ids: Record IDs to look up
+
+        Returns:
+            Set of record IDs with a current history record
+        """
+        if not record_ids:
+            return set()
+
+        table_name = f"{object_type.lower()}{self.history_table_suffix}"
+        table_id = f"{self.project_id}.{self.dataset_id}.{table_name}"
+
+        query = f"""
+            SELECT DISTINCT id
+            FROM `{table_id}`
+            WHERE id IN UNNEST(@record_ids)
+              AND is_current = TRUE
+        """
+
+        job_config = bigquery.QueryJobConfig(
+            query_parameters=[
+                bigquery.ArrayQueryParameter("record_ids", "STRING", record_ids)
+            ]
+        )
+
+        try:
+            query_job = self.client.query(query, job_config=job_config)
+            return {row['id'] for row in query_job.result()}
+
+        except Exception as e:
+            logging.error(f"Failed to get current records for {object_type}: {str(e)}")
+            return set()
+
     def create_history_record(
         self,
         record_id: str,
@@ -175,7 +285,8 @@ class SCDType2Handler:
         change_type: str,
         changed_fields: list[str],
         is_current: bool = True,
-        valid_to: Optional[str] = None
+        valid_to: Optional[str] = None,
+        ingestion_timestamp: Optional[str] = None
     ) -> dict[str, Any]:
         """
         Create history record for insertion.
@@ -188,19 +299,27 @@ class SCDType2Handler:
             changed_fields: List of changed field names
             is_current: Whether this is the current version
             valid_to: Validity end timestamp (None for current)
+            ingestion_timestamp: Ingestion timestamp shared by a batch
+                (None for the current time)
 
         Returns:
             History record dictionary
         """
+        if ingestion_timestamp is None:
+            ingestion_timestamp = _utc_now_iso()
+
         return {
             'id': record_id,
             'valid_from': valid_from,
             'valid_to': valid_to,
             'is_current': is_current,
             'change_type': change_type,
-            'changed_fields': json.dumps(changed_fields),
-            'record_data': json.dumps(record_data),
-            'ingestion_timestamp': datetime.now(timezone.utc).isoformat().replace('+00:00', 'Z')
+            # Column types are JSON; insert_rows_json expects them as JSON text
+            'changed_fields': (
+                _EMPTY_FIELDS_JSON if changed_fields == [] else json_codec.dumps(changed_fields)
+            ),
+            'record_data': json_codec.dumps(record_data),
+            'ingestion_timestamp': ingestion_timestamp
         }
 
     def close_current_record(
@@ -239,8 +358,7 @@ class SCDType2Handler:
         )
 
         try:
-            query_job = self.client.query(query, job_config=job_config)
-            query_job.result()  # Wait for completion
+            self._run_dml(query, job_config)
             logging.info(f"Closed current record {record_id} with valid_to={valid_to}")
             return True
 
@@ -248,6 +366,82 @@ class SCDType2Handler:
             logging.error(f"Failed to close current record {record_id}: {str(e)}")
             return False
 
+    @staticmethod
+    def _close_records_parameter(records: list[dict[str, Any]]) -> bigquery.ArrayQueryParameter:
+        """
+        Build the @records query parameter for closing current records.
+
+        A MERGE may match each target row to only one source row, so each
+        record keeps its first valid_to.
+
+        Args:
+            records: Dictionaries with 'record_id' and 'valid_to'
+
+        Returns:
+            ARRAY<STRUCT<record_id STRING, valid_to TIMESTAMP>> parameter
+        """
+        valid_to_by_id = {}
+        for record in records:
+            valid_to_by_id.setdefault(record['record_id'], record['valid_to'])
+
+        return bigquery.ArrayQueryParameter(
+            "records",
+            "STRUCT",
+            [
+                bigquery.StructQueryParameter(
+                    None,
+                    bigquery.ScalarQueryParameter("record_id", "STRING", record_id),
+                    bigquery.ScalarQueryParameter("valid_to", "TIMESTAMP", valid_to)
+                )
+                for record_id, valid_to in valid_to_by_id.items()
+            ]
+        )
+
+    def close_current_records(
+        self,
+        object_type: str,
+        records: list[dict[str, Any]]
+    ) -> bool:
+        """
+        Close several current records in one MERGE statement.
+
+        Runs one DML job per batch instead of one UPDATE per record. When a
+        record appears more than once, its first valid_to is used, as
+        later per-record updates would find it already closed.
+
+        Args:
+            object_type: Salesforce object type
+            records: Dictionaries with 'record_id' and 'valid_to'
+
+        Returns:
+            True if successful
+        """
+        if not records:
+            return True
+
+        table_name = f"{object_type.lower()}{self.history_table_suffix}"
+        table_id = f"{self.project_id}.{self.dataset_id}.{table_name}"
+
+        query = f"""
+            MERGE `{table_id}` H
+            USING (SELECT record_id, valid_to FROM UNNEST(@records)) S
+            ON H.id = S.record_id AND H.is_current = TRUE
+            WHEN MATCHED THEN
+              UPDATE SET valid_to = S.valid_to, is_current = FALSE
+        """
+
+        records_parameter = self._close_records_parameter(records)
+        job_config = bigquery.QueryJobConfig(query_parameters=[records_parameter])
+
+        try:
+            self._run_dml(query, job_config)
+            logging.info(f"Closed {len(records_parameter.values)} current records for {object_type}")
+            return True
+
+        except Exception as e:
+            logging.error(f"Failed to close current records for {object_type}: {str(e)}")
+            return False
+
     def insert_history_records(
         self,
         object_type: str,
@@ -269,6 +463,9 @@ class SCDType2Handler:
         table_name = f"{object_type.lower()}{self.history_table_suffix}"
         table_id = f"{self.project_id}.{self.dataset_id}.{table_name}"
 
+        if len(records) >= self.LOAD_JOB_MIN_ROWS:
+            return self.load_history_records(table_id, records)
+
         try:
             errors = self.client.insert_rows_json(table_id, records)
 
@@ -283,6 +480,148 @@ class SCDType2Handler:
             logging.error(f"Failed to insert history records: {str(e)}")
             return False
 
+    @staticmethod
+    def _to_load_line(record: dict[str, Any]) -> bytes:
+        """
+        Encode a history record as one line of newline-delimited JSON.
+
+        Load jobs read JSON columns as nested JSON values rather than JSON
+        text, so their pre-encoded text is spliced into the line as is.
+
+        Args:
+            record: History record
+
+        Returns:
+            JSON line without the trailing newline
+        """
+        columns = {k: v for k, v in record.items() if k not in _JSON_COLUMNS}
+        parts = [json_codec.dumps_bytes(columns)[:-1]]
+        for column in _JSON_COLUMNS:
+            if column in record:
+                value = record[column]
+                raw = b'null' if value is None else value.encode('utf-8')
+                parts.append(b',"' + column.encode('utf-8') + b'":' + raw)
+        parts.append(b'}')
+        return b''.join(parts)
+
+    def load_history_records(
+        self,
+        table_id: str,
+        records: list[dict[str, Any]]
+    ) -> bool:
+        """
+        Append history records to BigQuery with a load job.
+
+        Unlike streaming inserts, loaded rows are not held in the streaming
+        buffer, so later MERGE statements that close them do not fail.
+
+        Args:
+            table_id: Fully qualified history table ID
+            records: List of history records
+
+        Returns:
+            True if successful
+        """
+        payload = b'\n'.join(self._to_load_line(record) for record in records)
+
+        job_config = bigquery.LoadJobConfig(
+            source_format=bigquery.SourceFormat.NEWLINE_DELIMITED_JSON,
+            write_disposition=bigquery.WriteDisposition.WRITE_APPEND
+        )
+
+        try:
+            load_job = self.client.load_table_from_file(
+                io.BytesIO(payload), table_id, job_config=job_config
+            )
+            load_job.result()  # Wait for completion
+            logging.info(f"Loaded {len(records)} history records into {table_id}")
+            return True
+
+        except Exception as e:
+            logging.error(f"Failed to load history records: {str(e)}")
+            return False
+
+    def apply_history_changes(
+        self,
+        object_type: str,
+        records_to_close: list[dict[str, Any]],
+        new_records: list[dict[str, Any]]
+    ) -> bool:
+        """
+        Close current records and insert new versions in one MERGE statement.
+
+        New versions are loaded into a short-lived staging table next to the
+        history table. A single MERGE then closes the current rows and
+        inserts the staged rows, so either both happen or neither does.
+        Batches with only closes or only new versions use
+        close_current_records or insert_history_records.
+
+        Args:
+            object_type: Salesforce object type
+            records_to_close: Dictionaries with 'record_id' and 'valid_to'
+            new_records: History records to insert
+
+        Returns:
+            True if successful
+        """
+        if not records_to_close:
+            return self.insert_history_records(object_type, new_records)
+        if not new_records:
+            return self.close_current_records(object_type, records_to_close)
+
+        table_name = f"{object_type.lower()}{self.history_table_suffix}"
+        table_id = f"{self.project_id}.{self.dataset_id}.{table_name}"
+        staging_id = f"{table_id}_staging_{uuid.uuid4().hex}"
+
+        # Staged rows have no merge_id, so they never match and are inserted;
+        # close rows match the current version of their record
+        query = f"""
+            MERGE `{table_id}` H
+            USING (
+              SELECT CAST(NULL AS STRING) AS merge_id, CAST(NULL AS TIMESTAMP) AS close_at, N AS new_row
+              FROM `{staging_id}` N
+              UNION ALL
+              SELECT record_id, valid_to, NULL
+              FROM UNNEST(@records)
+            ) S
+            ON H.id = S.merge_id AND H.is_current = TRUE
+            WHEN MATCHED THEN
+              UPDATE SET valid_to = S.close_at, is_current = FALSE
+            WHEN NOT MATCHED BY TARGET AND S.new_row IS NOT NULL THEN
+              INSERT (id, valid_from, valid_to, is_current, change_type,
+                      changed_fields, record_data, ingestion_timestamp)
+              VALUES (S.new_row.id, S.new_row.valid_from, S.new_row.valid_to,
+                      S.new_row.is_current, S.new_row.change_type,
+                      S.new_row.changed_fields, S.new_row.record_data,
+                      S.new_row.ingestion_timestamp)
+        """
+
+        try:
+            staging = bigquery.Table(staging_id, schema=self.client.get_table(table_id).schema)
+            staging.expires = datetime.now(timezone.utc) + timedelta(hours=1)
+            self.client.create_table(staging)
+
+            try:
+                if not self.load_history_records(staging_id, new_records):
+                    return False
+
+                job_config = bigquery.QueryJobConfig(
+                    query_parameters=[self._close_records_parameter(records_to_close)]
+                )
+                self._run_dml(query, job_config)
+            finally:
+                self.client.delete_table(staging_id, not_found_ok=True)
+
+            logging.info(
+                f"Applied {len(records_to_close)} closes and {len(new_records)} "
+                f"new history records for {object_type}"
+            )
+            return True
+
+        except Exception as e:
+            logging.error(f"Failed to apply history changes for {object_type}: {str(e)}")
+            return False
+
     def process_hourly_changes(
         self,
         events: list[dict[str, Any]],
@@ -296,14 +635,16 @@ class SCDType2Handler:
             object_type: Salesforce object type
 
         Returns:
-            Dictionary with processing statistics
+            Dictionary with processing statistics; 'failed_record_ids' lists
+            the records whose history changes were not applied
         """
         stats = {
             'total_events': len(events),
             'records_processed': 0,
             'records_inserted': 0,
             'records_updated': 0,
-            'errors': 0
+            'errors': 0,
+            'failed_record_ids': []
         }
 
         # Group events by record ID
@@ -311,12 +652,17 @@ class SCDType2Handler:
 
         new_history_records = []
         records_to_close = []
+        ingestion_timestamp = _utc_now_iso()
+
+        # Get current state from history table for all records at once
+        current_record_ids = self.get_current_record_ids(
+            object_type, list(grouped_events)
+        )
 
         # Process each record's events
         for record_id, record_events in grouped_events.items():
             try:
-                # Get current state from history table
-                current_record = self.get_current_record(object_type, record_id)
+                current_record = record_id in current_record_ids
 
                 # Process each event for this record
                 for event in record_events:
@@ -332,7 +678,8 @@ class SCDType2Handler:
                             valid_from=event_timestamp,
                             change_type='INSERT',
                             changed_fields=[],
-                            is_current=True
+                            is_current=True,
+                            ingestion_timestamp=ingestion_timestamp
                         )
                         new_history_records.append(history_rec)
                         stats['records_inserted'] += 1
@@ -359,7 +706,8 @@ class SCDType2Handler:
                                 valid_from=event_timestamp,
                                 change_type='UPDATE',
                                 changed_fields=changes['changed_fields'],
-                                is_current=True
+                                is_current=True,
+                                ingestion_timestamp=ingestion_timestamp
                             )
                             new_history_records.append(history_rec)
                             stats['records_updated'] += 1
@@ -377,22 +725,19 @@ class SCDType2Handler:
             except Exception as e:
                 logging.error(f"Failed to process record {record_id}: {str(e)}")
                 stats['errors'] += 1
+                stats['failed_record_ids'].append(record_id)
 
-        # Close records that need to be closed
-        for close_info in records_to_close:
-            success = self.close_current_record(
-                object_type=object_type,
-                record_id=close_info['record_id'],
-                valid_to=close_info['valid_to']
+        # Close superseded records and insert new versions together
+        if records_to_close or new_history_records:
+            success = self.apply_history_changes(
+                object_type, records_to_close, new_history_records
             )
             if not success:
-                stats['errors'] += 1
-
-        # Insert new history records
-        if new_history_records:
-            success = self.insert_history_records(object_type, new_history_records)
-            if not success:
-                stats['errors'] += len(new_history_records)
+                stats['errors'] += len(records_to_close) + len(new_history_records)
+                stats['failed_record_ids'].extend(sorted(
+                    {record['record_id'] for record in records_to_close}
+                    | {record['id'] for record in new_history_records}
+                ))
 
         logging.info(f"SCD Type 2 processing complete: {stats}")
         return stats
@@ -147,7 +147,7 @@ print_info "Deploying Dataflow pipeline..."
 PIPELINE_NAME="salesforce-batch-extract-$ENVIRONMENT"
 JOB_NAME="$PIPELINE_NAME-$(date +%Y%m%d-%H%M%S)"
 
-python pipelines/salesforce_batch_extract.py \
+python -m pipelines.salesforce_batch_extract \
     --config=config/salesforce_config.yaml \
     --runner=DataflowRunner \
     --project="$GCP_PROJECT_ID" \
@@ -174,7 +174,7 @@ if [ "$TEMPLATE_MODE" = true ]; then
     
     echo -e "${YELLOW}Creating Dataflow template at: ${TEMPLATE_PATH}${NC}"
     
-    uv run python pipelines/salesforce_streaming_cdc.py \
+    uv run python -m pipelines.salesforce_streaming_cdc \
         --config="${CONFIG_FILE}" \
         --runner=DataflowRunner \
         --project="${GCP_PROJECT_ID}" \
@@ -194,7 +194,7 @@ if [ "$TEMPLATE_MODE" = true ]; then
     echo -e "${GREEN}✓ Dataflow template created: ${TEMPLATE_PATH}${NC}"
 else
     # Run pipeline directly
-    uv run python pipelines/salesforce_streaming_cdc.py \
+    uv run python -m pipelines.salesforce_streaming_cdc \
         --config="${CONFIG_FILE}" \
         --runner=DataflowRunner \
         --project="${GCP_PROJECT_ID}" \
@@ -11,8 +11,8 @@ setup(
     version='0.1.0',
     description='GCP Data Platform Demo - Salesforce Batch Pipeline',
     author='GCP Data Platform Demo',
-    packages=find_packages(where='src'),
-    package_dir={'': 'src'},
+    packages=find_packages(where='src') + find_packages(include=['pipelines', 'pipelines.*']),
+    package_dir={'': 'src', 'pipelines': 'pipelines'},
     python_requires='>=3.9',
     install_requires=[
         'apache-beam[gcp]>=2.54.0',
@@ -22,6 +22,7 @@ setup(
         'requests>=2.31.0',
         'pyyaml>=6.0.0',
         'pyarrow>=15.0.0',
+        'orjson>=3.9.0',
     ],
     extras_require={
         'test': [
@@ -12,38 +12,211 @@ Usage:
     accounts = client.query_accounts(limit=1000)
 """
 
+import heapq
+import logging
 import random
+import re
+import threading
 import time
+from collections import defaultdict, deque
+from collections.abc import Iterator, Sequence
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import Any, Optional
+from itertools import chain, islice, product
+from typing import Any, ClassVar, Optional
+from urllib.parse import parse_qsl, urlsplit
 
 import requests
 from requests.adapters import HTTPAdapter
+from requests.auth import AuthBase
 from urllib3.util.retry import Retry
 
+from pipelines.utils import json_codec
+
+logger = logging.getLogger(__name__)
+logger.addHandler(logging.NullHandler())
+
+# HTTP sessions shared by all clients in a process, keyed by base URL
+_sessions: dict[str, requests.Session] = {}
+_sessions_lock = threading.Lock()
+
+
+class BearerAuth(AuthBase):
+    """Attach an OAuth bearer token to each request."""
+
+    def __init__(self, token: str):
+        """Initialize with the access token to send."""
+        self.token = token
+
+    def __call__(self, request: requests.PreparedRequest) -> requests.PreparedRequest:
+        """Set the Authorization header on the outgoing request."""
+        request.headers['Authorization'] = f'Bearer {self.token}'
+        return request
+
+
+class TokenBucket:
+    """Thread-safe token bucket limiting the rate of API requests."""
+
+    def __init__(self, rate: float, capacity: int):
+        """
+        Initialize a full token bucket.
+
+        Args:
+            rate: Tokens added per second
+            capacity: Most tokens held, i.e. the largest burst allowed
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Take a token, sleeping only if none is available."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            # Reserve the token now so concurrent callers queue behind it
+            self._tokens -= 1
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+
+        if wait:
+            time.sleep(wait)
+
 
 class SalesforceAPIClient:
     """Simulated Salesforce REST API client for testing data pipelines."""
 
+    # Query locator URLs end in '<locator>-<offset>', e.g. 01gD0000002HU6KIAW-2000
+    QUERY_LOCATOR_PATTERN = re.compile(r'/query/(?P<locator>[^/?]+)-(?P<offset>\d+)$')
+
+    # Connection pool per host; requests beyond POOL_MAXSIZE wait for a
+    # free connection instead of opening one that is then discarded
+    POOL_CONNECTIONS = 5
+    POOL_MAXSIZE = 25
+
+    # Most values put in one SOQL IN clause; longer filters are split
+    # across concurrent queries
+    SOQL_IN_CHUNK_SIZE = 200
+
+    # Most subrequests the composite resource accepts in one call
+    COMPOSITE_MAX_REQUESTS = 25
+
+    # Fields retrieved by default for each object
+    DEFAULT_FIELDS = {
+        'Account': (
+            'Id', 'Name', 'Type', 'Industry', 'AnnualRevenue',
+            'Phone', 'Website', 'BillingAddress', 'ShippingAddress',
+            'CreatedDate', 'LastModifiedDate', 'SystemModstamp'
+        ),
+        'Contact': (
+            'Id', 'AccountId', 'FirstName', 'LastName', 'Email', 'Phone',
+            'Title', 'LeadSource', 'CreatedDate', 'LastModifiedDate', 'SystemModstamp'
+        ),
+        'Opportunity': (
+            'Id', 'AccountId', 'Name', 'StageName', 'Type', 'LeadSource',
+            'Amount', 'Probability', 'CloseDate', 'IsWon', 'IsClosed',
+            'CreatedDate', 'LastModifiedDate', 'SystemModstamp'
+        ),
+        'Case': (
+            'Id', 'AccountId', 'ContactId', 'Subject', 'Description', 'Status',
+            'Origin', 'Priority', 'IsEscalated', 'IsClosed', 'ClosedDate',
+            'CreatedDate', 'LastModifiedDate', 'SystemModstamp'
+        )
+    }
+
+    # SELECT clauses for the default fields, built once
+    _DEFAULT_SELECTS = {
+        object_name: f"SELECT {', '.join(fields)} FROM {object_name}"
+        for object_name, fields in DEFAULT_FIELDS.items()
+    }
+
+    # Number of mock records generated per object
+    MOCK_DATA_COUNTS = {
+        'accounts': 1000,
+        'contacts': 5000,
+        'opportunities': 2000,
+        'cases': 1000
+    }
+
+    # Generated mock data shared by all clients in a process, keyed by counts
+    _MOCK_DATA_CACHE: ClassVar[dict[tuple[int, ...], dict[str, list[dict[str, Any]]]]] = {}
+    _MOCK_DATA_LOCK: ClassVar[threading.Lock] = threading.Lock()
+
     def __init__(
         self,
         base_url: str = "http://localhost:8080",
         api_version: str = "v57.0",
         access_token: str = "mock_token",
-        rate_limit_delay: float = 0.1
+        rate_limit_delay: float = 0.1,
+        max_page_workers: int = 8,
+        rate_limit_burst: int = 10,
+        seed: Optional[int] = None
     ):
-        """Initialize the Salesforce API client."""
+        """
+        Initialize the Salesforce API client.
+
+        Args:
+            base_url: API base URL
+            api_version: REST API version
+            access_token: OAuth access token
+            rate_limit_delay: Average seconds between requests; 0 disables
+                rate limiting
+            max_page_workers: Most query result pages fetched concurrently
+            rate_limit_burst: Requests allowed back to back before
+                rate_limit_delay applies
+            seed: Seed for the simulated rate limits and errors, for
+                reproducible runs
+        """
         self.base_url = base_url.rstrip('/')
         self.api_version = api_version
-        self.access_token = access_token
+        # Sent per request, so tokens can rotate without touching the session
+        self.auth = BearerAuth(access_token)
         self.rate_limit_delay = rate_limit_delay
+        self.max_page_workers = max_page_workers
+        self.rate_limiter = (
+            TokenBucket(1 / rate_limit_delay, rate_limit_burst) if rate_limit_delay > 0 else None
+        )
+        # Own generator, so simulations neither share nor reseed global state
+        self._random = random.Random(seed)
+        # Describes do not change during a run, so each is fetched once
+        self._describe_cache: dict[str, dict[str, Any]] = {}
         self.session = self._create_session()
 
         # Mock data for simulation
         self._mock_data = {}
         self._initialize_mock_data()
 
+    @property
+    def access_token(self) -> str:
+        """OAuth access token; assign a new one to rotate it."""
+        return self.auth.token
+
+    @access_token.setter
+    def access_token(self, token: str):
+        self.auth.token = token
+
     def _create_session(self) -> requests.Session:
+        """
+        Get the process's shared HTTP session for this client's base URL.
+
+        Clients of the same org reuse one session, so their requests share
+        pooled connections rather than each opening new ones. Credentials
+        are attached per request by the client's BearerAuth, so clients
+        with different or rotated tokens still share the session.
+
+        Returns:
+            requests.Session with retry strategy and connection pooling
+        """
+        with _sessions_lock:
+            session = _sessions.get(self.base_url)
+            if session is None:
+                session = self._new_session()
+                _sessions[self.base_url] = session
+            return session
+
+    def _new_session(self) -> requests.Session:
         """Create HTTP session with retry strategy."""
         session = requests.Session()
 
@@ -51,16 +224,21 @@ class SalesforceAPIClient:
         retry_strategy = Retry(
             total=3,
             backoff_factor=1,
-            status_forcelist=[429, 500, 502, 503, 504]
+            status_forcelist=[429, 500, 502, 503, 504],
+            allowed_methods=frozenset(['GET'])
         )
 
-        adapter = HTTPAdapter(max_retries=retry_strategy)
+        adapter = HTTPAdapter(
+            pool_connections=self.POOL_CONNECTIONS,
+            pool_maxsize=self.POOL_MAXSIZE,
+            max_retries=retry_strategy,
+            pool_block=True
+        )
         session.mount("http://", adapter)
         session.mount("https://", adapter)
 
         # Set headers
         session.headers.update({
-            'Authorization': f'Bearer {self.access_token}',
             'Content-Type': 'application/json',
             'Accept': 'application/json'
         })
@@ -68,38 +246,69 @@ class SalesforceAPIClient:
         return session
 
     def _initialize_mock_data(self):
-        """Initialize mock Salesforce data for simulation."""
-        from .data_generator import SalesforceDataGenerator
-
-        generator = SalesforceDataGenerator()
+        """
+        Initialize mock Salesforce data for simulation.
 
-        # Generate mock data
-        self._mock_data = {
-            'accounts': generator.generate_accounts(count=1000),
-            'contacts': generator.generate_contacts(count=5000),
-            'opportunities': generator.generate_opportunities(count=2000),
-            'cases': generator.generate_cases(count=1000)
-        }
+        Data is generated once per process for each set of counts and shared
+        by later clients, which must treat it as read-only.
+        """
+        counts = self.MOCK_DATA_COUNTS
+        key = tuple(counts.values())
+
+        with self._MOCK_DATA_LOCK:
+            mock_data = self._MOCK_DATA_CACHE.get(key)
+            if mock_data is None:
+                from .data_generator import SalesforceDataGenerator
+
+                generator = SalesforceDataGenerator()
+
+                # Generate mock data
+                mock_data = {
+                    'accounts': generator.generate_accounts(count=counts['accounts']),
+                    'contacts': generator.generate_contacts(count=counts['contacts']),
+                    'opportunities': generator.generate_opportunities(
+                        count=counts['opportunities']
+                    ),
+                    'cases': generator.generate_cases(count=counts['cases'])
+                }
+                self._MOCK_DATA_CACHE[key] = mock_data
+
+        self._mock_data = mock_data
+
+    @classmethod
+    def reset_mock_data(cls):
+        """Drop the shared mock data so the next client generates it afresh."""
+        with cls._MOCK_DATA_LOCK:
+            cls._MOCK_DATA_CACHE.clear()
 
     def _simulate_rate_limit(self):
         """Simulate API rate limiting."""
-        if random.random() < 0.1:  # 10% chance of rate limit
-            time.sleep(random.uniform(1.0, 3.0))
+        if self._random.random() < 0.1:  # 10% chance of rate limit
+            time.sleep(self._random.uniform(1.0, 3.0))
             return True
         return False
 
     def _simulate_error(self, error_rate: float = 0.02) -> Optional[str]:
         """Simulate random API errors."""
-        if random.random() < error_rate:
+        if self._random.random() < error_rate:
             errors = [
                 "INVALID_SESSION", "INVALID_FIELD", "MALFORMED_QUERY",
                 "SERVER_UNAVAILABLE", "TIMEOUT_EXCEEDED"
             ]
-            return random.choice(errors)
+            return self._random.choice(errors)
         return None
 
-    def _make_request(self, endpoint: str, params: dict[str, Any] = None) -> dict[str, Any]:
-        """Make API request with error handling and rate limiting."""
+    def _make_request(
+        self,
+        endpoint: str,
+        params: dict[str, Any] = None,
+        payload: Optional[dict[str, Any]] = None
+    ) -> dict[str, Any]:
+        """
+        Make API request with error handling and rate limiting.
+
+        Requests with a payload are POSTed as JSON; all others are GETs.
+        """
         url = f"{self.base_url}/services/data/{self.api_version}/{endpoint}"
 
         # Simulate rate limiting
@@ -111,15 +320,30 @@ class SalesforceAPIClient:
         if error:
             raise requests.exceptions.RequestException(f"Salesforce API Error: {error}")
 
-        # Simulate network delay
-        time.sleep(self.rate_limit_delay)
+        # Pace requests; waits only once the burst allowance is used up
+        if self.rate_limiter is not None:
+            self.rate_limiter.acquire()
 
         try:
-            response = self.session.get(url, params=params, timeout=30)
+            if payload is None:
+                response = self.session.get(url, params=params, auth=self.auth, timeout=30)
+            else:
+                response = self.session.post(
+                    url,
+                    params=params,
+                    data=json_codec.dumps_bytes(payload),
+                    auth=self.auth,
+                    timeout=30
+                )
             response.raise_for_status()
-            return response.json()
+            try:
+                # Parse the raw bytes; query pages can hold thousands of records
+                return json_codec.loads(response.content)
+            except json_codec.JSONDecodeError as e:
+                # Keep the requests error type callers already handle
+                raise requests.exceptions.JSONDecodeError(e.msg, e.doc, e.pos) from e
         except requests.exceptions.RequestException as e:
-            print(f"API request failed: {e}")
+            logger.exception("API request failed: %s", e)
             raise
 
     def query_accounts(
@@ -139,13 +363,35 @@ class SalesforceAPIClient:
         Returns:
             List of account records
         """
+        records = list(self.iter_accounts(limit, fields, where_clause))
+
+        logger.info("Retrieved %d accounts", len(records))
+        return records
+
+    def iter_accounts(
+        self,
+        limit: int = 1000,
+        fields: Optional[list[str]] = None,
+        where_clause: Optional[str] = None
+    ) -> Iterator[dict[str, Any]]:
+        """
+        Stream Salesforce accounts page by page.
+
+        Records are yielded as their page arrives, so only the pages in
+        flight are held in memory. Pages past the limit, or after the
+        iterator is closed, are not requested.
+
+        Args:
+            limit: Maximum number of records to return
+            fields: List of fields to retrieve
+            where_clause: WHERE clause for filtering
+
+        Yields:
+            Account records
+        """
         # Default fields if not specified
         if fields is None:
-            fields = [
-                'Id', 'Name', 'Type', 'Industry', 'AnnualRevenue',
-                'Phone', 'Website', 'BillingAddress', 'ShippingAddress',
-                'CreatedDate', 'LastModifiedDate', 'SystemModstamp'
-            ]
+            fields = self.DEFAULT_FIELDS['Account']
 
         # Build query parameters
         params = {
@@ -153,50 +399,220 @@ class SalesforceAPIClient:
             'limit': limit
         }
 
-        print(f"Querying {limit} accounts...")
-        result = self._make_request('query', params)
-
-        # Handle pagination
-        records = result.get('records', [])
-        while 'nextRecordsUrl' in result and len(records) < limit:
-            next_url = result['nextRecordsUrl']
-            if next_url:
-                # Extract query parameters from next URL
-                next_params = {'q': next_url.split('q=')[1]}
-                next_result = self._make_request('query', next_params)
-                records.extend(next_result.get('records', []))
-                result = next_result
-            else:
-                break
+        logger.debug("Querying %d accounts", limit)
+        yield from self._iter_records(self._make_request('query', params), limit)
 
-        print(f"Retrieved {len(records)} accounts")
-        return records[:limit]
+    def _iter_records(self, result: dict[str, Any], limit: int) -> Iterator[dict[str, Any]]:
+        """
+        Stream a query result's records, following its remaining pages.
 
-    def query_contacts(
+        Every query method reads its results through here, so they all
+        share one pagination path.
+
+        Args:
+            result: First page of the query result
+            limit: Maximum number of records to return
+
+        Returns:
+            Iterator over at most limit records, in query order
+        """
+        return islice(chain(result.get('records', []), self._iter_more(result, limit)), limit)
+
+    def _iter_more(self, result: dict[str, Any], limit: int) -> Iterator[dict[str, Any]]:
+        """
+        Stream the remaining pages of a query result.
+
+        When nextRecordsUrl is a query locator, the URL of every remaining
+        page follows from its offset, the page size and totalSize, so the
+        pages are fetched concurrently. Otherwise nextRecordsUrl is followed
+        page by page.
+
+        Args:
+            result: First page of the query result
+            limit: Maximum number of records wanted in total
+
+        Yields:
+            Records from the remaining pages, in query order
+        """
+        next_url = result.get('nextRecordsUrl')
+        page_size = len(result.get('records', []))
+        if not next_url or page_size >= limit:
+            return
+
+        match = self.QUERY_LOCATOR_PATTERN.search(next_url)
+        if match and page_size:
+            total = min(result.get('totalSize', limit), limit)
+            locator = match.group('locator')
+            calls = [
+                (f"query/{locator}-{offset}", None)
+                for offset in range(int(match.group('offset')), total, page_size)
+            ]
+            for page in self._iter_pages_parallel(calls):
+                yield from page.get('records', [])
+            return
+
+        fetched = page_size
+        while next_url and fetched < limit:
+            page = self._make_request(*self._split_next_url(next_url))
+            records = page.get('records', [])
+            fetched += len(records)
+            next_url = page.get('nextRecordsUrl')
+            yield from records
+
+    def _iter_pages_parallel(
         self,
-        limit: int = 5000,
-        account_ids: Optional[list[str]] = None
+        calls: list[tuple[str, Optional[dict[str, Any]]]]
+    ) -> Iterator[dict[str, Any]]:
+        """
+        Fetch query result pages concurrently, yielding them in order.
+
+        At most max_page_workers pages are in flight or waiting to be
+        consumed. Closing the iterator cancels pages not yet started.
+
+        Args:
+            calls: (endpoint relative to the versioned API path, query
+                parameters) for each page
+
+        Yields:
+            Page responses in the order of calls
+        """
+        if len(calls) <= 1:
+            for call in calls:
+                yield self._make_request(*call)
+            return
+
+        workers = min(self.max_page_workers, len(calls))
+        executor = ThreadPoolExecutor(max_workers=workers)
+        try:
+            remaining = iter(calls)
+            pending = deque(
+                executor.submit(self._make_request, *call) for call in islice(remaining, workers)
+            )
+            while pending:
+                page = pending.popleft().result()
+                for call in islice(remaining, 1):
+                    pending.append(executor.submit(self._make_request, *call))
+                yield page
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def _fetch_pages_parallel(
+        self,
+        calls: list[tuple[str, Optional[dict[str, Any]]]]
     ) -> list[dict[str, Any]]:
-        """Query Salesforce contacts."""
-        fields = [
-            'Id', 'AccountId', 'FirstName', 'LastName', 'Email', 'Phone',
-            'Title', 'LeadSource', 'CreatedDate', 'LastModifiedDate', 'SystemModstamp'
+        """
+        Fetch query result pages concurrently.
+
+        Args:
+            calls: (endpoint relative to the versioned API path, query
+                parameters) for each page
+
+        Returns:
+            Page responses in the order of calls
+        """
+        return list(self._iter_pages_parallel(calls))
+
+    def _query_in_chunks(
+        self,
+        object_name: str,
+        fields: Sequence[str],
+        in_filters: dict[str, Optional[list[str]]],
+        limit: int
+    ) -> list[dict[str, Any]]:
+        """
+        Query records matching IN filters of any length.
+
+        Each filter is split into IN clauses of at most SOQL_IN_CHUNK_SIZE
+        values. One query per combination of clauses runs concurrently, and
+        their results are merged newest first to match the ORDER BY of a
+        single query. Each query's later pages are fetched as the merge
+        reaches them.
+
+        Args:
+            object_name: Salesforce object name
+            fields: List of fields to retrieve
+            in_filters: Field name to allowed values; empty filters are skipped
+            limit: Maximum number of records to return
+
+        Returns:
+            List of records
+        """
+        clauses = [
+            self._in_clauses(field, values)
+            for field, values in in_filters.items() if values
         ]
+        calls = [
+            ('query', {
+                'q': self._build_soql_query(object_name, fields, ' AND '.join(combination)),
+                'limit': limit
+            })
+            for combination in product(*clauses)
+        ]
+        if len(calls) == 1:
+            return list(self._iter_records(self._make_request(*calls[0]), limit))
+
+        pages = self._fetch_pages_parallel(calls)
+        merged = heapq.merge(
+            *(self._iter_records(page, limit) for page in pages),
+            key=self._created_date,
+            reverse=True
+        )
+        return list(islice(merged, limit))
 
-        # Build WHERE clause for account filtering
-        where_clause = None
-        if account_ids:
-            account_list = "', '".join(account_ids)
-            where_clause = f"AccountId IN ('{account_list}')"
+    @classmethod
+    def _in_clauses(cls, field: str, values: list[str]) -> list[str]:
+        """
+        Build IN clauses of at most SOQL_IN_CHUNK_SIZE quoted values each.
 
-        params = {
-            'q': self._build_soql_query('Contact', fields, where_clause),
-            'limit': limit
-        }
+        Args:
+            field: Field name
+            values: Values to match; duplicates are dropped
+
+        Returns:
+            List of '<field> IN (...)' clauses
+        """
+        quoted = [
+            "'" + str(value).replace('\\', '\\\\').replace("'", "\\'") + "'"
+            for value in dict.fromkeys(values)
+        ]
+        size = cls.SOQL_IN_CHUNK_SIZE
+        return [
+            f"{field} IN ({', '.join(quoted[start:start + size])})"
+            for start in range(0, len(quoted), size)
+        ]
 
-        print(f"Querying {limit} contacts...")
-        result = self._make_request('query', params)
-        return result.get('records', [])
+    @staticmethod
+    def _created_date(record: dict[str, Any]) -> str:
+        """Get the ORDER BY CreatedDate key of an API or mock record."""
+        return record.get('CreatedDate') or record.get('created_date') or ''
+
+    def _split_next_url(self, url: str) -> tuple[str, Optional[dict[str, str]]]:
+        """
+        Split a nextRecordsUrl into an endpoint and its query parameters.
+
+        Args:
+            url: Absolute or relative next records URL
+
+        Returns:
+            Tuple of (endpoint relative to the versioned API path,
+            decoded query parameters or None)
+        """
+        parts = urlsplit(url)
+        prefix = f"/services/data/{self.api_version}/"
+        path = parts.path
+        endpoint = path[len(prefix):] if path.startswith(prefix) else path.lstrip('/')
+        return endpoint, dict(parse_qsl(parts.query)) or None
+
+    def query_contacts(
+        self,
+        limit: int = 5000,
+        account_ids: Optional[list[str]] = None
+    ) -> list[dict[str, Any]]:
+        """Query Salesforce contacts."""
+        logger.debug("Querying %d contacts", limit)
+        return self._query_in_chunks(
+            'Contact', self.DEFAULT_FIELDS['Contact'], {'AccountId': account_ids}, limit
+        )
 
     def query_opportunities(
         self,
@@ -204,26 +620,10 @@ class SalesforceAPIClient:
         account_ids: Optional[list[str]] = None
     ) -> list[dict[str, Any]]:
         """Query Salesforce opportunities."""
-        fields = [
-            'Id', 'AccountId', 'Name', 'StageName', 'Type', 'LeadSource',
-            'Amount', 'Probability', 'CloseDate', 'IsWon', 'IsClosed',
-            'CreatedDate', 'LastModifiedDate', 'SystemModstamp'
-        ]
-
-        # Build WHERE clause for account filtering
-        where_clause = None
-        if account_ids:
-            account_list = "', '".join(account_ids)
-            where_clause = f"AccountId IN ('{account_list}')"
-
-        params = {
-            'q': self._build_soql_query('Opportunity', fields, where_clause),
-            'limit': limit
-        }
-
-        print(f"Querying {limit} opportunities...")
-        result = self._make_request('query', params)
-        return result.get('records', [])
+        logger.debug("Querying %d opportunities", limit)
+        return self._query_in_chunks(
+            'Opportunity', self.DEFAULT_FIELDS['Opportunity'], {'AccountId': account_ids}, limit
+        )
 
     def query_cases(
         self,
@@ -232,49 +632,88 @@ class SalesforceAPIClient:
         contact_ids: Optional[list[str]] = None
     ) -> list[dict[str, Any]]:
         """Query Salesforce cases."""
-        fields = [
-            'Id', 'AccountId', 'ContactId', 'Subject', 'Description', 'Status',
-            'Origin', 'Priority', 'IsEscalated', 'IsClosed', 'ClosedDate',
-            'CreatedDate', 'LastModifiedDate', 'SystemModstamp'
-        ]
+        logger.debug("Querying %d cases", limit)
+        return self._query_in_chunks(
+            'Case',
+            self.DEFAULT_FIELDS['Case'],
+            {'AccountId': account_ids, 'ContactId': contact_ids},
+            limit
+        )
 
-        # Build WHERE clause for filtering
-        where_clauses = []
-        if account_ids:
-            account_list = "', '".join(account_ids)
-            where_clauses.append(f"AccountId IN ('{account_list}')")
-        if contact_ids:
-            contact_list = "', '".join(contact_ids)
-            where_clauses.append(f"ContactId IN ('{contact_list}')")
+    def _build_soql_query(
+        self,
+        object_name: str,
+        fields: Sequence[str],
+        where_clause: Optional[str]
+    ) -> str:
+        """Build SOQL query string."""
+        if fields is self.DEFAULT_FIELDS.get(object_name):
+            query = self._DEFAULT_SELECTS[object_name]
+        else:
+            query = f"SELECT {', '.join(fields)} FROM {object_name}"
 
-        where_clause = ' AND '.join(where_clauses) if where_clauses else None
+        if where_clause:
+            return f"{query} WHERE {where_clause} ORDER BY CreatedDate DESC"
+        return f"{query} ORDER BY CreatedDate DESC"
 
-        params = {
-            'q': self._build_soql_query('Case', fields, where_clause),
-            'limit': limit
-        }
+    def get_object_describe(self, object_name: str) -> dict[str, Any]:
+        """Get object metadata including fields and relationships, cached per client."""
+        describe = self._describe_cache.get(object_name)
+        if describe is None:
+            endpoint = f"sobjects/{object_name}/describe"
 
-        print(f"Querying {limit} cases...")
-        result = self._make_request('query', params)
-        return result.get('records', [])
+            logger.debug("Getting describe for %s", object_name)
+            describe = self._describe_cache[object_name] = self._make_request(endpoint)
+        return describe
 
-    def _build_soql_query(self, object_name: str, fields: list[str], where_clause: Optional[str]) -> str:
-        """Build SOQL query string."""
-        fields_str = ', '.join(fields)
-        query = f"SELECT {fields_str} FROM {object_name}"
+    def get_object_describes(self, object_names: Sequence[str]) -> dict[str, dict[str, Any]]:
+        """
+        Get metadata for several objects through the composite resource.
 
-        if where_clause:
-            query += f" WHERE {where_clause}"
+        Up to COMPOSITE_MAX_REQUESTS describes share one request, so
+        describing a handful of objects costs one round trip instead of
+        one per object. Describes already fetched by this client are
+        served from its cache.
 
-        query += " ORDER BY CreatedDate DESC"
-        return query
+        Args:
+            object_names: API names of the objects to describe
 
-    def get_object_describe(self, object_name: str) -> dict[str, Any]:
-        """Get object metadata including fields and relationships."""
-        endpoint = f"sobjects/{object_name}/describe"
+        Returns:
+            Describe result for each object, keyed by object name
 
-        print(f"Getting describe for {object_name}...")
-        return self._make_request(endpoint)
+        Raises:
+            requests.exceptions.RequestException: If any describe fails
+        """
+        # referenceId values must be unique within a composite request
+        names = [name for name in dict.fromkeys(object_names) if name not in self._describe_cache]
+        prefix = f"/services/data/{self.api_version}"
+
+        for start in range(0, len(names), self.COMPOSITE_MAX_REQUESTS):
+            batch = names[start:start + self.COMPOSITE_MAX_REQUESTS]
+            payload = {
+                'compositeRequest': [
+                    {
+                        'method': 'GET',
+                        'url': f"{prefix}/sobjects/{name}/describe",
+                        'referenceId': name
+                    }
+                    for name in batch
+                ]
+            }
+
+            logger.debug("Getting describes for %s", ', '.join(batch))
+            result = self._make_request('composite', payload=payload)
+
+            for response in result['compositeResponse']:
+                if response['httpStatusCode'] >= 400:
+                    errors = response.get('body') or [{}]
+                    raise requests.exceptions.RequestException(
+                        f"Salesforce API Error: {errors[0].get('errorCode')} "
+                        f"describing {response['referenceId']}"
+                    )
+                self._describe_cache[response['referenceId']] = response['body']
+
+        return {name: self._describe_cache[name] for name in object_names}
 
     def get_recent_changes(
         self,
@@ -291,54 +730,100 @@ class SalesforceAPIClient:
             'limit': limit
         }
 
-        print(f"Getting recent changes for {object_name} since {since}...")
+        logger.debug("Getting recent changes for %s since %s", object_name, since)
         return self._make_request(endpoint, params)
 
 
 class MockSalesforceAPI(SalesforceAPIClient):
     """Mock Salesforce API that serves generated data for testing."""
 
+    # Mock data key for each queried object
+    QUERY_OBJECTS = {
+        'Account': 'accounts',
+        'Contact': 'contacts',
+        'Opportunity': 'opportunities',
+        'Case': 'cases'
+    }
+
+    # Query parsing, compiled once rather than per request. Patterns start
+    # with a literal (no \b or IGNORECASE) so the regex engine can scan for it
+    FROM_PATTERN = re.compile(r'FROM\s+(\w+)')
+    LIMIT_PATTERN = re.compile(r'LIMIT\s+(\d+)')
+    QUOTED_ID_PATTERN = re.compile(r"'([a-zA-Z0-9]+)'")
+    DESCRIBE_PATTERN = re.compile(r'sobjects/(\w+)/describe')
+
     def __init__(self, port: int = 8080):
         """Initialize mock API server."""
         super().__init__(base_url=f"http://localhost:{port}")
         self.port = port
+        self._build_indexes()
+
+    def _build_indexes(self):
+        """
+        Sort the mock data by CreatedDate and index it by account ID.
 
-    def _make_request(self, endpoint: str, params: dict[str, Any] = None) -> dict[str, Any]:
+        Each object's records are sorted once, newest first, and every
+        account ID maps to the ascending positions of its records in that
+        order, so ordered account queries need neither a scan nor a sort.
+        """
+        self._sorted_data = {}
+        self._account_index = {}
+        for name, records in self._mock_data.items():
+            ordered = sorted(records, key=lambda x: x.get('created_date', ''), reverse=True)
+            index = defaultdict(list)
+            for position, record in enumerate(ordered):
+                index[record.get('account_id')].append(position)
+            self._sorted_data[name] = ordered
+            self._account_index[name] = index
+
+    def _make_request(
+        self,
+        endpoint: str,
+        params: dict[str, Any] = None,
+        payload: Optional[dict[str, Any]] = None
+    ) -> dict[str, Any]:
         """Mock request that returns generated data."""
+        if endpoint == 'composite':
+            return self._composite(payload)
+
+        match = self.DESCRIBE_PATTERN.fullmatch(endpoint)
+        if match:
+            return self._describe(match.group(1))
+
         # Parse query to determine what data to return
-        query = params.get('q', '')
+        query = (params or {}).get('q', '')
 
         # Extract object name from query
-        if 'FROM Account' in query:
-            records = self._mock_data['accounts']
-        elif 'FROM Contact' in query:
-            records = self._mock_data['contacts']
-        elif 'FROM Opportunity' in query:
-            records = self._mock_data['opportunities']
-        elif 'FROM Case' in query:
-            records = self._mock_data['cases']
+        match = self.FROM_PATTERN.search(query)
+        data_key = self.QUERY_OBJECTS.get(match.group(1)) if match else None
+        if data_key is None:
+            return {'records': [], 'totalSize': 0, 'done': True}
+
+        # Apply WHERE filtering (simplified), then ORDER BY. Both produce
+        # lazy iterables; the mock data is shared between clients and
+        # its pre-sorted copy makes ordering free.
+        ordered = 'ORDER BY CreatedDate DESC' in query
+        account_ids = self.QUOTED_ID_PATTERN.findall(query) if 'AccountId IN' in query else None
+        if account_ids and ordered:
+            # Positions are in CreatedDate order, so merging them keeps the order
+            index = self._account_index[data_key]
+            ordered_records = self._sorted_data[data_key]
+            positions = heapq.merge(*(index.get(account_id, ()) for account_id in set(account_ids)))
+            records = (ordered_records[position] for position in positions)
+        elif account_ids:
+            account_ids = set(account_ids)
+            records = (r for r in self._mock_data[data_key] if r.get('account_id') in account_ids)
+        elif ordered:
+            records = self._sorted_data[data_key]
         else:
-            records = []
+            records = self._mock_data[data_key]
 
-        # Apply LIMIT clause if present
-        if 'LIMIT' in query.upper():
-            try:
-                limit = int(query.split('LIMIT')[1].strip())
-                records = records[:limit]
-            except (IndexError, ValueError):
-                pass
-
-        # Apply WHERE filtering (simplified)
-        if 'AccountId IN' in query:
-            # Extract account IDs from WHERE clause
-            import re
-            account_ids = re.findall(r"'([a-zA-Z0-9]+)'", query)
-            if account_ids:
-                records = [r for r in records if r.get('account_id') in account_ids]
-
-        # Apply ORDER BY
-        if 'ORDER BY CreatedDate DESC' in query:
-            records.sort(key=lambda x: x.get('created_date', ''), reverse=True)
+        # Apply LIMIT last, as SOQL does, from the query or the limit parameter
+        match = self.LIMIT_PATTERN.search(query)
+        limits = [int(match.group(1))] if match else []
+        if params.get('limit') is not None:
+            limits.append(int(params['limit']))
+        records = list(islice(records, min(limits)) if limits else records)
 
         return {
             'records': records,
@@ -346,6 +831,30 @@ class MockSalesforceAPI(SalesforceAPIClient):
             'done': True
         }
 
+    def _describe(self, object_name: str) -> dict[str, Any]:
+        """Mock describe listing an object's default fields."""
+        fields = self.DEFAULT_FIELDS.get(object_name)
+        if fields is None:
+            raise requests.exceptions.HTTPError(f"404 Client Error: NOT_FOUND for {object_name}")
+        return {'name': object_name, 'fields': [{'name': field} for field in fields]}
+
+    def _composite(self, payload: dict[str, Any]) -> dict[str, Any]:
+        """Mock composite request answering each subrequest in turn."""
+        responses = []
+        for subrequest in payload['compositeRequest']:
+            endpoint, params = self._split_next_url(subrequest['url'])
+            try:
+                body, status = self._make_request(endpoint, params), 200
+            except requests.exceptions.HTTPError as e:
+                body, status = [{'errorCode': 'NOT_FOUND', 'message': str(e)}], 404
+            responses.append({
+                'body': body,
+                'httpHeaders': {},
+                'httpStatusCode': status,
+                'referenceId': subrequest['referenceId']
+            })
+        return {'compositeResponse': responses}
+
 
 def main():
     """Main function for testing the API client."""
@@ -17,13 +17,36 @@ Usage:
 
 import json
 import random
-from datetime import datetime, timezone
+import time
+from collections import deque
+from collections.abc import Iterator
 from enum import Enum
+from functools import lru_cache
 from typing import Any, Optional
 
 from .data_generator import SalesforceDataGenerator
 
 
+@lru_cache(maxsize=1)
+def _utc_second_iso(seconds: int) -> str:
+    """Format a Unix time in whole seconds as ISO 8601 UTC date and time."""
+    return time.strftime('%Y-%m-%dT%H:%M:%S', time.gmtime(seconds))
+
+
+def _utc_now_iso() -> str:
+    """
+    Get the current UTC time as an ISO 8601 string with a Z suffix.
+
+    Events generated in the same second reuse its formatted date and time,
+    so only the microseconds are formatted per call.
+
+    Returns:
+        Timestamp string, e.g. 2025-10-30T10:00:00.123456Z
+    """
+    seconds, nanos = divmod(time.time_ns(), 1_000_000_000)
+    return f'{_utc_second_iso(seconds)}.{nanos // 1000:06d}Z'
+
+
 class CDCEventType(Enum):
     """CDC event types."""
     INSERT = "INSERT"
@@ -32,7 +55,46 @@ class CDCEventType(Enum):
 
 
 class CDCEventSimulator:
-    """Simulate CDC events for Salesforce objects."""
+    """
+    Simulate CDC events for Salesforce objects.
+
+    Event 'before' and 'after' snapshots are the simulator's own record
+    states, not copies; treat them as read-only.
+    """
+
+    # Fields that change on every write and are not reported as changes
+    METADATA_FIELDS = frozenset({'ingestion_timestamp', 'source', 'system_modstamp'})
+
+    # New records generated per batch call; one batch shares the generator's
+    # fallback parent IDs instead of rebuilding them for every record
+    INSERT_POOL_SIZE = 64
+
+    # Changes an UPDATE can make to each object type. Each takes the data
+    # generator and the current record and returns the new field values.
+    UPDATE_MODIFICATIONS = {
+        'Account': (
+            lambda gen, r: {'name': r['name'] + ' (Updated)'},
+            lambda gen, r: {'annual_revenue': int(r.get('annual_revenue', 0) * random.uniform(0.9, 1.2))},
+            lambda gen, r: {'phone': gen.fake.phone_number()},
+            lambda gen, r: {'type': random.choice(gen.account_types)},
+        ),
+        'Contact': (
+            lambda gen, r: {'email': gen.fake.email()},
+            lambda gen, r: {'phone': gen.fake.phone_number()},
+            lambda gen, r: {'title': random.choice(gen.contact_titles)},
+        ),
+        'Opportunity': (
+            lambda gen, r: {'amount': int(r.get('amount', 0) * random.uniform(0.8, 1.3))},
+            lambda gen, r: {'stage_name': random.choice(gen.opportunity_stages)},
+            lambda gen, r: {'probability': random.randint(1, 100)},
+            lambda gen, r: {'is_won': random.choice([True, False])},
+        ),
+        'Case': (
+            lambda gen, r: {'status': random.choice(gen.case_statuses)},
+            lambda gen, r: {'priority': random.choice(gen.case_priorities)},
+            lambda gen, r: {'is_escalated': random.choice([True, False])},
+        ),
+    }
 
     def __init__(self):
         """Initialize CDC event simulator."""
@@ -43,145 +105,156 @@ class CDCEventSimulator:
             'Opportunity': {},
             'Case': {}
         }
+        # IDs of the existing records and each ID's position in that list,
+        # so random picks and foreign keys need no copy of the keys
+        self._record_ids: dict[str, list[str]] = {obj_type: [] for obj_type in self._existing_records}
+        self._record_positions: dict[str, dict[str, int]] = {
+            obj_type: {} for obj_type in self._existing_records
+        }
+        # Pre-generated records waiting to be inserted
+        self._insert_pools: dict[str, deque] = {obj_type: deque() for obj_type in self._existing_records}
 
-    def _generate_cdc_event_id(self) -> str:
-        """Generate unique CDC event ID."""
-        chars = 'ABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789'
-        return 'CDC-' + ''.join(random.choices(chars, k=12))
-
-    def _get_changed_fields(self, before: dict[str, Any], after: dict[str, Any]) -> list[str]:
+    def _store_record(self, object_type: str, record: dict[str, Any]):
         """
-        Identify changed fields between before and after states.
+        Store a new record state and index its ID.
 
         Args:
-            before: Record state before change
-            after: Record state after change
-
-        Returns:
-            List of field names that changed
+            object_type: Salesforce object type
+            record: Record state to store
         """
-        changed = []
-
-        # Compare all fields that exist in both records
-        all_fields = set(before.keys()) | set(after.keys())
-
-        for field in all_fields:
-            before_val = before.get(field)
-            after_val = after.get(field)
+        record_id = record['id']
+        self._existing_records[object_type][record_id] = record
+        positions = self._record_positions[object_type]
+        if record_id not in positions:
+            positions[record_id] = len(self._record_ids[object_type])
+            self._record_ids[object_type].append(record_id)
 
-            # Skip metadata fields
-            if field in ['ingestion_timestamp', 'source', 'system_modstamp']:
-                continue
+    def _remove_record(self, object_type: str, record_id: str):
+        """
+        Remove a stored record, moving the last ID into its list slot.
 
-            # Compare values
-            if before_val != after_val:
-                changed.append(field)
+        Args:
+            object_type: Salesforce object type
+            record_id: ID of the record to remove
+        """
+        del self._existing_records[object_type][record_id]
+        ids = self._record_ids[object_type]
+        positions = self._record_positions[object_type]
+        position = positions.pop(record_id)
+        last_id = ids.pop()
+        if last_id != record_id:
+            ids[position] = last_id
+            positions[last_id] = position
 
-        return changed
+    def _generate_cdc_event_id(self) -> str:
+        """Generate unique CDC event ID from 64 random bits in uppercase hex."""
+        return f'CDC-{random.getrandbits(64):016X}'
 
-    def _modify_record_for_update(self, record: dict[str, Any], object_type: str) -> dict[str, Any]:
+    def _compute_update_delta(self, record: dict[str, Any], object_type: str) -> dict[str, Any]:
         """
-        Modify a record to simulate an update.
+        Compute the field changes that simulate an update.
+
+        The record is only read; callers build the updated state from it
+        and the returned changes, so it never has to be copied first.
 
         Args:
-            record: Original record
+            record: Current record state
             object_type: Salesforce object type
 
         Returns:
-            Modified record
+            New value for each modified field
         """
-        modified = record.copy()
-
         # Update timestamp fields
-        modified['last_modified_date'] = datetime.now(timezone.utc).isoformat().replace('+00:00', 'Z')
-        modified['system_modstamp'] = modified['last_modified_date']
+        modified_at = _utc_now_iso()
+        delta = {'last_modified_date': modified_at, 'system_modstamp': modified_at}
 
-        # Modify specific fields based on object type
-        if object_type == 'Account':
-            modifications = [
-                lambda r: r.update({'name': r['name'] + ' (Updated)'}),
-                lambda r: r.update({'annual_revenue': int(r.get('annual_revenue', 0) * random.uniform(0.9, 1.2))}),
-                lambda r: r.update({'phone': self.data_generator.fake.phone_number()}),
-                lambda r: r.update({'type': random.choice(self.data_generator.account_types)}),
-            ]
-        elif object_type == 'Contact':
-            modifications = [
-                lambda r: r.update({'email': self.data_generator.fake.email()}),
-                lambda r: r.update({'phone': self.data_generator.fake.phone_number()}),
-                lambda r: r.update({'title': random.choice(self.data_generator.contact_titles)}),
-            ]
-        elif object_type == 'Opportunity':
-            modifications = [
-                lambda r: r.update({'amount': int(r.get('amount', 0) * random.uniform(0.8, 1.3))}),
-                lambda r: r.update({'stage_name': random.choice(self.data_generator.opportunity_stages)}),
-                lambda r: r.update({'probability': random.randint(1, 100)}),
-                lambda r: r.update({'is_won': random.choice([True, False])}),
-            ]
-        elif object_type == 'Case':
-            modifications = [
-                lambda r: r.update({'status': random.choice(self.data_generator.case_statuses)}),
-                lambda r: r.update({'priority': random.choice(self.data_generator.case_priorities)}),
-                lambda r: r.update({'is_escalated': random.choice([True, False])}),
-            ]
-        else:
-            modifications = []
-
-        # Apply 1-3 random modifications
+        # Apply 1-3 random modifications for the object type
+        modifications = self.UPDATE_MODIFICATIONS.get(object_type, ())
         num_changes = random.randint(1, min(3, len(modifications)))
         for modification in random.sample(modifications, num_changes):
-            modification(modified)
+            delta.update(modification(self.data_generator, record))
 
-        return modified
+        return delta
 
-    def generate_insert_event(self, object_type: str) -> dict[str, Any]:
+    def _refill_insert_pool(self, object_type: str):
         """
-        Generate INSERT CDC event.
+        Generate a batch of new records for future inserts.
+
+        Parent IDs are taken from the records stored at refill time.
 
         Args:
             object_type: Salesforce object type (Account, Contact, etc.)
-
-        Returns:
-            CDC event dictionary
         """
-        # Generate new record
+        count = self.INSERT_POOL_SIZE
         if object_type == 'Account':
-            records = self.data_generator.generate_accounts(count=1)
+            records = self.data_generator.generate_accounts(count=count)
         elif object_type == 'Contact':
-            account_ids = list(self._existing_records['Account'].keys())
+            account_ids = self._record_ids['Account']
             records = self.data_generator.generate_contacts(
-                count=1,
+                count=count,
                 account_ids=account_ids if account_ids else None
             )
         elif object_type == 'Opportunity':
-            account_ids = list(self._existing_records['Account'].keys())
+            account_ids = self._record_ids['Account']
             records = self.data_generator.generate_opportunities(
-                count=1,
+                count=count,
                 account_ids=account_ids if account_ids else None
             )
         elif object_type == 'Case':
-            account_ids = list(self._existing_records['Account'].keys())
-            contact_ids = list(self._existing_records['Contact'].keys())
+            account_ids = self._record_ids['Account']
+            contact_ids = self._record_ids['Contact']
             records = self.data_generator.generate_cases(
-                count=1,
+                count=count,
                 account_ids=account_ids if account_ids else None,
                 contact_ids=contact_ids if contact_ids else None
             )
         else:
             raise ValueError(f"Unsupported object type: {object_type}")
 
-        record = records[0]
-        record_id = record['id']
+        self._insert_pools[object_type].extend(records)
+
+    def _insert_record(self, object_type: str) -> dict[str, Any]:
+        """
+        Take a new record from the pool and store it without building a CDC event.
+
+        Args:
+            object_type: Salesforce object type (Account, Contact, etc.)
+
+        Returns:
+            Stored record
+        """
+        pool = self._insert_pools.get(object_type)
+        if not pool:
+            # Raises ValueError for unsupported object types
+            self._refill_insert_pool(object_type)
+            pool = self._insert_pools[object_type]
+        record = pool.popleft()
 
         # Store for future updates
-        self._existing_records[object_type][record_id] = record.copy()
+        self._store_record(object_type, record)
+
+        return record
+
+    def generate_insert_event(self, object_type: str) -> dict[str, Any]:
+        """
+        Generate INSERT CDC event.
+
+        Args:
+            object_type: Salesforce object type (Account, Contact, etc.)
+
+        Returns:
+            CDC event dictionary
+        """
+        # The event shares the stored state
+        record = self._insert_record(object_type)
 
         # Create CDC event
         event = {
             'event_id': self._generate_cdc_event_id(),
             'event_type': CDCEventType.INSERT.value,
             'object_type': object_type,
-            'record_id': record_id,
-            'event_timestamp': datetime.now(timezone.utc).isoformat().replace('+00:00', 'Z'),
+            'record_id': record['id'],
+            'event_timestamp': _utc_now_iso(),
             'changed_fields': [],
             'before': None,
             'after': record,
@@ -210,17 +283,20 @@ class CDCEventSimulator:
             before_record = self._existing_records[object_type][record_id]
         else:
             # Pick random existing record
-            record_id = random.choice(list(self._existing_records[object_type].keys()))
+            record_id = random.choice(self._record_ids[object_type])
             before_record = self._existing_records[object_type][record_id]
 
-        # Modify record
-        after_record = self._modify_record_for_update(before_record.copy(), object_type)
-
-        # Update stored record
-        self._existing_records[object_type][record_id] = after_record.copy()
+        # Replace the stored state instead of mutating it, so before_record
+        # is left intact for this event
+        delta = self._compute_update_delta(before_record, object_type)
+        after_record = {**before_record, **delta}
+        self._existing_records[object_type][record_id] = after_record
 
-        # Identify changed fields
-        changed_fields = self._get_changed_fields(before_record, after_record)
+        # Only the modified fields can have changed
+        changed_fields = [
+            field for field, value in delta.items()
+            if field not in self.METADATA_FIELDS and before_record.get(field) != value
+        ]
 
         # Create CDC event
         event = {
@@ -228,7 +304,7 @@ class CDCEventSimulator:
             'event_type': CDCEventType.UPDATE.value,
             'object_type': object_type,
             'record_id': record_id,
-            'event_timestamp': datetime.now(timezone.utc).isoformat().replace('+00:00', 'Z'),
+            'event_timestamp': _utc_now_iso(),
             'changed_fields': changed_fields,
             'before': before_record,
             'after': after_record,
@@ -257,11 +333,11 @@ class CDCEventSimulator:
             before_record = self._existing_records[object_type][record_id]
         else:
             # Pick random existing record
-            record_id = random.choice(list(self._existing_records[object_type].keys()))
+            record_id = random.choice(self._record_ids[object_type])
             before_record = self._existing_records[object_type][record_id]
 
         # Remove from stored records
-        del self._existing_records[object_type][record_id]
+        self._remove_record(object_type, record_id)
 
         # Create CDC event
         event = {
@@ -269,7 +345,7 @@ class CDCEventSimulator:
             'event_type': CDCEventType.DELETE.value,
             'object_type': object_type,
             'record_id': record_id,
-            'event_timestamp': datetime.now(timezone.utc).isoformat().replace('+00:00', 'Z'),
+            'event_timestamp': _utc_now_iso(),
             'changed_fields': [],
             'before': before_record,
             'after': None,
@@ -295,6 +371,28 @@ class CDCEventSimulator:
         Returns:
             List of CDC events
         """
+        return list(self.iter_cdc_events(object_type, event_count, event_distribution))
+
+    def iter_cdc_events(
+        self,
+        object_type: str,
+        event_count: int = 100,
+        event_distribution: Optional[dict[str, float]] = None
+    ) -> Iterator[dict[str, Any]]:
+        """
+        Generate CDC events lazily with specified distribution.
+
+        The distribution is validated and the event order planned when this
+        is called; each event is only built when the iterator reaches it.
+
+        Args:
+            object_type: Salesforce object type
+            event_count: Number of events to generate
+            event_distribution: Distribution of event types (default: 50% INSERT, 40% UPDATE, 10% DELETE)
+
+        Returns:
+            Iterator of CDC events
+        """
         if event_distribution is None:
             event_distribution = {
                 'INSERT': 0.5,
@@ -307,8 +405,6 @@ class CDCEventSimulator:
         if abs(total - 1.0) > 0.01:
             raise ValueError(f"Event distribution must sum to 1.0, got {total}")
 
-        events = []
-
         # Calculate event counts
         insert_count = int(event_count * event_distribution.get('INSERT', 0))
         update_count = int(event_count * event_distribution.get('UPDATE', 0))
@@ -318,6 +414,11 @@ class CDCEventSimulator:
         remaining = event_count - (insert_count + update_count + delete_count)
         insert_count += remaining
 
+        # Seed an empty store so planned UPDATEs and DELETEs are not turned
+        # into INSERTs at the start of the batch
+        if update_count + delete_count > 0 and not self._existing_records[object_type]:
+            self.preload_existing_records(object_type, max(10, update_count + delete_count))
+
         # Generate events in random order
         event_types = (
             [CDCEventType.INSERT] * insert_count +
@@ -326,30 +427,39 @@ class CDCEventSimulator:
         )
         random.shuffle(event_types)
 
+        return self._emit_events(object_type, event_types)
+
+    def _emit_events(self, object_type: str, event_types: list[CDCEventType]) -> Iterator[dict[str, Any]]:
+        """
+        Generate one CDC event per planned event type.
+
+        Args:
+            object_type: Salesforce object type
+            event_types: Planned event types in order
+
+        Yields:
+            CDC events
+        """
         for event_type in event_types:
             if event_type == CDCEventType.INSERT:
-                event = self.generate_insert_event(object_type)
+                yield self.generate_insert_event(object_type)
             elif event_type == CDCEventType.UPDATE:
-                event = self.generate_update_event(object_type)
+                yield self.generate_update_event(object_type)
             else:  # DELETE
-                event = self.generate_delete_event(object_type)
-
-            events.append(event)
-
-        return events
+                yield self.generate_delete_event(object_type)
 
     def preload_existing_records(self, object_type: str, count: int = 100):
         """
         Preload existing records to enable UPDATE and DELETE events.
 
+        Records are stored without generating CDC events.
+
         Args:
             object_type: Salesforce object type
             count: Number of records to preload
         """
-        # Generate initial records
         for _ in range(count):
-            self.generate_insert_event(object_type)
-            # Event already stores record in _existing_records
+            self._insert_record(object_type)
 
     def get_existing_record_count(self, object_type: str) -> int:
         """
@@ -370,11 +480,11 @@ class CDCEventSimulator:
         Args:
             object_type: Optional object type to clear (clears all if None)
         """
-        if object_type:
-            self._existing_records[object_type] = {}
-        else:
-            for obj_type in self._existing_records:
-                self._existing_records[obj_type] = {}
+        for obj_type in ([object_type] if object_type else self._existing_records):
+            self._existing_records[obj_type] = {}
+            self._record_ids[obj_type] = []
+            self._record_positions[obj_type] = {}
+            self._insert_pools[obj_type].clear()
 
 
 def main():
@@ -15,22 +15,36 @@ Usage:
     publisher.publish_events(events)
 """
 
-import json
 import logging
+import time
+from collections.abc import Iterable
 from concurrent.futures import TimeoutError
+from datetime import date
 from typing import Any, Optional
 
 from google.cloud import pubsub_v1
 
+from pipelines.utils import json_codec
+
+
+def _json_default(value: Any) -> str:
+    """Encode values JSON has no type for; dates use ISO 8601 as orjson does."""
+    return value.isoformat() if isinstance(value, date) else str(value)
+
 
 class CDCEventPublisher:
     """Publish CDC events to Google Cloud Pub/Sub."""
 
+    # Attributes the streaming pipeline reads as id_label (deduplication) and
+    # timestamp_attribute (event time); an empty value would be misread
+    REQUIRED_ATTRIBUTES = ('event_id', 'event_timestamp')
+
     def __init__(
         self,
         project_id: str,
         topic_name: str,
-        batch_settings: Optional[pubsub_v1.types.BatchSettings] = None
+        batch_settings: Optional[pubsub_v1.types.BatchSettings] = None,
+        publisher_options: Optional[pubsub_v1.types.PublisherOptions] = None
     ):
         """
         Initialize CDC event publisher.
@@ -39,6 +53,8 @@ class CDCEventPublisher:
             project_id: GCP project ID
             topic_name: Pub/Sub topic name (without project prefix)
             batch_settings: Optional batch settings for publisher
+            publisher_options: Optional publisher options (default: blocking
+                flow control on outstanding messages)
         """
         self.project_id = project_id
         self.topic_name = topic_name
@@ -46,13 +62,24 @@ class CDCEventPublisher:
         # Configure batch settings for optimal throughput
         if batch_settings is None:
             batch_settings = pubsub_v1.types.BatchSettings(
-                max_bytes=1024 * 1024,  # 1 MB
+                max_bytes=8 * 1024 * 1024,  # 8 MB, below the 10 MB request limit
                 max_latency=0.1,  # 100 ms
-                max_messages=100,  # messages per batch
+                max_messages=1000,  # messages per batch (Pub/Sub maximum)
+            )
+
+        # Bound outstanding messages so fast publishing blocks instead of
+        # accumulating unbounded pending futures
+        if publisher_options is None:
+            publisher_options = pubsub_v1.types.PublisherOptions(
+                flow_control=pubsub_v1.types.PublishFlowControl(
+                    message_limit=10000,
+                    byte_limit=128 * 1024 * 1024,  # 128 MB
+                    limit_exceeded_behavior=pubsub_v1.types.LimitExceededBehavior.BLOCK,
+                )
             )
 
         # Create publisher client
-        self.publisher = pubsub_v1.PublisherClient(batch_settings)
+        self.publisher = pubsub_v1.PublisherClient(batch_settings, publisher_options)
         self.topic_path = self.publisher.topic_path(project_id, topic_name)
 
         # Statistics
@@ -71,7 +98,7 @@ class CDCEventPublisher:
         Returns:
             Serialized event as bytes
         """
-        return json.dumps(event, default=str).encode('utf-8')
+        return json_codec.dumps_bytes(event, default=_json_default)
 
     def _create_message_attributes(self, event: dict[str, Any]) -> dict[str, str]:
         """
@@ -82,12 +109,20 @@ class CDCEventPublisher:
 
         Returns:
             Dictionary of message attributes
+
+        Raises:
+            ValueError: If the event has no event ID or event timestamp
         """
+        missing = [name for name in self.REQUIRED_ATTRIBUTES if not event.get(name)]
+        if missing:
+            raise ValueError(f"CDC event is missing required attributes: {', '.join(missing)}")
+
         return {
+            'event_id': event['event_id'],
             'event_type': event.get('event_type', ''),
             'object_type': event.get('object_type', ''),
             'source': event.get('source', 'salesforce_cdc'),
-            'event_timestamp': event.get('event_timestamp', ''),
+            'event_timestamp': event['event_timestamp'],
         }
 
     def publish_event(
@@ -126,122 +161,173 @@ class CDCEventPublisher:
             message_id = future.result(timeout=timeout)
 
             self.published_count += 1
-            logging.debug(f"Published event {event.get('event_id')} with message ID: {message_id}")
+            logging.debug("Published event %s with message ID: %s", event.get('event_id'), message_id)
 
             return message_id
 
         except TimeoutError:
             self.failed_count += 1
-            logging.error(f"Timeout publishing event {event.get('event_id')}")
+            logging.error("Timeout publishing event %s", event.get('event_id'))
             raise
         except Exception as e:
             self.failed_count += 1
-            logging.error(f"Failed to publish event {event.get('event_id')}: {str(e)}")
+            logging.error("Failed to publish event %s: %s", event.get('event_id'), e)
             raise
 
+    def _start_publish(self, event: dict[str, Any]) -> pubsub_v1.publisher.futures.Future:
+        """
+        Hand a CDC event to the publisher client without waiting for it.
+
+        Args:
+            event: CDC event dictionary
+
+        Returns:
+            Future resolving to the Pub/Sub message ID
+        """
+        return self.publisher.publish(
+            self.topic_path,
+            data=self._serialize_event(event),
+            **self._create_message_attributes(event)
+        )
+
+    def _collect_results(
+        self,
+        futures: list[tuple[Optional[str], pubsub_v1.publisher.futures.Future]],
+        timeout: float
+    ) -> tuple[int, int]:
+        """
+        Wait for publish futures and count their outcomes.
+
+        The timeout covers all futures together, so each wait only gets
+        what is left before the deadline; futures already done return at
+        once even after it has passed.
+
+        Args:
+            futures: (event ID, publish future) pairs
+            timeout: Total seconds to wait for all futures
+
+        Returns:
+            Tuple of (successful, failed) publish counts
+        """
+        successful = 0
+        failed = 0
+        deadline = time.monotonic() + timeout
+
+        for event_id, future in futures:
+            try:
+                message_id = future.result(timeout=max(0.0, deadline - time.monotonic()))
+                successful += 1
+                self.published_count += 1
+                logging.debug("Published event %s with message ID: %s", event_id, message_id)
+            except Exception as e:
+                failed += 1
+                self.failed_count += 1
+                logging.error("Failed to publish event %s: %s", event_id, e)
+
+        return successful, failed
+
     def publish_events(
         self,
-        events: list[dict[str, Any]],
+        events: Iterable[dict[str, Any]],
         timeout: float = 60.0
     ) -> dict[str, Any]:
         """
         Publish multiple CDC events to Pub/Sub.
 
+        Events are iterated once, so a generator is published without
+        holding the whole batch in memory.
+
         Args:
-            events: List of CDC event dictionaries
+            events: CDC event dictionaries
             timeout: Total timeout for all publishes in seconds
 
         Returns:
             Dictionary with publish statistics
         """
         futures = []
+        total_events = 0
+        not_sent = 0
 
-        logging.info(f"Publishing {len(events)} CDC events to {self.topic_path}")
+        logging.info(f"Publishing CDC events to {self.topic_path}")
 
         # Publish all events (returns futures)
         for event in events:
+            total_events += 1
             try:
-                data = self._serialize_event(event)
-                attributes = self._create_message_attributes(event)
-
-                future = self.publisher.publish(
-                    self.topic_path,
-                    data=data,
-                    **attributes
-                )
-                futures.append((event.get('event_id'), future))
+                futures.append((event.get('event_id'), self._start_publish(event)))
 
             except Exception as e:
-                logging.error(f"Failed to initiate publish for event {event.get('event_id')}: {str(e)}")
+                logging.error("Failed to initiate publish for event %s: %s", event.get('event_id'), e)
+                not_sent += 1
                 self.failed_count += 1
 
         # Wait for all futures to complete
-        successful = 0
-        failed = 0
-
-        for event_id, future in futures:
-            try:
-                message_id = future.result(timeout=timeout)
-                successful += 1
-                self.published_count += 1
-                logging.debug(f"Published event {event_id} with message ID: {message_id}")
-            except Exception as e:
-                failed += 1
-                self.failed_count += 1
-                logging.error(f"Failed to publish event {event_id}: {str(e)}")
+        successful, failed = self._collect_results(futures, timeout)
 
         stats = {
-            'total_events': len(events),
+            'total_events': total_events,
             'successful': successful,
-            'failed': failed,
+            'failed': failed + not_sent,
             'published_this_batch': successful,
             'total_published': self.published_count,
             'total_failed': self.failed_count
         }
 
-        logging.info(f"Publish complete: {successful} successful, {failed} failed")
+        logging.info(f"Publish complete: {successful} successful, {stats['failed']} failed")
 
         return stats
 
     def publish_events_with_rate_limit(
         self,
-        events: list[dict[str, Any]],
+        events: Iterable[dict[str, Any]],
         events_per_second: int = 100,
         timeout: float = 60.0
     ) -> dict[str, Any]:
         """
         Publish events with rate limiting.
 
+        Events are sent on a fixed schedule of one per 1/events_per_second
+        seconds. Sending does not wait for the publish to complete, so slow
+        RPCs do not lower the rate; results are collected at the end.
+
         Args:
-            events: List of CDC event dictionaries
+            events: CDC event dictionaries, iterated once
             events_per_second: Maximum events to publish per second
-            timeout: Timeout per event in seconds
+            timeout: Total seconds to wait for outstanding publishes after
+                the last event is sent
 
         Returns:
             Dictionary with publish statistics
         """
-        import time
-
         interval = 1.0 / events_per_second
-        start_count = self.published_count
-
-        logging.info(f"Publishing {len(events)} CDC events at {events_per_second} events/sec")
+        futures = []
+        not_sent = 0
+        total_events = 0
 
-        for i, event in enumerate(events):
-            try:
-                self.publish_event(event, timeout=timeout)
+        logging.info(f"Publishing CDC events at {events_per_second} events/sec")
 
-                # Rate limiting
-                if i < len(events) - 1:  # Don't sleep after last event
-                    time.sleep(interval)
+        # Sleep only until each event's slot; time spent publishing counts
+        # towards the interval instead of adding to it
+        next_send = time.monotonic()
+        for total_events, event in enumerate(events, start=1):
+            wait = next_send - time.monotonic()
+            if wait > 0:
+                time.sleep(wait)
+            next_send += interval
 
+            try:
+                futures.append((event.get('event_id'), self._start_publish(event)))
             except Exception as e:
-                logging.error(f"Failed to publish event {i+1}/{len(events)}: {str(e)}")
+                not_sent += 1
+                self.failed_count += 1
+                logging.error("Failed to publish event %d: %s", total_events, e)
+
+        successful, failed = self._collect_results(futures, timeout)
 
         stats = {
-            'total_events': len(events),
-            'successful': self.published_count - start_count,
-            'failed': self.failed_count - (self.published_count - start_count),
+            'total_events': total_events,
+            'successful': successful,
+            'failed': failed + not_sent,
             'total_published': self.published_count,
             'total_failed': self.failed_count
         }
@@ -328,7 +414,7 @@ def main():
                 logging.info(f"\n=== Batch {batch_num} ===")
 
                 # Generate events
-                events = simulator.generate_cdc_events(args.object_type, args.count)
+                events = simulator.iter_cdc_events(args.object_type, args.count)
 
                 # Publish events
                 if args.rate_limit:
@@ -347,7 +433,7 @@ def main():
         else:
             # Single batch mode
             logging.info(f"Generating {args.count} CDC events for {args.object_type}...")
-            events = simulator.generate_cdc_events(args.object_type, args.count)
+            events = simulator.iter_cdc_events(args.object_type, args.count)
 
             # Publish events
             if args.rate_limit:
@@ -0,0 +1,496 @@
+"""
+Tests for Salesforce API Client.
+
+This module tests the shared HTTP session, rate limiting, shared mock data
+and query result pagination of the simulated REST API client.
+"""
+
+from typing import Any, Optional
+from unittest.mock import patch
+
+import pytest
+import requests
+
+import src.salesforce.api_client as api_client
+from src.salesforce.api_client import MockSalesforceAPI, SalesforceAPIClient, TokenBucket
+
+LOCATOR_URL = '/services/data/v57.0/query/01gD0000002HU6KIAW-{}'
+
+
+def _records(start: int, count: int) -> list[dict[str, Any]]:
+    """Build numbered account records."""
+    return [{'Id': f'001{i:015d}'} for i in range(start, start + count)]
+
+
+@pytest.fixture(autouse=True)
+def mock_generator(monkeypatch):
+    """Stub the data generator and start each test without shared state."""
+    monkeypatch.setattr(api_client, '_sessions', {})
+    monkeypatch.setattr(SalesforceAPIClient, '_MOCK_DATA_CACHE', {})
+    with patch('src.salesforce.data_generator.SalesforceDataGenerator') as generator_class:
+        yield generator_class
+
+
+@pytest.fixture
+def client() -> SalesforceAPIClient:
+    """API client without request delays."""
+    return SalesforceAPIClient(rate_limit_delay=0)
+
+
+class TestSession:
+    """Test cases for the shared HTTP session."""
+
+    def test_clients_share_session_per_base_url(self):
+        """Test clients of one org reuse a session whatever their token."""
+        first = SalesforceAPIClient()
+        second = SalesforceAPIClient(access_token='other_token')
+        other = SalesforceAPIClient(base_url='http://localhost:9090')
+
+        assert first.session is second.session
+        assert other.session is not first.session
+        assert 'Authorization' not in first.session.headers
+
+    def test_token_sent_per_request(self, client: SalesforceAPIClient, monkeypatch):
+        """Test the current access token is attached to each request."""
+        monkeypatch.setattr(client, '_simulate_rate_limit', lambda: False)
+        monkeypatch.setattr(client, '_simulate_error', lambda: None)
+        response = requests.Response()
+        response.status_code = 200
+        response._content = b'{}'
+        sent = []
+
+        def send(request, **kwargs):
+            sent.append(request.headers['Authorization'])
+            return response
+
+        with patch.object(client.session, 'send', side_effect=send):
+            client._make_request('limits')
+            client.access_token = 'rotated_token'
+            client._make_request('limits')
+
+        assert sent == ['Bearer mock_token', 'Bearer rotated_token']
+
+    def test_adapter_blocks_when_pool_is_full(self, client: SalesforceAPIClient):
+        """Test the adapter queues requests on a bounded pool and retries GETs only."""
+        adapter = client.session.get_adapter('https://example.my.salesforce.com')
+
+        assert adapter._pool_maxsize == SalesforceAPIClient.POOL_MAXSIZE
+        assert adapter._pool_block is True
+        assert adapter.max_retries.allowed_methods == frozenset(['GET'])
+
+
+class TestBuildSoqlQuery:
+    """Test cases for SOQL query construction."""
+
+    def test_default_fields_use_prebuilt_select(self, client: SalesforceAPIClient):
+        """Test default field queries match queries built from the same fields."""
+        fields = SalesforceAPIClient.DEFAULT_FIELDS['Contact']
+
+        assert client._build_soql_query('Contact', fields, "AccountId IN ('A1')") == (
+            client._build_soql_query('Contact', list(fields), "AccountId IN ('A1')")
+        )
+        assert client._build_soql_query('Contact', ['Id'], None) == (
+            'SELECT Id FROM Contact ORDER BY CreatedDate DESC'
+        )
+
+
+class TestTokenBucket:
+    """Test cases for the request rate limiter."""
+
+    @patch('src.salesforce.api_client.time.sleep')
+    @patch('src.salesforce.api_client.time.monotonic', return_value=100.0)
+    def test_burst_then_paced(self, mock_monotonic, mock_sleep):
+        """Test a full bucket allows a burst and later requests wait their turn."""
+        bucket = TokenBucket(rate=10, capacity=2)
+
+        bucket.acquire()
+        bucket.acquire()
+        mock_sleep.assert_not_called()
+
+        bucket.acquire()
+        bucket.acquire()
+        assert [c.args[0] for c in mock_sleep.call_args_list] == pytest.approx([0.1, 0.2])
+
+    @patch('src.salesforce.api_client.time.sleep')
+    @patch('src.salesforce.api_client.time.monotonic')
+    def test_refills_over_time(self, mock_monotonic, mock_sleep):
+        """Test tokens refill at the configured rate up to capacity."""
+        mock_monotonic.return_value = 100.0
+        bucket = TokenBucket(rate=10, capacity=2)
+        bucket.acquire()
+        bucket.acquire()
+
+        mock_monotonic.return_value = 105.0
+        bucket.acquire()
+        bucket.acquire()
+
+        mock_sleep.assert_not_called()
+
+    def test_client_without_delay_has_no_limiter(self):
+        """Test a zero rate_limit_delay disables rate limiting."""
+        assert SalesforceAPIClient(rate_limit_delay=0).rate_limiter is None
+        assert SalesforceAPIClient(rate_limit_delay=0.5).rate_limiter.rate == 2
+
+
+class TestSimulation:
+    """Test cases for simulated API failures."""
+
+    def test_seeded_clients_simulate_same_errors(self):
+        """Test clients with the same seed produce the same simulated errors."""
+        first = SalesforceAPIClient(seed=7)
+        second = SalesforceAPIClient(seed=7)
+
+        errors = [first._simulate_error(error_rate=0.5) for _ in range(50)]
+
+        assert errors == [second._simulate_error(error_rate=0.5) for _ in range(50)]
+        assert any(errors) and not all(errors)
+
+    def test_failed_request_logged(self, client: SalesforceAPIClient, monkeypatch, caplog):
+        """Test failed requests are logged with their traceback and re-raised."""
+        monkeypatch.setattr(client, '_simulate_rate_limit', lambda: False)
+        monkeypatch.setattr(client, '_simulate_error', lambda: None)
+
+        with patch.object(client.session, 'get', side_effect=requests.ConnectionError('down')):
+            with pytest.raises(requests.ConnectionError):
+                client._make_request('query')
+
+        assert caplog.records[-1].getMessage() == 'API request failed: down'
+        assert caplog.records[-1].exc_info is not None
+
+    def test_response_parsed_from_bytes(self, client: SalesforceAPIClient, monkeypatch):
+        """Test response bodies are decoded and invalid JSON raises a requests error."""
+        monkeypatch.setattr(client, '_simulate_rate_limit', lambda: False)
+        monkeypatch.setattr(client, '_simulate_error', lambda: None)
+        response = requests.Response()
+        response.status_code = 200
+
+        with patch.object(client.session, 'get', return_value=response):
+            response._content = '{"records": [{"Name": "Café"}]}'.encode('utf-8')
+            assert client._make_request('query') == {'records': [{'Name': 'Café'}]}
+
+            response._content = b'<html>'
+            with pytest.raises(requests.exceptions.RequestException):
+                client._make_request('query')
+
+
+class TestMockData:
+    """Test cases for the shared mock data."""
+
+    def test_generated_once_per_process(self, mock_generator):
+        """Test later clients reuse the first client's generated data."""
+        first = SalesforceAPIClient()
+        second = SalesforceAPIClient()
+
+        mock_generator.assert_called_once()
+        assert second._mock_data is first._mock_data
+
+    def test_reset_mock_data(self, mock_generator):
+        """Test resetting the cache makes the next client generate new data."""
+        SalesforceAPIClient()
+        SalesforceAPIClient.reset_mock_data()
+        SalesforceAPIClient()
+
+        assert mock_generator.call_count == 2
+
+
+class TestMockSalesforceAPI:
+    """Test cases for MockSalesforceAPI queries."""
+
+    @pytest.fixture
+    def contacts(self, mock_generator) -> list[dict[str, Any]]:
+        """Contacts served by the mock API, in generation order."""
+        contacts = [
+            {'id': 'c1', 'account_id': 'A1', 'created_date': '2025-01-01'},
+            {'id': 'c2', 'account_id': 'A2', 'created_date': '2025-03-01'},
+            {'id': 'c3', 'account_id': 'A1', 'created_date': '2025-02-01'},
+            {'id': 'c4', 'account_id': 'A3', 'created_date': '2025-04-01'},
+        ]
+        generator = mock_generator.return_value
+        generator.generate_accounts.return_value = []
+        generator.generate_contacts.return_value = contacts
+        generator.generate_opportunities.return_value = []
+        generator.generate_cases.return_value = []
+        return contacts
+
+    def test_queries_leave_shared_data_unchanged(self, contacts: list[dict[str, Any]]):
+        """Test ordered queries return copies instead of sorting shared data."""
+        api = MockSalesforceAPI()
+
+        result = api._make_request('query', {'q': 'SELECT Id FROM Contact ORDER BY CreatedDate DESC'})
+
+        assert [r['id'] for r in result['records']] == ['c4', 'c2', 'c3', 'c1']
+        assert [r['id'] for r in contacts] == ['c1', 'c2', 'c3', 'c4']
+
+    def test_account_filter_uses_index_order(self, contacts: list[dict[str, Any]]):
+        """Test account filtered queries return matching records newest first."""
+        api = MockSalesforceAPI()
+        query = api._build_soql_query('Contact', ['Id'], "AccountId IN ('A1', 'A3', 'A1')")
+
+        result = api._make_request('query', {'q': query})
+
+        assert [r['id'] for r in result['records']] == ['c4', 'c3', 'c1']
+
+    def test_account_filter_without_order(self, contacts: list[dict[str, Any]]):
+        """Test unordered account filtered queries keep generation order."""
+        api = MockSalesforceAPI()
+
+        result = api._make_request('query', {'q': "SELECT Id FROM Contact WHERE AccountId IN ('A1')"})
+
+        assert [r['id'] for r in result['records']] == ['c1', 'c3']
+
+    def test_limit_applies_after_order(self, contacts: list[dict[str, Any]]):
+        """Test LIMIT and the limit parameter keep the newest records."""
+        api = MockSalesforceAPI()
+        query = 'SELECT Id FROM Contact ORDER BY CreatedDate DESC'
+
+        limited = api._make_request('query', {'q': f'{query} LIMIT 3', 'limit': 2})
+        filtered = api._make_request('query', {
+            'q': api._build_soql_query('Contact', ['Id'], "AccountId IN ('A1', 'A2')"),
+            'limit': 2
+        })
+
+        assert [r['id'] for r in limited['records']] == ['c4', 'c2']
+        assert [r['id'] for r in filtered['records']] == ['c2', 'c3']
+
+
+class TestQueryAccountsPagination:
+    """Test cases for query_accounts pagination."""
+
+    @staticmethod
+    def _serve(client: SalesforceAPIClient, pages: dict[str, dict[str, Any]]) -> list[str]:
+        """Route _make_request to canned pages and record the endpoints requested."""
+        requested = []
+
+        def make_request(endpoint: str, params: Optional[dict[str, Any]] = None):
+            requested.append(endpoint)
+            return pages[endpoint]
+
+        client._make_request = make_request
+        return requested
+
+    def test_locator_pages_fetched_in_order(self, client: SalesforceAPIClient):
+        """Test remaining locator pages are derived from the first page and kept in order."""
+        requested = self._serve(client, {
+            'query': {
+                'records': _records(0, 2),
+                'totalSize': 5,
+                'nextRecordsUrl': LOCATOR_URL.format(2)
+            },
+            'query/01gD0000002HU6KIAW-2': {'records': _records(2, 2)},
+            'query/01gD0000002HU6KIAW-4': {'records': _records(4, 1)},
+        })
+
+        records = client.query_accounts(limit=10)
+
+        assert records == _records(0, 5)
+        assert sorted(requested[1:]) == ['query/01gD0000002HU6KIAW-2', 'query/01gD0000002HU6KIAW-4']
+
+    def test_limit_caps_pages_fetched(self, client: SalesforceAPIClient):
+        """Test pages beyond the record limit are not requested."""
+        requested = self._serve(client, {
+            'query': {
+                'records': _records(0, 2),
+                'totalSize': 100,
+                'nextRecordsUrl': LOCATOR_URL.format(2)
+            },
+            'query/01gD0000002HU6KIAW-2': {'records': _records(2, 2)},
+        })
+
+        records = client.query_accounts(limit=3)
+
+        assert records == _records(0, 3)
+        assert requested == ['query', 'query/01gD0000002HU6KIAW-2']
+
+    def test_other_next_urls_followed_sequentially(self, client: SalesforceAPIClient):
+        """Test next URLs that are not query locators are followed page by page."""
+        requested = self._serve(client, {
+            'query': {'records': _records(0, 2), 'nextRecordsUrl': '/services/data/v57.0/page-2'},
+            'page-2': {'records': _records(2, 2), 'nextRecordsUrl': '/services/data/v57.0/page-3'},
+            'page-3': {'records': _records(4, 2)},
+        })
+
+        records = client.query_accounts(limit=10)
+
+        assert records == _records(0, 6)
+        assert requested == ['query', 'page-2', 'page-3']
+
+    def test_next_url_query_string_decoded(self, client: SalesforceAPIClient):
+        """Test query strings in next URLs are passed on as decoded parameters."""
+        calls = []
+        pages = [
+            {
+                'records': _records(0, 1),
+                'nextRecordsUrl': 'https://example.my.salesforce.com/services/data/v57.0/query'
+                                  '?q=SELECT+Id+FROM+Account&offset=1'
+            },
+            {'records': _records(1, 1)},
+        ]
+
+        def make_request(endpoint: str, params: Optional[dict[str, Any]] = None):
+            calls.append((endpoint, params))
+            return pages[len(calls) - 1]
+
+        client._make_request = make_request
+
+        assert client.query_accounts(limit=10) == _records(0, 2)
+        assert calls[1] == ('query', {'q': 'SELECT Id FROM Account', 'offset': '1'})
+
+
+class TestInFilterChunking:
+    """Test cases for queries with long IN filters."""
+
+    def test_long_filter_split_and_merged_newest_first(
+        self,
+        client: SalesforceAPIClient,
+        monkeypatch
+    ):
+        """Test chunked queries run separately and their results merge by CreatedDate."""
+        monkeypatch.setattr(SalesforceAPIClient, 'SOQL_IN_CHUNK_SIZE', 2)
+        queries = []
+
+        def make_request(endpoint: str, params: Optional[dict[str, Any]] = None):
+            queries.append(params['q'])
+            dates = ['2025-03-01', '2025-01-01'] if "'A1'" in params['q'] else ['2025-02-01']
+            return {'records': [{'CreatedDate': date} for date in dates]}
+
+        client._make_request = make_request
+
+        records = client.query_contacts(limit=2, account_ids=['A1', 'A2', 'A3'])
+
+        where_clauses = sorted(q.split(' WHERE ')[1].split(' ORDER BY')[0] for q in queries)
+        assert where_clauses == ["AccountId IN ('A1', 'A2')", "AccountId IN ('A3')"]
+        assert [r['CreatedDate'] for r in records] == ['2025-03-01', '2025-02-01']
+
+    def test_chunk_results_follow_next_pages(self, client: SalesforceAPIClient, monkeypatch):
+        """Test each chunked query's later pages are fetched and merged in."""
+        monkeypatch.setattr(SalesforceAPIClient, 'SOQL_IN_CHUNK_SIZE', 1)
+
+        def make_request(endpoint: str, params: Optional[dict[str, Any]] = None):
+            if endpoint == 'query/A1-next':
+                return {'records': [{'CreatedDate': '2025-01-01'}]}
+            if "'A1'" in params['q']:
+                return {
+                    'records': [{'CreatedDate': '2025-03-01'}],
+                    'nextRecordsUrl': '/services/data/v57.0/query/A1-next'
+                }
+            return {'records': [{'CreatedDate': '2025-02-01'}]}
+
+        client._make_request = make_request
+
+        records = client.query_cases(limit=10, account_ids=['A1', 'A2'])
+
+        assert [r['CreatedDate'] for r in records] == ['2025-03-01', '2025-02-01', '2025-01-01']
+
+    def test_in_clause_values_escaped(self):
+        """Test quotes and backslashes in values cannot end the SOQL string."""
+        assert SalesforceAPIClient._in_clauses('AccountId', ["a'b", 'c\\', "a'b"]) == [
+            "AccountId IN ('a\\'b', 'c\\\\')"
+        ]
+
+
+class TestIterAccounts:
+    """Test cases for streaming account pages."""
+
+    def test_closing_stops_following_pages(self, client: SalesforceAPIClient):
+        """Test pages after the consumer stops are not requested."""
+        requested = TestQueryAccountsPagination._serve(client, {
+            'query': {'records': _records(0, 2), 'nextRecordsUrl': '/services/data/v57.0/page-2'},
+            'page-2': {'records': _records(2, 2), 'nextRecordsUrl': '/services/data/v57.0/page-3'},
+            'page-3': {'records': _records(4, 2)},
+        })
+
+        records = client.iter_accounts(limit=10)
+        first_three = [next(records) for _ in range(3)]
+        records.close()
+
+        assert first_three == _records(0, 3)
+        assert requested == ['query', 'page-2']
+
+    def test_parallel_pages_bounded_by_workers(self, client: SalesforceAPIClient):
+        """Test locator pages are requested at most max_page_workers ahead."""
+        client.max_page_workers = 1
+        pages = {
+            f'query/01gD0000002HU6KIAW-{offset}': {'records': _records(offset, 2)}
+            for offset in range(2, 10, 2)
+        }
+        pages['query'] = {
+            'records': _records(0, 2),
+            'totalSize': 10,
+            'nextRecordsUrl': LOCATOR_URL.format(2)
+        }
+        requested = TestQueryAccountsPagination._serve(client, pages)
+
+        records = client.iter_accounts(limit=10)
+        first_four = [next(records) for _ in range(4)]
+        records.close()
+
+        assert first_four == _records(0, 4)
+        assert len(requested) <= 3
+
+
+class TestObjectDescribes:
+    """Test cases for describing objects through the composite resource."""
+
+    @staticmethod
+    def _composite_response(payload: dict[str, Any]) -> dict[str, Any]:
+        """Answer every composite subrequest with a successful describe."""
+        return {'compositeResponse': [
+            {'body': {'name': sub['referenceId']}, 'httpHeaders': {},
+             'httpStatusCode': 200, 'referenceId': sub['referenceId']}
+            for sub in payload['compositeRequest']
+        ]}
+
+    def test_describes_share_composite_requests(self, client: SalesforceAPIClient):
+        """Test describes are batched into composite requests and keyed by object."""
+        names = [f'Object{i}__c' for i in range(30)]
+        payloads = []
+
+        def respond(endpoint, params=None, payload=None):
+            payloads.append(payload)
+            return self._composite_response(payload)
+
+        with patch.object(client, '_make_request', side_effect=respond) as mock_request:
+            describes = client.get_object_describes(names + names[:2])
+
+        assert [call.args[0] for call in mock_request.call_args_list] == ['composite'] * 2
+        assert [len(p['compositeRequest']) for p in payloads] == [25, 5]
+        assert payloads[0]['compositeRequest'][0] == {
+            'method': 'GET',
+            'url': '/services/data/v57.0/sobjects/Object0__c/describe',
+            'referenceId': 'Object0__c'
+        }
+        assert list(describes) == names
+        assert describes['Object29__c'] == {'name': 'Object29__c'}
+
+    def test_mock_composite_fans_out(self, mock_generator):
+        """Test the mock API answers composite describes and reports failures."""
+        generator = mock_generator.return_value
+        for method in ('accounts', 'contacts', 'opportunities', 'cases'):
+            getattr(generator, f'generate_{method}').return_value = []
+        api = MockSalesforceAPI()
+
+        describes = api.get_object_describes(['Account', 'Case'])
+
+        assert list(describes) == ['Account', 'Case']
+        assert describes['Case']['fields'][0] == {'name': 'Id'}
+        with pytest.raises(requests.exceptions.RequestException, match='NOT_FOUND describing Widget'):
+            api.get_object_describes(['Account', 'Widget'])
+
+    def test_describes_cached_per_client(self, client: SalesforceAPIClient):
+        """Test each object is described once per client across both methods."""
+        def respond(endpoint, params=None, payload=None):
+            if payload is None:
+                return {'name': endpoint.split('/')[1]}
+            return self._composite_response(payload)
+
+        with patch.object(client, '_make_request', side_effect=respond) as mock_request:
+            account = client.get_object_describe('Account')
+            assert client.get_object_describe('Account') is account
+
+            describes = client.get_object_describes(['Account', 'Contact'])
+            client.get_object_describes(['Contact'])
+
+        assert describes == {'Account': account, 'Contact': {'name': 'Contact'}}
+        assert mock_request.call_count == 2
+        composite = mock_request.call_args_list[1].kwargs['payload']['compositeRequest']
+        assert [sub['referenceId'] for sub in composite] == ['Contact']
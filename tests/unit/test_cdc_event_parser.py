@@ -10,7 +10,7 @@ from datetime import datetime, timezone
 from typing import Any
 from unittest.mock import Mock
 
-from pipelines.utils.cdc_event_parser import BeamCDCEventParser, CDCEventParser
+from pipelines.utils.cdc_event_parser import BeamCDCEventParser, CDCEventParser, _to_snake
 
 
 class TestCDCEventParserInitialization:
@@ -49,6 +49,23 @@ class TestPubSubMessageParsing:
         assert parser.parsed_count == 1
         assert parser.error_count == 0
 
+    def test_parse_pubsub_message_publish_time(self, sample_cdc_insert_event: dict[str, Any]):
+        """Test publish time is formatted as ISO 8601 for repeated values."""
+        parser = CDCEventParser()
+        publish_time = datetime(2025, 10, 30, 15, 30, 0, 123000, tzinfo=timezone.utc)
+
+        message = Mock()
+        message.data = json.dumps(sample_cdc_insert_event).encode('utf-8')
+        message.message_id = 'test-message-123'
+        message.publish_time = publish_time
+        message.attributes = None
+
+        first = parser.parse_pubsub_message(message)
+        second = parser.parse_pubsub_message(message)
+
+        assert first['_pubsub_publish_time'] == '2025-10-30T15:30:00.123000+00:00'
+        assert second['_pubsub_publish_time'] == first['_pubsub_publish_time']
+
     def test_parse_pubsub_message_invalid_json(self):
         """Test parsing fails gracefully with invalid JSON."""
         parser = CDCEventParser()
@@ -314,6 +331,25 @@ class TestFieldNameNormalization:
 
         assert normalized == record
 
+    def test_normalize_field_names_pascal_case(self):
+        """Test Salesforce PascalCase names lose the leading underscore."""
+        parser = CDCEventParser()
+
+        normalized = parser.normalize_field_names({'Id': '001ABC', 'LastModifiedDate': 'x'})
+
+        assert normalized == {'id': '001ABC', 'last_modified_date': 'x'}
+
+    def test_normalized_names_are_cached(self):
+        """Test repeated field names are converted once."""
+        parser = CDCEventParser()
+        _to_snake.cache_clear()
+
+        parser.normalize_field_names({'AccountId': 1})
+        parser.normalize_field_names({'AccountId': 2})
+
+        assert _to_snake.cache_info().hits == 1
+        assert _to_snake.cache_info().misses == 1
+
 
 class TestJSONFieldFormatting:
     """Test JSON field formatting."""
@@ -6,10 +6,11 @@ for Salesforce objects.
 """
 
 from datetime import datetime, timezone
+from unittest.mock import patch
 
 import pytest
 
-from src.salesforce.cdc_event_simulator import CDCEventSimulator
+from src.salesforce.cdc_event_simulator import CDCEventSimulator, _utc_now_iso
 
 
 class TestCDCEventSimulatorInitialization:
@@ -40,11 +41,11 @@ class TestCDCEventIDGeneration:
         event_id = simulator._generate_cdc_event_id()
 
         assert event_id.startswith('CDC-')
-        assert len(event_id) == 16  # 'CDC-' + 12 characters
+        assert len(event_id) == 20  # 'CDC-' + 16 characters
 
-        # Check characters after prefix are alphanumeric uppercase
+        # Check characters after prefix are uppercase hex digits
         chars = event_id[4:]
-        assert all(c.isalnum() and c.isupper() or c.isdigit() for c in chars)
+        assert all(c in '0123456789ABCDEF' for c in chars)
 
     def test_event_id_uniqueness(self):
         """Test generated event IDs are unique."""
@@ -55,76 +56,58 @@ class TestCDCEventIDGeneration:
         assert len(set(event_ids)) == 100
 
 
-class TestChangedFieldsDetection:
-    """Test changed fields detection."""
+class TestTimestamps:
+    """Test event timestamp formatting."""
 
-    def test_get_changed_fields_single_change(self):
-        """Test detection of single field change."""
-        simulator = CDCEventSimulator()
+    def test_utc_now_iso(self):
+        """Test timestamps are current UTC ISO 8601 with microseconds and a Z suffix."""
+        before = datetime.now(timezone.utc)
+        timestamp = _utc_now_iso()
+        after = datetime.now(timezone.utc)
 
-        before = {
-            'id': '001ABC123',
-            'name': 'Acme Corp',
-            'revenue': 1000000
-        }
-        after = {
-            'id': '001ABC123',
-            'name': 'Acme Corporation',
-            'revenue': 1000000
-        }
+        assert len(timestamp) == len('2025-10-30T10:00:00.000000Z')
+        assert timestamp.endswith('Z')
+        assert before <= datetime.fromisoformat(timestamp[:-1] + '+00:00') <= after
 
-        changed = simulator._get_changed_fields(before, after)
 
-        assert 'name' in changed
-        assert len(changed) == 1
+class TestChangedFieldsDetection:
+    """Test changed fields detection."""
 
-    def test_get_changed_fields_multiple_changes(self):
-        """Test detection of multiple field changes."""
+    @staticmethod
+    def _update_with_delta(delta: dict) -> dict:
+        """Generate an UPDATE event for a known record applying the given changes."""
         simulator = CDCEventSimulator()
-
-        before = {
+        simulator._store_record('Account', {
             'id': '001ABC123',
             'name': 'Acme Corp',
             'revenue': 1000000,
-            'phone': '555-0100'
-        }
-        after = {
-            'id': '001ABC123',
-            'name': 'Acme Corporation',
-            'revenue': 1200000,
-            'phone': '555-0100'
-        }
+            'phone': '555-0100',
+            'system_modstamp': '2025-10-30T10:00:00Z'
+        })
+        simulator._compute_update_delta = lambda record, object_type: delta
+        return simulator.generate_update_event('Account', '001ABC123')
 
-        changed = simulator._get_changed_fields(before, after)
+    def test_changed_fields_single_change(self):
+        """Test detection of single field change."""
+        event = self._update_with_delta({'name': 'Acme Corporation'})
 
-        assert 'name' in changed
-        assert 'revenue' in changed
-        assert 'phone' not in changed
-        assert len(changed) == 2
+        assert event['changed_fields'] == ['name']
 
-    def test_get_changed_fields_ignores_metadata(self):
-        """Test metadata fields are ignored in change detection."""
-        simulator = CDCEventSimulator()
+    def test_changed_fields_skip_unchanged_values(self):
+        """Test modified fields whose value did not change are not reported."""
+        event = self._update_with_delta({'name': 'Acme Corporation', 'revenue': 1200000, 'phone': '555-0100'})
 
-        before = {
-            'id': '001ABC123',
-            'name': 'Acme Corp',
-            'ingestion_timestamp': '2025-10-30T10:00:00Z',
-            'system_modstamp': '2025-10-30T10:00:00Z'
-        }
-        after = {
-            'id': '001ABC123',
-            'name': 'Acme Corp',
+        assert sorted(event['changed_fields']) == ['name', 'revenue']
+
+    def test_changed_fields_ignore_metadata(self):
+        """Test metadata fields are ignored in change detection."""
+        event = self._update_with_delta({
             'ingestion_timestamp': '2025-10-30T11:00:00Z',
             'system_modstamp': '2025-10-30T11:00:00Z'
-        }
+        })
 
-        changed = simulator._get_changed_fields(before, after)
-
-        # Metadata changes should be ignored
-        assert 'ingestion_timestamp' not in changed
-        assert 'system_modstamp' not in changed
-        assert len(changed) == 0
+        assert event['changed_fields'] == []
+        assert event['after']['system_modstamp'] == '2025-10-30T11:00:00Z'
 
 
 class TestRecordModification:
@@ -144,7 +127,12 @@ class TestRecordModification:
             'system_modstamp': '2025-10-30T10:00:00Z'
         }
 
-        modified = simulator._modify_record_for_update(original, 'Account')
+        snapshot = dict(original)
+        delta = simulator._compute_update_delta(original, 'Account')
+        modified = {**original, **delta}
+
+        # Check the record itself is left untouched
+        assert original == snapshot
 
         # Check timestamps are updated
         assert modified['last_modified_date'] != original['last_modified_date']
@@ -169,7 +157,7 @@ class TestRecordModification:
             'last_modified_date': '2025-10-30T10:00:00Z'
         }
 
-        modified = simulator._modify_record_for_update(original, 'Contact')
+        modified = {**original, **simulator._compute_update_delta(original, 'Contact')}
 
         # Check timestamps are updated
         assert modified['last_modified_date'] != original['last_modified_date']
@@ -224,6 +212,18 @@ class TestInsertEventGeneration:
         assert record_id in simulator._existing_records['Account']
         assert simulator._existing_records['Account'][record_id] == event['after']
 
+    def test_generate_insert_events_share_generator_batch(self):
+        """Test inserts draw from one batch of generated records."""
+        simulator = CDCEventSimulator()
+        generator = simulator.data_generator
+
+        with patch.object(generator, 'generate_contacts', wraps=generator.generate_contacts) as generate:
+            events = [simulator.generate_insert_event('Contact') for _ in range(3)]
+
+        generate.assert_called_once()
+        assert generate.call_args.kwargs['count'] == CDCEventSimulator.INSERT_POOL_SIZE
+        assert len({e['record_id'] for e in events}) == 3
+
 
 class TestUpdateEventGeneration:
     """Test UPDATE event generation."""
@@ -291,6 +291,22 @@ class TestUpdateEventGeneration:
         assert after_state != before_state
         assert after_state == update_event['after']
 
+    def test_generate_update_event_keeps_before_state(self):
+        """Test UPDATE events keep the prior state and report only changed fields."""
+        simulator = CDCEventSimulator()
+
+        insert_event = simulator.generate_insert_event('Account')
+        snapshot = dict(insert_event['after'])
+
+        update_event = simulator.generate_update_event('Account', insert_event['record_id'])
+
+        assert update_event['before'] == snapshot
+        assert sorted(update_event['changed_fields']) == sorted(
+            field for field in update_event['after']
+            if field not in CDCEventSimulator.METADATA_FIELDS
+            and update_event['after'][field] != snapshot[field]
+        )
+
 
 class TestDeleteEventGeneration:
     """Test DELETE event generation."""
@@ -420,6 +436,42 @@ class TestBatchEventGeneration:
         assert 'INSERT' in event_types
         # UPDATE and DELETE might not appear if distribution results in 0 events
 
+    def test_iter_cdc_events_is_lazy(self):
+        """Test events are only built as the iterator is consumed."""
+        simulator = CDCEventSimulator()
+
+        events = simulator.iter_cdc_events(
+            'Account',
+            event_count=5,
+            event_distribution={'INSERT': 1.0}
+        )
+
+        assert simulator.get_existing_record_count('Account') == 0
+        assert len(list(events)) == 5
+        assert simulator.get_existing_record_count('Account') == 5
+
+    def test_iter_cdc_events_validates_distribution_eagerly(self):
+        """Test an invalid distribution fails before iteration starts."""
+        simulator = CDCEventSimulator()
+
+        with pytest.raises(ValueError, match="must sum to 1.0"):
+            simulator.iter_cdc_events('Account', event_distribution={'INSERT': 0.5})
+
+    def test_generate_cdc_events_preloads_empty_store(self):
+        """Test planned UPDATE and DELETE events are kept on a fresh simulator."""
+        simulator = CDCEventSimulator()
+
+        events = simulator.generate_cdc_events(
+            'Account',
+            event_count=20,
+            event_distribution={'INSERT': 0.0, 'UPDATE': 0.5, 'DELETE': 0.5}
+        )
+
+        event_types = [e['event_type'] for e in events]
+        assert event_types.count('UPDATE') == 10
+        assert event_types.count('DELETE') == 10
+        assert simulator.get_existing_record_count('Account') == 10
+
 
 class TestRecordManagement:
     """Test record storage management."""
@@ -477,6 +529,25 @@ class TestRecordManagement:
         assert simulator.get_existing_record_count('Contact') == 0
         assert simulator.get_existing_record_count('Opportunity') == 0
 
+    def test_record_ids_track_stored_records(self):
+        """Test the ID list and positions follow inserts, deletes and clears."""
+        simulator = CDCEventSimulator()
+        simulator.preload_existing_records('Account', count=10)
+
+        for _ in range(6):
+            simulator.generate_delete_event('Account')
+            ids = simulator._record_ids['Account']
+            assert sorted(ids) == sorted(simulator._existing_records['Account'])
+            assert all(
+                ids[position] == record_id
+                for record_id, position in simulator._record_positions['Account'].items()
+            )
+
+        simulator.clear_existing_records('Account')
+
+        assert simulator._record_ids['Account'] == []
+        assert simulator._record_positions['Account'] == {}
+
 
 class TestEventTimestamps:
     """Test event timestamp handling."""
@@ -11,6 +11,7 @@ from unittest.mock import Mock, patch
 
 import pytest
 
+from pipelines.utils import json_codec
 from src.salesforce.cdc_publisher import CDCEventPublisher
 
 
@@ -57,6 +58,20 @@ class TestCDCEventPublisherInitialization:
         assert publisher.project_id == 'test-project'
         mock_publisher_class.assert_called_once()
 
+    @patch('src.salesforce.cdc_publisher.pubsub_v1.PublisherClient')
+    def test_initialization_default_flow_control(self, mock_publisher_class):
+        """Test the default client batches up to the Pub/Sub limits and blocks when full."""
+        from google.cloud import pubsub_v1
+
+        CDCEventPublisher(project_id='test-project', topic_name='test-topic')
+
+        batch_settings, publisher_options = mock_publisher_class.call_args[0]
+        assert batch_settings.max_messages == 1000
+        assert batch_settings.max_bytes == 8 * 1024 * 1024
+        flow_control = publisher_options.flow_control
+        assert flow_control.message_limit == 10000
+        assert flow_control.limit_exceeded_behavior == pubsub_v1.types.LimitExceededBehavior.BLOCK
+
     @patch('src.salesforce.cdc_publisher.pubsub_v1.PublisherClient')
     def test_topic_path_construction(self, mock_publisher_class):
         """Test topic path is correctly constructed."""
@@ -99,10 +114,27 @@ class TestMessageSerialization:
         publisher = CDCEventPublisher('test-project', 'test-topic')
         attributes = publisher._create_message_attributes(sample_cdc_update_event)
 
+        assert attributes['event_id'] == sample_cdc_update_event['event_id']
         assert attributes['event_type'] == 'UPDATE'
         assert attributes['object_type'] == 'Account'
         assert attributes['source'] == 'salesforce_cdc'
-        assert 'event_timestamp' in attributes
+        assert attributes['event_timestamp'] == sample_cdc_update_event['event_timestamp']
+
+    @pytest.mark.parametrize('field', ['event_id', 'event_timestamp'])
+    @patch('src.salesforce.cdc_publisher.pubsub_v1.PublisherClient')
+    def test_create_message_attributes_requires_dedup_fields(
+        self,
+        mock_publisher_class,
+        field,
+        sample_cdc_update_event: dict[str, Any]
+    ):
+        """Test events without an ID or timestamp are rejected instead of sent with empty attributes."""
+        publisher = CDCEventPublisher('test-project', 'test-topic')
+        event = dict(sample_cdc_update_event)
+        del event[field]
+
+        with pytest.raises(ValueError, match=field):
+            publisher._create_message_attributes(event)
 
     @patch('src.salesforce.cdc_publisher.pubsub_v1.PublisherClient')
     def test_serialize_event_with_complex_data(self, mock_publisher_class):
@@ -124,6 +156,30 @@ class TestMessageSerialization:
         assert isinstance(serialized, bytes)
         # Should not raise error
 
+    @pytest.mark.parametrize('use_orjson', [True, False])
+    @patch('src.salesforce.cdc_publisher.pubsub_v1.PublisherClient')
+    def test_serialize_event_dates_match_across_backends(
+        self,
+        mock_publisher_class,
+        use_orjson,
+        monkeypatch
+    ):
+        """Test dates are written as ISO 8601 whichever JSON backend is used."""
+        if not use_orjson:
+            monkeypatch.setattr(json_codec, 'orjson', None)
+        from datetime import date, datetime, timezone
+
+        publisher = CDCEventPublisher('test-project', 'test-topic')
+        serialized = publisher._serialize_event({
+            'timestamp': datetime(2025, 10, 30, 10, 0, 0, 5, tzinfo=timezone.utc),
+            'day': date(2025, 10, 30)
+        })
+
+        assert json.loads(serialized) == {
+            'timestamp': '2025-10-30T10:00:00.000005+00:00',
+            'day': '2025-10-30'
+        }
+
 
 class TestSingleEventPublishing:
     """Test publishing single events."""
@@ -223,6 +279,40 @@ class TestBatchEventPublishing:
         assert stats['failed'] == 0
         assert publisher.published_count == 2
 
+    @patch('src.salesforce.cdc_publisher.pubsub_v1.PublisherClient')
+    def test_publish_events_skips_event_without_id(self, mock_publisher_class, sample_cdc_events_batch):
+        """Test an event without an ID is counted as failed and never published."""
+        mock_client = Mock()
+        mock_future = Mock()
+        mock_future.result.return_value = 'msg-id'
+        mock_client.publish.return_value = mock_future
+        mock_publisher_class.return_value = mock_client
+        events = [dict(sample_cdc_events_batch[0], event_id=None), sample_cdc_events_batch[1]]
+
+        publisher = CDCEventPublisher('test-project', 'test-topic')
+        stats = publisher.publish_events(events)
+
+        assert mock_client.publish.call_count == 1
+        assert stats['successful'] == 1
+        assert stats['failed'] == 1
+        assert publisher.failed_count == 1
+
+    @patch('src.salesforce.cdc_publisher.pubsub_v1.PublisherClient')
+    def test_publish_events_from_iterator(self, mock_publisher_class, sample_cdc_events_batch):
+        """Test a one-shot iterator of events is published and counted."""
+        mock_client = Mock()
+        mock_future = Mock()
+        mock_future.result.return_value = 'msg-id'
+        mock_client.publish.return_value = mock_future
+        mock_publisher_class.return_value = mock_client
+
+        publisher = CDCEventPublisher('test-project', 'test-topic')
+        stats = publisher.publish_events(iter(sample_cdc_events_batch))
+
+        assert stats['total_events'] == 2
+        assert stats['successful'] == 2
+        assert mock_client.publish.call_count == 2
+
     @patch('src.salesforce.cdc_publisher.pubsub_v1.PublisherClient')
     def test_publish_events_mixed_results(self, mock_publisher_class, sample_cdc_events_batch):
         """Test mixed success/failure in batch."""
@@ -296,13 +386,38 @@ class TestBatchEventPublishing:
         assert stats['failed'] == 2
         assert stats['successful'] == 0
 
+    @patch('src.salesforce.cdc_publisher.time.monotonic')
+    @patch('src.salesforce.cdc_publisher.pubsub_v1.PublisherClient')
+    def test_publish_events_timeout_covers_batch(
+        self,
+        mock_publisher_class,
+        mock_monotonic,
+        sample_cdc_events_batch
+    ):
+        """Test each wait only gets the time left of the batch timeout."""
+        mock_client = Mock()
+        futures = [Mock(), Mock()]
+        for future in futures:
+            future.result.return_value = 'msg-id'
+        mock_client.publish.side_effect = futures
+        mock_publisher_class.return_value = mock_client
+        mock_monotonic.side_effect = [100.0, 100.0, 145.0]
+
+        publisher = CDCEventPublisher('test-project', 'test-topic')
+        stats = publisher.publish_events(sample_cdc_events_batch, timeout=60.0)
+
+        futures[0].result.assert_called_once_with(timeout=60.0)
+        futures[1].result.assert_called_once_with(timeout=15.0)
+        assert stats['successful'] == 2
+
 
 class TestRateLimitedPublishing:
     """Test rate-limited publishing."""
 
     @patch('src.salesforce.cdc_publisher.pubsub_v1.PublisherClient')
+    @patch('src.salesforce.cdc_publisher.time.monotonic', return_value=0.0)
     @patch('time.sleep')
-    def test_rate_limiting_enforcement(self, mock_sleep, mock_publisher_class, sample_cdc_events_batch):
+    def test_rate_limiting_enforcement(self, mock_sleep, mock_monotonic, mock_publisher_class, sample_cdc_events_batch):
         """Test rate limiting is enforced."""
         mock_client = Mock()
         mock_future = Mock()
@@ -323,8 +438,9 @@ class TestRateLimitedPublishing:
         mock_sleep.assert_called_with(0.1)  # 1/10 = 0.1
 
     @patch('src.salesforce.cdc_publisher.pubsub_v1.PublisherClient')
+    @patch('src.salesforce.cdc_publisher.time.monotonic', return_value=0.0)
     @patch('time.sleep')
-    def test_rate_limiting_timing(self, mock_sleep, mock_publisher_class, sample_cdc_events_batch):
+    def test_rate_limiting_timing(self, mock_sleep, mock_monotonic, mock_publisher_class, sample_cdc_events_batch):
         """Test timing between events."""
         mock_client = Mock()
         mock_future = Mock()
@@ -363,6 +479,36 @@ class TestRateLimitedPublishing:
         assert stats['total_published'] == 2
         assert stats['total_failed'] == 0
 
+    @patch('src.salesforce.cdc_publisher.pubsub_v1.PublisherClient')
+    @patch('src.salesforce.cdc_publisher.time.monotonic')
+    @patch('time.sleep')
+    def test_rate_limiting_counts_publish_time(
+        self,
+        mock_sleep,
+        mock_monotonic,
+        mock_publisher_class,
+        sample_cdc_events_batch
+    ):
+        """Test time spent publishing is taken off the next sleep and results are awaited last."""
+        mock_client = Mock()
+        mock_future = Mock()
+        mock_future.result.return_value = 'msg-id'
+        mock_client.publish.return_value = mock_future
+        mock_publisher_class.return_value = mock_client
+        # Schedule start, first slot, second slot 0.3s later, then result deadlines
+        mock_monotonic.side_effect = [10.0, 10.0, 10.3, 10.3, 10.3, 10.3]
+
+        publisher = CDCEventPublisher('test-project', 'test-topic')
+        stats = publisher.publish_events_with_rate_limit(
+            sample_cdc_events_batch,
+            events_per_second=2
+        )
+
+        assert mock_sleep.call_count == 1
+        assert mock_sleep.call_args[0][0] == pytest.approx(0.2)
+        assert mock_future.result.call_count == 2
+        assert stats['successful'] == 2
+
 
 class TestStatisticsAndCleanup:
     """Test statistics and cleanup operations."""
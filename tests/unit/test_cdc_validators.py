@@ -5,7 +5,9 @@ Tests data quality validation rules for CDC events including type validation,
 null checks, format validation, and error tracking.
 """
 
+from datetime import datetime, timedelta, timezone
 from typing import Any
+from unittest.mock import patch
 
 from pipelines.utils.cdc_validators import CDCValidator
 
@@ -103,6 +105,17 @@ class TestCDCValidator:
         assert is_valid is False
         assert 'Missing required field: record_id' in error
 
+    def test_is_salesforce_id_matches_pattern(self):
+        """Test the ID check agrees with SALESFORCE_ID_PATTERN."""
+        values = [
+            '001000000000001', '001000000000001AAA', '001000000000001AAAA',
+            '00100000000000', '001-00000000001AAA', '00100000000000éAA',
+            '00100000000000１AA', 123456789012345, ''
+        ]
+        for value in values:
+            expected = bool(CDCValidator.SALESFORCE_ID_PATTERN.match(str(value)))
+            assert CDCValidator.is_salesforce_id(value) is expected, value
+
     def test_validate_timestamp_format_valid(self, sample_cdc_insert_event: dict[str, Any]):
         """Test validation of valid timestamp format."""
         validator = CDCValidator()
@@ -134,6 +147,20 @@ class TestCDCValidator:
         assert is_valid is False
         assert 'in the future' in error
 
+    def test_validate_timestamp_reference_time(self):
+        """Test events newer than a stale reference time are not rejected as future."""
+        validator = CDCValidator()
+        now = datetime.now(timezone.utc)
+        validator.reference_time = now - timedelta(minutes=5)
+
+        recent = {'event_timestamp': (now - timedelta(minutes=1)).isoformat()}
+        assert validator.validate_timestamp_format(recent) == (True, None)
+
+        future = {'event_timestamp': (now + timedelta(days=1)).isoformat()}
+        is_valid, error = validator.validate_timestamp_format(future)
+        assert is_valid is False
+        assert 'in the future' in error
+
     def test_validate_null_required_fields_insert_valid(self, sample_cdc_insert_event: dict[str, Any]):
         """Test null validation for valid INSERT event."""
         validator = CDCValidator()
@@ -304,6 +331,187 @@ class TestCDCValidator:
         assert validator.validation_stats['valid'] == 0
         assert validator.validation_stats['invalid'] == 1
 
+    def test_validate_event_reports_record_errors_in_order(
+        self,
+        sample_cdc_update_event: dict[str, Any]
+    ):
+        """Test record checks report null, type and foreign key errors in that order."""
+        validator = CDCValidator()
+        event = dict(sample_cdc_update_event, object_type='Contact')
+        event['after'] = {'id': None, 'account_id': 'bad-fk', 'email': 42}
+        event['before'] = {'email': ['x']}
+
+        is_valid, errors = validator.validate_event(event)
+
+        assert is_valid is False
+        assert errors == [
+            "Required field 'id' is null or missing in 'after' data",
+            "Required field 'first_name' is null or missing in 'after' data",
+            "Required field 'last_name' is null or missing in 'after' data",
+            "Required field 'created_date' is null or missing in 'after' data",
+            "Required field 'last_modified_date' is null or missing in 'after' data",
+            "Field 'email' has wrong type in 'after': "
+            "expected (<class 'str'>, <class 'NoneType'>), got int",
+            "Field 'email' has wrong type in 'before': "
+            "expected (<class 'str'>, <class 'NoneType'>), got list",
+            "Foreign key 'account_id' has invalid format: 'bad-fk'",
+        ]
+        assert {'null_fields', 'field_types', 'foreign_keys'} <= set(
+            validator.validation_stats['error_types']
+        )
+
+    def test_individual_rules_split_record_errors(self, sample_cdc_update_event: dict[str, Any]):
+        """Test each record validator reports only its own kind of error."""
+        validator = CDCValidator()
+        event = dict(sample_cdc_update_event, object_type='Contact')
+        event['after'] = {'id': None, 'account_id': 'bad-fk', 'email': 42}
+
+        null_valid, null_errors = validator.validate_null_required_fields(event)
+        type_valid, type_errors = validator.validate_field_types(event)
+        fk_valid, fk_errors = validator.validate_foreign_keys(event)
+
+        assert (null_valid, type_valid, fk_valid) == (False, False, False)
+        assert all('null or missing' in error for error in null_errors)
+        assert type_errors == [
+            "Field 'email' has wrong type in 'after': "
+            "expected (<class 'str'>, <class 'NoneType'>), got int"
+        ]
+        assert fk_errors == ["Foreign key 'account_id' has invalid format: 'bad-fk'"]
+
+    def test_validate_event_empty_after_reports_required_fields(
+        self,
+        sample_cdc_update_event: dict[str, Any]
+    ):
+        """Test empty 'after' data reports every required field, then missing 'before'."""
+        validator = CDCValidator()
+        event = dict(sample_cdc_update_event, after={}, before=None)
+
+        is_valid, errors = validator.validate_null_required_fields(event)
+
+        assert is_valid is False
+        assert errors == [
+            f"Required field '{field}' is null or missing in 'after' data"
+            for field in CDCValidator.REQUIRED_FIELDS['Account']
+        ] + ["Missing 'before' data for UPDATE event"]
+
+    def test_validate_event_accepts_subclass_and_secondary_types(
+        self,
+        sample_cdc_update_event: dict[str, Any]
+    ):
+        """Test values that are not the primary expected type still pass isinstance."""
+        validator = CDCValidator()
+        event = dict(sample_cdc_update_event, object_type='Opportunity')
+        event['after'] = {
+            'id': '006000000000001AAA',
+            'name': 'Deal',
+            'stage_name': 'Prospecting',
+            'amount': 1500.5,  # float, second expected type
+            'probability': True,  # bool subclasses int
+            'created_date': '2025-01-01T00:00:00Z',
+            'last_modified_date': '2025-01-01T00:00:00Z'
+        }
+        event['before'] = dict(event['after'], amount=1500)
+
+        assert validator._validate_record_fields(
+            'Opportunity', 'UPDATE', event['after'], event['before']
+        )[1] == []
+
+    def test_validate_event_early_exit(self):
+        """Test early exit reports only the first failing rule."""
+        validator = CDCValidator()
+        event = {
+            'event_type': 'INVALID',
+            'object_type': 'InvalidObject',
+            'record_id': 'bad-id',
+            'event_timestamp': 'bad-timestamp'
+        }
+        is_valid, errors = validator.validate_event(event, early_exit=True)
+        assert is_valid is False
+        assert len(errors) == 1
+        assert 'Invalid event_type' in errors[0]
+        assert validator.validation_stats['error_types'] == {'event_type': 1}
+
+    def test_early_exit_checks_most_failing_rule_first(self, sample_cdc_insert_event: dict[str, Any]):
+        """Test rules are re-sorted by failure count every reorder interval."""
+        validator = CDCValidator(reorder_interval=2)
+        event = dict(sample_cdc_insert_event, record_id='bad-id', event_timestamp='bad-timestamp')
+
+        # Static order checks record_id before event_timestamp
+        _, errors = validator.validate_event(event, early_exit=True)
+        assert errors[0].startswith('Invalid record_id')
+
+        # Timestamp failures now outnumber record_id failures
+        validator.validate_event(dict(sample_cdc_insert_event, event_timestamp='bad'))
+        validator.validate_event(dict(sample_cdc_insert_event, event_timestamp='bad'))
+
+        _, errors = validator.validate_event(event, early_exit=True)
+        assert errors[0].startswith('Invalid event_timestamp')
+
+        validator.reset_statistics()
+        _, errors = validator.validate_event(event, early_exit=True)
+        assert errors[0].startswith('Invalid record_id')
+
+    def test_duplicate_event_skips_event_level_checks(self, sample_cdc_insert_event: dict[str, Any]):
+        """Test a repeat of a valid event skips timestamp parsing but still checks its record."""
+        validator = CDCValidator(cache_size=16)
+        validator.reference_time = datetime.now(timezone.utc)
+        assert validator.validate_event(sample_cdc_insert_event)[0] is True
+
+        with patch('pipelines.utils.cdc_validators.datetime', wraps=datetime) as mock_datetime:
+            assert validator.validate_event(sample_cdc_insert_event)[0] is True
+            is_valid, errors = validator.validate_event(
+                dict(sample_cdc_insert_event, after=dict(sample_cdc_insert_event['after'], name=None))
+            )
+
+        mock_datetime.fromisoformat.assert_not_called()
+        assert is_valid is False
+        assert errors == ["Required field 'name' is null or missing in 'after' data"]
+
+    def test_passed_event_cache_survives_reference_time(self, sample_cdc_insert_event: dict[str, Any]):
+        """Test cached events outlive a new reference time but re-check their timestamp's age."""
+        validator = CDCValidator(cache_size=16)
+        validator.reference_time = datetime.now(timezone.utc)
+        validator.validate_event(sample_cdc_insert_event)
+
+        validator.reference_time = datetime.now(timezone.utc)
+        assert len(validator._passed_events) == 1
+
+        later = datetime(2025, 10, 30, tzinfo=timezone.utc) + timedelta(days=400)
+        with patch('pipelines.utils.cdc_validators.datetime', wraps=datetime) as mock_datetime:
+            mock_datetime.now.return_value = later
+            validator.reference_time = later
+            is_valid, errors = validator.validate_event(sample_cdc_insert_event, early_exit=True)
+
+        mock_datetime.fromisoformat.assert_not_called()
+        assert is_valid is False
+        assert errors[0].startswith('event_timestamp is too old')
+        assert validator.validation_stats['error_types']['timestamp'] == 1
+
+    def test_passed_event_cache_without_reference_time(self, sample_cdc_insert_event: dict[str, Any]):
+        """Test the cache is used when timestamps are checked against the clock."""
+        validator = CDCValidator(cache_size=16)
+        validator.validate_event(sample_cdc_insert_event)
+
+        with patch('pipelines.utils.cdc_validators.datetime', wraps=datetime) as mock_datetime:
+            assert validator.validate_event(sample_cdc_insert_event)[0] is True
+
+        mock_datetime.fromisoformat.assert_not_called()
+
+    def test_passed_event_cache_evicts_least_recent(self, sample_cdc_insert_event: dict[str, Any]):
+        """Test the cache keeps only the most recently seen valid events."""
+        validator = CDCValidator(cache_size=2)
+        validator.reference_time = datetime.now(timezone.utc)
+        events = [
+            dict(sample_cdc_insert_event, record_id=f'00100000000000{i}AAA') for i in range(3)
+        ]
+
+        for event in (events[0], events[1], events[0], events[2]):
+            validator.validate_event(event)
+
+        assert [key[2] for key in validator._passed_events] == [
+            events[0]['record_id'], events[2]['record_id']
+        ]
+
     def test_get_error_rate_no_events(self):
         """Test error rate calculation with no events."""
         validator = CDCValidator()
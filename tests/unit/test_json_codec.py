@@ -0,0 +1,109 @@
+"""
+Unit tests for JSON Codec.
+
+Tests the JSON encode/decode helpers used on pipeline hot paths, with both
+the orjson backend and the standard library fallback.
+"""
+
+import json
+
+import pytest
+
+from pipelines.utils import json_codec
+
+
+@pytest.fixture(params=['orjson', 'stdlib'])
+def codec_backend(request, monkeypatch):
+    """Run each test against both JSON backends."""
+    if request.param == 'orjson':
+        if json_codec.orjson is None:
+            pytest.skip('orjson not installed')
+    else:
+        monkeypatch.setattr(json_codec, 'orjson', None)
+    return request.param
+
+
+class TestLoads:
+    """Test JSON decoding."""
+
+    def test_loads_bytes(self, codec_backend):
+        """Test parsing bytes without decoding first."""
+        assert json_codec.loads(b'{"event_id": "evt-1", "count": 2}') == {
+            'event_id': 'evt-1',
+            'count': 2
+        }
+
+    def test_loads_str(self, codec_backend):
+        """Test parsing str input."""
+        assert json_codec.loads('["a", "b"]') == ['a', 'b']
+
+    def test_loads_utf8_bytes(self, codec_backend):
+        """Test parsing non-ASCII UTF-8 bytes."""
+        assert json_codec.loads('{"name": "Café"}'.encode()) == {'name': 'Café'}
+
+    def test_loads_invalid_raises_json_decode_error(self, codec_backend):
+        """Test malformed input raises a json.JSONDecodeError subclass."""
+        with pytest.raises(json.JSONDecodeError):
+            json_codec.loads(b'invalid json {{')
+
+    def test_decode_error_alias(self, codec_backend):
+        """Test the exported error type matches the stdlib error."""
+        with pytest.raises(json_codec.JSONDecodeError):
+            json_codec.loads(b'{')
+
+
+class TestDumps:
+    """Test JSON encoding."""
+
+    def test_dumps_returns_compact_str(self, codec_backend):
+        """Test dumps returns a compact JSON string."""
+        result = json_codec.dumps({'a': 1, 'b': [1, 2]})
+
+        assert isinstance(result, str)
+        assert result == '{"a":1,"b":[1,2]}'
+
+    def test_dumps_bytes_returns_bytes(self, codec_backend):
+        """Test dumps_bytes returns compact UTF-8 bytes."""
+        result = json_codec.dumps_bytes({'name': 'Café', 'n': [1, 2]})
+
+        assert isinstance(result, bytes)
+        assert json.loads(result) == {'name': 'Café', 'n': [1, 2]}
+        assert json_codec.dumps_bytes({'n': [1, 2]}) == b'{"n":[1,2]}'
+
+    def test_dumps_bytes_big_int(self, codec_backend):
+        """Test dumps_bytes serializes integers beyond 64 bits exactly."""
+        assert json_codec.dumps_bytes({'n': 2 ** 70}) == b'{"n":1180591620717411303424}'
+
+    def test_dumps_default_callable(self, codec_backend):
+        """Test default callable handles unsupported types."""
+        class Custom:
+            def __str__(self):
+                return 'custom'
+
+        assert json.loads(json_codec.dumps({'v': Custom()}, default=str)) == {'v': 'custom'}
+
+    def test_dumps_non_str_keys(self, codec_backend):
+        """Test non-str keys are converted to strings."""
+        assert json_codec.dumps({1: 'a', 'nested': {2: 'b'}}) == '{"1":"a","nested":{"2":"b"}}'
+
+    def test_dumps_big_int(self, codec_backend):
+        """Test integers beyond 64 bits are serialized exactly."""
+        assert json_codec.dumps({'n': 2 ** 70}) == '{"n":1180591620717411303424}'
+
+    def test_dumps_unserializable_raises_type_error(self, codec_backend):
+        """Test unsupported values without a default still raise TypeError."""
+        with pytest.raises(TypeError):
+            json_codec.dumps({'v': object()})
+
+    def test_dumps_nan_is_null_with_orjson(self):
+        """Test orjson writes NaN as null instead of a non-standard token."""
+        if json_codec.orjson is None:
+            pytest.skip('orjson not installed')
+
+        assert json_codec.dumps({'x': float('nan')}) == '{"x":null}'
+
+    def test_round_trip(self, codec_backend):
+        """Test values survive a dumps/loads round trip."""
+        value = {'id': '001', 'tags': ['x', 'y'], 'nested': {'n': None, 'ok': True}}
+
+        assert json_codec.loads(json_codec.dumps(value)) == value
@@ -0,0 +1,100 @@
+"""
+Unit tests for DoFn Profiling.
+
+Tests the ProfiledDoFn wrapper, covering output pass-through, lifecycle
+delegation and sampled timing metrics.
+"""
+
+from unittest.mock import Mock, patch
+
+import apache_beam as beam
+from apache_beam.pvalue import TaggedOutput
+
+from pipelines.utils.profiling import ProfiledDoFn
+
+
+class RecordingDoFn(beam.DoFn):
+    """DoFn that records lifecycle calls and emits tagged outputs."""
+
+    def __init__(self):
+        """Initialize call log."""
+        self.calls = []
+
+    def setup(self):
+        """Record setup."""
+        self.calls.append('setup')
+
+    def start_bundle(self):
+        """Record bundle start."""
+        self.calls.append('start_bundle')
+
+    def process(self, element):
+        """Emit a main and a tagged output."""
+        yield element * 2
+        yield TaggedOutput('extra', element)
+
+    def finish_bundle(self):
+        """Record bundle finish."""
+        self.calls.append('finish_bundle')
+
+    def teardown(self):
+        """Record teardown."""
+        self.calls.append('teardown')
+
+
+class TestProfiledDoFn:
+    """Test cases for ProfiledDoFn."""
+
+    def test_outputs_pass_through_unsampled(self):
+        """Test outputs are unchanged and untimed when not sampled."""
+        dofn = ProfiledDoFn(RecordingDoFn(), sample_rate=0.0)
+        dofn.cpu_time_ns = Mock()
+
+        results = list(dofn.process(3))
+
+        assert results[0] == 6
+        assert results[1].tag == 'extra'
+        dofn.cpu_time_ns.update.assert_not_called()
+
+    def test_sampled_element_is_timed(self):
+        """Test sampled elements update both timing distributions."""
+        dofn = ProfiledDoFn(RecordingDoFn(), sample_rate=1.0)
+        dofn.cpu_time_ns = Mock()
+        dofn.wall_time_ns = Mock()
+
+        results = list(dofn.process(3))
+
+        assert results[0] == 6
+        dofn.cpu_time_ns.update.assert_called_once()
+        dofn.wall_time_ns.update.assert_called_once()
+        assert dofn.wall_time_ns.update.call_args[0][0] >= 0
+
+    @patch('pipelines.utils.profiling.random.random', return_value=0.5)
+    def test_sample_rate(self, mock_random):
+        """Test elements are sampled below the configured rate."""
+        dofn = ProfiledDoFn(RecordingDoFn(), sample_rate=0.25)
+        dofn.wall_time_ns = Mock()
+
+        list(dofn.process(1))
+
+        dofn.wall_time_ns.update.assert_not_called()
+
+    def test_lifecycle_delegation(self):
+        """Test lifecycle methods are forwarded to the wrapped DoFn."""
+        inner = RecordingDoFn()
+        dofn = ProfiledDoFn(inner)
+
+        dofn.setup()
+        dofn.start_bundle()
+        dofn.finish_bundle()
+        dofn.teardown()
+
+        assert inner.calls == ['setup', 'start_bundle', 'finish_bundle', 'teardown']
+
+    def test_process_returning_none(self):
+        """Test wrapped DoFns whose process returns None produce no output."""
+        inner = Mock()
+        inner.process.return_value = None
+
+        assert list(ProfiledDoFn(inner, sample_rate=1.0).process(1)) == []
+        assert list(ProfiledDoFn(inner, sample_rate=0.0).process(1)) == []
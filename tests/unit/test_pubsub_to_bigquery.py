@@ -0,0 +1,238 @@
+"""
+Unit tests for the Pub/Sub to BigQuery Pipeline.
+
+This module tests the fused ProcessMessage DoFn, covering the valid main
+output and the failed, invalid and error side outputs, and the Storage
+Write API configuration of the BigQuery write transform.
+"""
+
+import json
+
+import apache_beam as beam
+from apache_beam.io.gcp import bigquery
+from apache_beam.io.gcp.bigquery import StorageWriteToBigQuery
+from apache_beam.options.pipeline_options import (
+    DebugOptions,
+    GoogleCloudOptions,
+    SetupOptions,
+    StandardOptions,
+)
+from apache_beam.pvalue import TaggedOutput
+from apache_beam.testing.util import assert_that, equal_to
+from apache_beam.utils.timestamp import Timestamp
+
+from pipelines.basic_pubsub_to_bigquery import (
+    ProcessMessage,
+    WriteToBigQuery,
+    build_pipeline_options,
+)
+
+
+def _process(element: bytes) -> list:
+    """Run ProcessMessage over a single element and collect its outputs."""
+    return list(ProcessMessage().process(element))
+
+
+class TestProcessMessage:
+    """Test cases for ProcessMessage DoFn."""
+
+    def test_valid_message(self):
+        """Test a complete message goes to the main output."""
+        message = json.dumps({
+            'event_id': 'evt-1',
+            'event_type': 'page_view',
+            'timestamp': '2024-01-15T10:30:00Z',
+            'source': 'web',
+            'data': {'page': '/home', 'items': [1, 2]}
+        }).encode('utf-8')
+
+        results = _process(message)
+
+        assert len(results) == 1
+        row = results[0]
+        assert not isinstance(row, TaggedOutput)
+        assert row['event_id'] == 'evt-1'
+        assert row['quality_score'] == 1.0
+        assert row['timestamp'] == Timestamp.from_rfc3339('2024-01-15T10:30:00Z')
+        assert isinstance(row['ingestion_time'], Timestamp)
+        assert isinstance(row['data'], str)
+        assert json.loads(row['data']) == {'page': '/home', 'items': [1, 2]}
+
+    def test_valid_message_without_data(self):
+        """Test a message without a data payload gets a lower quality score."""
+        message = json.dumps({
+            'event_id': 'evt-2',
+            'event_type': 'heartbeat',
+            'timestamp': '2024-01-15T10:30:00Z'
+        }).encode('utf-8')
+
+        results = _process(message)
+
+        assert len(results) == 1
+        assert results[0]['quality_score'] == 0.8
+
+    def test_missing_required_fields(self):
+        """Test messages missing required fields go to the invalid output."""
+        message = json.dumps({'event_id': 'evt-3', 'data': {'k': 'v'}}).encode('utf-8')
+
+        results = _process(message)
+
+        assert len(results) == 1
+        assert isinstance(results[0], TaggedOutput)
+        assert results[0].tag == 'invalid'
+        assert results[0].value['event_id'] == 'evt-3'
+        assert 'quality_score' not in results[0].value
+
+    def test_malformed_message(self):
+        """Test malformed bytes go to the failed output."""
+        results = _process(b'invalid json {{')
+
+        assert len(results) == 1
+        assert isinstance(results[0], TaggedOutput)
+        assert results[0].tag == 'failed'
+        assert results[0].value['original_message'] == str(b'invalid json {{')
+        assert results[0].value['error']
+
+    def test_non_object_message(self):
+        """Test a JSON body that is not an object goes to the error output."""
+        results = _process(b'5')
+
+        assert len(results) == 1
+        assert isinstance(results[0], TaggedOutput)
+        assert results[0].tag == 'error'
+        assert results[0].value['data'] == 5
+        assert results[0].value['error']
+
+    def test_ingestion_time_shared_within_bundle(self):
+        """Test messages in one bundle share the bundle's ingestion time."""
+        message = json.dumps({
+            'event_id': 'evt-5',
+            'event_type': 'page_view',
+            'timestamp': '2024-01-15T10:30:00Z'
+        }).encode('utf-8')
+
+        dofn = ProcessMessage()
+        dofn.start_bundle()
+        first = list(dofn.process(message))[0]
+        second = list(dofn.process(message))[0]
+
+        assert first['ingestion_time'] == second['ingestion_time']
+
+    def test_invalid_timestamp(self):
+        """Test a timestamp that is not RFC 3339 goes to the error output."""
+        message = json.dumps({
+            'event_id': 'evt-4',
+            'event_type': 'page_view',
+            'timestamp': 'yesterday'
+        }).encode('utf-8')
+
+        results = _process(message)
+
+        assert len(results) == 1
+        assert isinstance(results[0], TaggedOutput)
+        assert results[0].tag == 'error'
+
+
+class _StorageWriteStub(beam.PTransform):
+    """Stand-in for Beam's Java Storage Write API transform.
+
+    Records its arguments and the Beam rows it receives so the Python half
+    of the write can be built and run without the Java expansion service.
+    """
+
+    instances: list = []
+
+    def __init__(self, **kwargs):
+        """Record the external transform's arguments."""
+        super().__init__()
+        self.kwargs = kwargs
+        self.rows = None
+        _StorageWriteStub.instances.append(self)
+
+    def expand(self, pcoll):
+        """Keep the input rows and report no failed rows."""
+        self.rows = pcoll
+        return {
+            StorageWriteToBigQuery.FAILED_ROWS_WITH_ERRORS:
+                pcoll.pipeline | 'No failed rows' >> beam.Create([])
+        }
+
+
+class TestWriteToBigQuery:
+    """Test cases for the WriteToBigQuery transform."""
+
+    @staticmethod
+    def _write(transform: WriteToBigQuery, monkeypatch) -> _StorageWriteStub:
+        """Apply the transform to a processed message in a real pipeline and run it."""
+        monkeypatch.setattr(bigquery, 'SchemaAwareExternalTransform', _StorageWriteStub)
+        monkeypatch.setattr(_StorageWriteStub, 'instances', [])
+        message = json.dumps({
+            'event_id': 'evt-1',
+            'event_type': 'page_view',
+            'timestamp': '2024-01-15T10:30:00Z',
+            'source': 'web',
+            'data': {'page': '/home'}
+        }).encode('utf-8')
+
+        with beam.Pipeline() as pipeline:
+            _ = (
+                pipeline
+                | beam.Create([message])
+                | beam.ParDo(ProcessMessage())
+                | transform
+            )
+            write = _StorageWriteStub.instances[0]
+            assert_that(
+                write.rows | beam.Map(lambda row: (row.event_id, row.data)),
+                equal_to([('evt-1', '{"page":"/home"}')])
+            )
+
+        return write
+
+    def test_uses_storage_write_api(self, monkeypatch):
+        """Test processed rows, including the JSON column, reach the Storage Write API."""
+        write = self._write(WriteToBigQuery('project:dataset.events'), monkeypatch)
+
+        assert write.kwargs['table'] == 'project:dataset.events'
+        assert write.kwargs['use_at_least_once_semantics'] is True
+        assert write.kwargs['triggering_frequency_seconds'] == 5
+        assert write.kwargs['num_streams'] == 0
+        assert write.kwargs['clustering_fields'] == ['event_type']
+
+    def test_stream_count_and_triggering_frequency(self, monkeypatch):
+        """Test stream count and triggering frequency are passed through."""
+        write = self._write(
+            WriteToBigQuery(
+                'project:dataset.events',
+                num_storage_api_streams=4,
+                triggering_frequency=10
+            ),
+            monkeypatch
+        )
+
+        assert write.kwargs['num_streams'] == 4
+        assert write.kwargs['triggering_frequency_seconds'] == 10
+
+
+class TestBuildPipelineOptions:
+    """Test cases for build_pipeline_options function."""
+
+    def test_streaming_defaults(self):
+        """Test streaming mode and Streaming Engine are enabled."""
+        options = build_pipeline_options([])
+
+        assert options.view_as(StandardOptions).streaming is True
+        assert options.view_as(GoogleCloudOptions).enable_streaming_engine is True
+
+    def test_does_not_save_main_session(self):
+        """Test DoFns are pickled with cloudpickle instead of the main session."""
+        options = build_pipeline_options([])
+
+        assert not options.view_as(SetupOptions).save_main_session
+        assert options.view_as(SetupOptions).pickle_library == 'cloudpickle'
+
+    def test_worker_threads_pass_through(self):
+        """Test Beam worker threading flags are passed through."""
+        options = build_pipeline_options(['--number_of_worker_harness_threads=16'])
+
+        assert options.view_as(DebugOptions).number_of_worker_harness_threads == 16
@@ -5,6 +5,7 @@ This module tests individual components of the batch pipeline including
 configuration loading, data extraction, validation, and formatting.
 """
 
+import gzip
 import json
 from datetime import datetime
 from typing import Any
@@ -17,8 +18,10 @@ from pipelines.salesforce_batch_extract import (
     ExtractSalesforceObject,
     FormatForBigQuery,
     SalesforceAPIConfig,
+    ValidateAndFormatRecord,
     ValidateRecord,
     get_bigquery_schema,
+    get_bigquery_table_parameters,
 )
 
 
@@ -113,6 +116,23 @@ class TestExtractSalesforceObject:
             assert results[0]['object_type'] == 'Account'
             assert 'ingestion_timestamp' in results[0]
 
+    def test_session_retry_strategy(
+        self,
+        sample_config_dict: dict[str, Any]
+    ):
+        """Test the session retries transient failures from configuration."""
+        dofn = ExtractSalesforceObject(
+            sample_config_dict,
+            sample_config_dict['objects'][0]
+        )
+
+        dofn.setup()
+        retries = dofn.session.get_adapter('http://localhost:8080').max_retries
+        dofn.teardown()
+
+        assert retries.total == sample_config_dict['api']['max_retries']
+        assert 503 in retries.status_forcelist
+
     def test_api_connection_error(
         self,
         sample_config_dict: dict[str, Any]
@@ -210,6 +230,69 @@ class TestExtractSalesforceObject:
 
             dofn.teardown()
 
+    def test_follows_next_records_url(
+        self,
+        sample_config_dict: dict[str, Any],
+        mock_api_response_accounts: dict[str, Any]
+    ):
+        """Test extraction follows nextRecordsUrl across result pages."""
+        first_page = {
+            'records': mock_api_response_accounts['records'][:1],
+            'totalSize': 2,
+            'done': False,
+            'nextRecordsUrl': '/api/v1/accounts/page-2'
+        }
+        second_page = {
+            'records': mock_api_response_accounts['records'][1:],
+            'totalSize': 2,
+            'done': True
+        }
+
+        with requests_mock.Mocker() as m:
+            m.get('http://localhost:8080/api/v1/accounts', json=first_page)
+            m.get('http://localhost:8080/api/v1/accounts/page-2', json=second_page)
+
+            dofn = ExtractSalesforceObject(
+                sample_config_dict,
+                sample_config_dict['objects'][0]
+            )
+
+            dofn.setup()
+            results = list(dofn.process('trigger'))
+            dofn.teardown()
+
+            assert [r['id'] for r in results] == [
+                '001000000000001AAA',
+                '001000000000002AAA'
+            ]
+            assert m.call_count == 2
+            assert results[0]['ingestion_timestamp'] == results[1]['ingestion_timestamp']
+
+    def test_gzip_encoded_response(
+        self,
+        sample_config_dict: dict[str, Any],
+        mock_api_response_accounts: dict[str, Any]
+    ):
+        """Test gzip-encoded API responses are decompressed and parsed."""
+        with requests_mock.Mocker() as m:
+            m.get(
+                'http://localhost:8080/api/v1/accounts',
+                content=gzip.compress(json.dumps(mock_api_response_accounts).encode('utf-8')),
+                headers={'Content-Encoding': 'gzip'}
+            )
+
+            dofn = ExtractSalesforceObject(
+                sample_config_dict,
+                sample_config_dict['objects'][0]
+            )
+
+            dofn.setup()
+            results = list(dofn.process('trigger'))
+            dofn.teardown()
+
+            assert len(results) == 2
+            assert results[0]['id'] == '001000000000001AAA'
+
     def test_metadata_addition(
         self,
         sample_config_dict: dict[str, Any],
@@ -392,6 +475,71 @@ class TestValidateRecord:
         assert isinstance(record['_validation_errors'], list)
 
 
+    def test_validation_timestamp_shared_within_bundle(self):
+        """Test records in one bundle share the bundle's validation timestamp."""
+        object_config = {
+            'name': 'Account',
+            'primary_key': 'id'
+        }
+
+        dofn = ValidateRecord(object_config, {'check_null_primary_keys': True})
+        dofn.start_bundle()
+        first = list(dofn.process({'id': '001'}))[0]
+        second = list(dofn.process({'id': '002'}))[0]
+
+        assert first['_validation_timestamp'] == second['_validation_timestamp']
+
+    def test_validation_rules_as_list(self):
+        """Test rules given as a list of mappings, as in the YAML config."""
+        record = {
+            'id': None,
+            'created_date': 'not-a-timestamp'
+        }
+
+        object_config = {
+            'name': 'Account',
+            'primary_key': 'id'
+        }
+
+        validation_rules = [
+            {'check_null_primary_keys': True},
+            {'check_duplicate_ids': True},
+            {'validate_timestamps': True}
+        ]
+
+        dofn = ValidateRecord(object_config, validation_rules)
+        record = list(dofn.process(record))[0]
+
+        assert record['_is_valid'] is False
+        assert record['_validation_errors'] == [
+            'Null primary key: id',
+            'Invalid timestamp format: created_date'
+        ]
+
+    def test_disabled_rules_skip_checks(self):
+        """Test disabled rules do not report errors."""
+        record = {
+            'id': None,
+            'created_date': 'not-a-timestamp'
+        }
+
+        object_config = {
+            'name': 'Account',
+            'primary_key': 'id'
+        }
+
+        validation_rules = {
+            'check_null_primary_keys': False,
+            'validate_timestamps': False
+        }
+
+        dofn = ValidateRecord(object_config, validation_rules)
+        record = list(dofn.process(record))[0]
+
+        assert record['_is_valid'] is True
+        assert record['_validation_errors'] == []
+
+
 class TestFormatForBigQuery:
     """Test cases for FormatForBigQuery DoFn."""
 
@@ -473,6 +621,103 @@ class TestFormatForBigQuery:
         formatted = results[0]
         assert formatted['optional_field'] is None
 
+    def test_convert_nested_payload_edge_cases(self):
+        """Test nested payloads with non-str keys and large integers."""
+        record = {
+            'id': '001000000000001AAA',
+            'metadata': {
+                'counts': {1: 'one', 2: 'two'},
+                'big_number': 2 ** 70,
+                'items': [{'sku': 'A-1', 'qty': 3}]
+            }
+        }
+
+        dofn = FormatForBigQuery()
+        formatted = list(dofn.process(record))[0]
+
+        assert isinstance(formatted['metadata'], str)
+        assert json.loads(formatted['metadata']) == {
+            'counts': {'1': 'one', '2': 'two'},
+            'big_number': 2 ** 70,
+            'items': [{'sku': 'A-1', 'qty': 3}]
+        }
+
+
+class TestValidateAndFormatRecord:
+    """Test cases for fused ValidateAndFormatRecord DoFn."""
+
+    def test_validates_and_formats_record(self):
+        """Test record is validated and nested values are JSON-encoded."""
+        record = {
+            'id': '001000000000001AAA',
+            'created_date': '2023-01-15T10:30:00Z',
+            'address': {'city': 'San Francisco'}
+        }
+
+        object_config = {
+            'name': 'Account',
+            'primary_key': 'id'
+        }
+
+        validation_rules = {
+            'check_null_primary_keys': True,
+            'validate_timestamps': True
+        }
+
+        dofn = ValidateAndFormatRecord(object_config, validation_rules)
+        results = list(dofn.process(record))
+
+        assert len(results) == 1
+        formatted = results[0]
+
+        assert formatted['_is_valid'] is True
+        assert '_validation_timestamp' in formatted
+        assert json.loads(formatted['address']) == {'city': 'San Francisco'}
+
+    def test_formats_record_in_place(self):
+        """Test the fused DoFn yields the input record rather than a copy."""
+        record = {
+            'id': '001000000000001AAA',
+            'tags': ['a', 'b']
+        }
+
+        dofn = ValidateAndFormatRecord(
+            {'name': 'Account', 'primary_key': 'id'},
+            {'check_null_primary_keys': True}
+        )
+        formatted = list(dofn.process(record))[0]
+
+        assert formatted is record
+        assert formatted['tags'] == '["a","b"]'
+
+    def test_matches_separate_validate_and_format(self):
+        """Test fused DoFn produces the same output as the two-step chain."""
+        object_config = {
+            'name': 'Account',
+            'primary_key': 'id'
+        }
+
+        validation_rules = {
+            'check_null_primary_keys': True,
+            'validate_timestamps': True
+        }
+
+        def make_record():
+            return {
+                'id': None,
+                'created_date': 'invalid-timestamp',
+                'tags': ['a', 'b']
+            }
+
+        fused = list(ValidateAndFormatRecord(object_config, validation_rules).process(make_record()))[0]
+
+        validated = list(ValidateRecord(object_config, validation_rules).process(make_record()))[0]
+        chained = list(FormatForBigQuery().process(validated))[0]
+
+        fused.pop('_validation_timestamp')
+        chained.pop('_validation_timestamp')
+        assert fused == chained
+
 
 class TestGetBigQuerySchema:
     """Test cases for get_bigquery_schema function."""
@@ -548,6 +793,11 @@ class TestGetBigQuerySchema:
         assert 'id' in field_names
         assert 'ingestion_timestamp' in field_names
 
+    def test_schema_is_cached(self):
+        """Test schemas are built once and reused across calls."""
+        assert get_bigquery_schema('Account') is get_bigquery_schema('Account')
+        assert get_bigquery_schema('Unknown1') is get_bigquery_schema('Unknown2')
+
     def test_schema_field_types(self):
         """Test that schema fields have correct types."""
         schema = get_bigquery_schema('Account')
@@ -560,3 +810,24 @@ class TestGetBigQuerySchema:
         assert fields['created_date']['type'] == 'TIMESTAMP'
         assert fields['_is_valid']['type'] == 'BOOLEAN'
         assert fields['_validation_errors']['mode'] == 'REPEATED'
+
+
+class TestGetBigQueryTableParameters:
+    """Test cases for get_bigquery_table_parameters function."""
+
+    @pytest.mark.parametrize('object_name,clustering_fields', [
+        ('Account', ['id', 'type']),
+        ('Contact', ['id', 'account_id']),
+        ('Opportunity', ['id', 'account_id', 'stage_name']),
+        ('Case', ['id', 'account_id', 'status']),
+    ])
+    def test_matches_provisioned_clustering(self, object_name, clustering_fields):
+        """Test each object's table is clustered as in the Terraform definition."""
+        parameters = get_bigquery_table_parameters(object_name)
+
+        assert parameters['clustering'] == {'fields': clustering_fields}
+        assert parameters['timePartitioning'] == {'type': 'DAY', 'field': 'ingestion_timestamp'}
+
+    def test_unknown_object_clusters_on_id(self):
+        """Test unknown objects fall back to clustering on id."""
+        assert get_bigquery_table_parameters('UnknownObject')['clustering'] == {'fields': ['id']}
@@ -0,0 +1,364 @@
+"""
+Unit tests for Salesforce CDC Streaming Pipeline.
+
+This module tests individual DoFns of the CDC streaming pipeline.
+"""
+
+import json
+from typing import Any
+from unittest.mock import Mock, patch
+
+import pytest
+
+import pipelines.salesforce_streaming_cdc as cdc_pipeline
+from pipelines.salesforce_streaming_cdc import (
+    ParseValidateExtract,
+    ProcessSCDType2Changes,
+    PublishDataQualityAlerts,
+    PublishDeadLetters,
+    build_alert,
+    build_dead_letter,
+    extract_record,
+)
+
+ALERTS_TOPIC = 'projects/test-project/topics/cdc-alerts'
+
+
+@pytest.fixture
+def invalid_cdc_event(sample_cdc_insert_event: dict[str, Any]) -> dict[str, Any]:
+    """CDC event that failed validation."""
+    event = dict(sample_cdc_insert_event)
+    event['_validation_errors'] = ['Missing required field: record_id']
+    return event
+
+
+class TestExtractRecord:
+    """Test cases for extract_record function."""
+
+    def test_insert_event(self, sample_cdc_insert_event: dict[str, Any]):
+        """Test INSERT events use the after image plus CDC metadata."""
+        record = extract_record(sample_cdc_insert_event)
+
+        assert record['id'] == sample_cdc_insert_event['after']['id']
+        assert record['source'] == 'salesforce_cdc'
+        assert record['_cdc_event_id'] == sample_cdc_insert_event['event_id']
+        assert record['_cdc_event_type'] == 'INSERT'
+        assert 'ingestion_timestamp' in record
+
+    def test_complex_fields_serialized(self, sample_cdc_insert_event: dict[str, Any]):
+        """Test nested values are JSON-encoded without touching the event."""
+        event = dict(sample_cdc_insert_event)
+        event['after'] = dict(event['after'], billing_address={'city': 'Austin'}, tags=['a'])
+
+        record = extract_record(event)
+
+        assert json.loads(record['billing_address']) == {'city': 'Austin'}
+        assert json.loads(record['tags']) == ['a']
+        assert event['after']['billing_address'] == {'city': 'Austin'}
+
+    def test_delete_event_uses_before_image(self, sample_cdc_insert_event: dict[str, Any]):
+        """Test DELETE events use the before image."""
+        event = dict(sample_cdc_insert_event, event_type='DELETE')
+        event['before'], event['after'] = event['after'], None
+
+        record = extract_record(event)
+
+        assert record['id'] == sample_cdc_insert_event['after']['id']
+        assert record['_cdc_event_type'] == 'DELETE'
+
+    def test_unknown_event_type(self, sample_cdc_insert_event: dict[str, Any]):
+        """Test unknown event types produce no record."""
+        event = dict(sample_cdc_insert_event, event_type='UNDELETE')
+
+        assert extract_record(event) is None
+
+    def test_ingestion_timestamp_passed_through(self, sample_cdc_insert_event: dict[str, Any]):
+        """Test a given ingestion timestamp is used as is."""
+        record = extract_record(sample_cdc_insert_event, '2025-10-30T10:00:00+00:00')
+
+        assert record['ingestion_timestamp'] == '2025-10-30T10:00:00+00:00'
+
+
+class TestParseValidateExtract:
+    """Test cases for the fused ParseValidateExtract DoFn."""
+
+    @staticmethod
+    def _process(dofn: ParseValidateExtract, event: Any) -> list:
+        """Run the DoFn over one encoded message and collect its outputs."""
+        dofn.setup()
+        dofn.start_bundle()
+        message = event if isinstance(event, bytes) else json.dumps(event).encode('utf-8')
+        return list(dofn.process(message))
+
+    def test_valid_event_emits_record(self, sample_cdc_insert_event: dict[str, Any]):
+        """Test a valid event is emitted as a record tagged by object type."""
+        results = self._process(ParseValidateExtract(), sample_cdc_insert_event)
+
+        assert len(results) == 1
+        assert results[0].tag == 'Account'
+        record = results[0].value
+        assert record['id'] == sample_cdc_insert_event['after']['id']
+        assert record['_cdc_event_id'] == sample_cdc_insert_event['event_id']
+        assert record['source'] == 'salesforce_cdc'
+
+    def test_ingestion_timestamp_shared_within_bundle(
+        self,
+        sample_cdc_insert_event: dict[str, Any]
+    ):
+        """Test records in one bundle share the bundle's ingestion timestamp."""
+        dofn = ParseValidateExtract()
+        first = self._process(dofn, sample_cdc_insert_event)[0].value
+        second = list(dofn.process(json.dumps(sample_cdc_insert_event).encode('utf-8')))[0].value
+
+        assert first['ingestion_timestamp'] == dofn._bundle_timestamp
+        assert second['ingestion_timestamp'] == dofn._bundle_timestamp
+
+    def test_history_event_emitted_for_tracked_objects(
+        self,
+        sample_cdc_insert_event: dict[str, Any]
+    ):
+        """Test tracked object types also emit the event for SCD Type 2."""
+        dofn = ParseValidateExtract(history_object_types=('Account',))
+
+        results = self._process(dofn, sample_cdc_insert_event)
+
+        assert [r.tag for r in results] == ['Account', 'Account_history']
+        assert results[1].value['event_id'] == sample_cdc_insert_event['event_id']
+
+    def test_invalid_event(self, invalid_cdc_event: dict[str, Any]):
+        """Test events failing validation go to the invalid output."""
+        event = dict(invalid_cdc_event, record_id=None)
+        event.pop('_validation_errors')
+
+        results = self._process(ParseValidateExtract(), event)
+
+        assert len(results) == 1
+        assert results[0].tag == 'invalid'
+        assert results[0].value['_validation_errors']
+        assert '_validation_timestamp' in results[0].value
+
+    def test_invalid_event_early_exit(self, invalid_cdc_event: dict[str, Any]):
+        """Test early exit attaches only the first validation error."""
+        event = dict(invalid_cdc_event, record_id=None, event_timestamp=None)
+        event.pop('_validation_errors')
+
+        results = self._process(ParseValidateExtract(early_exit=True), event)
+
+        assert results[0].tag == 'invalid'
+        assert results[0].value['_validation_errors'] == ['Missing required field: record_id']
+
+    def test_malformed_message(self):
+        """Test malformed JSON produces no output."""
+        assert self._process(ParseValidateExtract(), b'invalid json {{') == []
+
+
+class TestBuildAlert:
+    """Test cases for build_alert function."""
+
+    def test_alert_payload(self, invalid_cdc_event: dict[str, Any]):
+        """Test alerts carry the event and its validation errors."""
+        alert = build_alert(invalid_cdc_event)
+
+        assert alert['alert_type'] == 'data_quality_violation'
+        assert alert['event_id'] == invalid_cdc_event['event_id']
+        assert alert['validation_errors'] == ['Missing required field: record_id']
+        assert alert['event_data'] is invalid_cdc_event
+
+    def test_alert_timestamp_passed_through(self, invalid_cdc_event: dict[str, Any]):
+        """Test a given alert timestamp is used as is."""
+        alert = build_alert(invalid_cdc_event, '2025-10-30T10:00:00+00:00')
+
+        assert alert['timestamp'] == '2025-10-30T10:00:00+00:00'
+
+
+class TestPublishDataQualityAlerts:
+    """Test cases for PublishDataQualityAlerts DoFn."""
+
+    @patch('pipelines.salesforce_streaming_cdc.pubsub_v1.PublisherClient')
+    def test_publishes_alerts_and_waits_at_bundle_end(
+        self,
+        mock_publisher_class,
+        invalid_cdc_event: dict[str, Any]
+    ):
+        """Test alerts are queued per element and awaited in finish_bundle."""
+        mock_client = Mock()
+        mock_future = Mock()
+        mock_client.publish.return_value = mock_future
+        mock_publisher_class.return_value = mock_client
+
+        dofn = PublishDataQualityAlerts(ALERTS_TOPIC, max_latency=0.05)
+        dofn.setup()
+        dofn.start_bundle()
+        dofn.process(invalid_cdc_event)
+        dofn.process(invalid_cdc_event)
+
+        assert mock_client.publish.call_count == 2
+        topic, data = mock_client.publish.call_args[0]
+        assert topic == ALERTS_TOPIC
+        assert json.loads(data)['event_id'] == invalid_cdc_event['event_id']
+        mock_future.result.assert_not_called()
+
+        dofn.finish_bundle()
+
+        assert mock_future.result.call_count == 2
+
+        dofn.teardown()
+        mock_client.stop.assert_called_once()
+
+    @patch('pipelines.salesforce_streaming_cdc.pubsub_v1.PublisherClient')
+    def test_batch_settings(self, mock_publisher_class):
+        """Test the publisher client is created with the batch settings."""
+        dofn = PublishDataQualityAlerts(
+            ALERTS_TOPIC,
+            max_messages=500,
+            max_bytes=2048,
+            max_latency=0.05
+        )
+        dofn.setup()
+
+        batch_settings = mock_publisher_class.call_args[0][0]
+        assert batch_settings.max_messages == 500
+        assert batch_settings.max_bytes == 2048
+        assert batch_settings.max_latency == 0.05
+
+    @patch('pipelines.salesforce_streaming_cdc.pubsub_v1.PublisherClient')
+    def test_failed_publish_fails_bundle(
+        self,
+        mock_publisher_class,
+        invalid_cdc_event: dict[str, Any]
+    ):
+        """Test a failed publish raises so the bundle is retried."""
+        mock_client = Mock()
+        mock_future = Mock()
+        mock_future.result.side_effect = RuntimeError('publish failed')
+        mock_client.publish.return_value = mock_future
+        mock_publisher_class.return_value = mock_client
+
+        dofn = PublishDataQualityAlerts(ALERTS_TOPIC)
+        dofn.setup()
+        dofn.start_bundle()
+        dofn.process(invalid_cdc_event)
+
+        with pytest.raises(RuntimeError):
+            dofn.finish_bundle()
+
+
+class TestPublishDeadLetters:
+    """Test cases for PublishDeadLetters DoFn."""
+
+    @patch('pipelines.salesforce_streaming_cdc.pubsub_v1.PublisherClient')
+    def test_publishes_dead_letters(
+        self,
+        mock_publisher_class,
+        sample_cdc_insert_event: dict[str, Any]
+    ):
+        """Test dead letters carry the full event and are awaited at bundle end."""
+        mock_client = Mock()
+        mock_future = Mock()
+        mock_client.publish.return_value = mock_future
+        mock_publisher_class.return_value = mock_client
+
+        dofn = PublishDeadLetters('projects/test-project/topics/cdc-dead-letter')
+        dofn.setup()
+        dofn.start_bundle()
+        dofn.process(sample_cdc_insert_event)
+        dofn.finish_bundle()
+
+        topic, data = mock_client.publish.call_args[0]
+        assert topic == 'projects/test-project/topics/cdc-dead-letter'
+        message = json.loads(data)
+        assert message['error_type'] == 'scd2_history_failure'
+        assert message['event_data'] == sample_cdc_insert_event
+        mock_future.result.assert_called_once()
+
+
+class TestBuildDeadLetter:
+    """Test cases for build_dead_letter function."""
+
+    def test_dead_letter_payload(self, sample_cdc_insert_event: dict[str, Any]):
+        """Test dead letters identify the event and keep it for replay."""
+        message = build_dead_letter(sample_cdc_insert_event, '2025-10-30T10:00:00+00:00')
+
+        assert message['timestamp'] == '2025-10-30T10:00:00+00:00'
+        assert message['event_id'] == sample_cdc_insert_event['event_id']
+        assert message['record_id'] == sample_cdc_insert_event['record_id']
+        assert message['event_data'] is sample_cdc_insert_event
+
+
+class TestProcessSCDType2Changes:
+    """Test cases for ProcessSCDType2Changes DoFn."""
+
+    @patch('google.cloud.bigquery.Client')
+    def test_object_types_share_bigquery_client(self, mock_client_class, monkeypatch):
+        """Test per-object DoFns on a worker share one BigQuery client."""
+        monkeypatch.setattr(cdc_pipeline, '_bigquery_clients', {})
+
+        dofns = [
+            ProcessSCDType2Changes('test-project', 'dataset', f'{name}_history', name)
+            for name in ('Account', 'Contact')
+        ]
+        for dofn in dofns:
+            dofn.setup()
+
+        mock_client_class.assert_called_once_with(project='test-project')
+        assert dofns[0].handler.client is dofns[1].handler.client
+
+    @patch('google.cloud.bigquery.Client')
+    def test_processes_grouped_events(
+        self,
+        mock_client_class,
+        monkeypatch,
+        sample_cdc_insert_event: dict[str, Any]
+    ):
+        """Test an object type's grouped window is handed to the handler as a list."""
+        monkeypatch.setattr(cdc_pipeline, '_bigquery_clients', {})
+        dofn = ProcessSCDType2Changes('test-project', 'dataset', 'accounts_history', 'Account')
+        dofn.setup()
+        dofn.handler = Mock()
+        dofn.handler.process_hourly_changes.return_value = {'total_events': 1, 'failed_record_ids': []}
+
+        results = list(dofn.process(('Account', iter([sample_cdc_insert_event]))))
+
+        assert results == [{'total_events': 1, 'failed_record_ids': []}]
+        dofn.handler.process_hourly_changes.assert_called_once_with(
+            object_type='Account',
+            events=[sample_cdc_insert_event]
+        )
+
+    @patch('google.cloud.bigquery.Client')
+    def test_failed_records_go_to_dead_letter(
+        self,
+        mock_client_class,
+        monkeypatch,
+        sample_cdc_insert_event: dict[str, Any]
+    ):
+        """Test events of records whose history was not applied are dead-lettered."""
+        monkeypatch.setattr(cdc_pipeline, '_bigquery_clients', {})
+        other_event = dict(sample_cdc_insert_event, record_id='001OTHER000000000A')
+        dofn = ProcessSCDType2Changes('test-project', 'dataset', 'accounts_history', 'Account')
+        dofn.setup()
+        dofn.handler = Mock()
+        dofn.handler.process_hourly_changes.return_value = {
+            'total_events': 2,
+            'failed_record_ids': [sample_cdc_insert_event['record_id']]
+        }
+
+        results = list(dofn.process(('Account', [sample_cdc_insert_event, other_event])))
+
+        assert results[0]['total_events'] == 2
+        dead_letters = [r for r in results[1:] if r.tag == 'dead_letter']
+        assert [r.value for r in dead_letters] == [sample_cdc_insert_event]
+
+    @patch('google.cloud.bigquery.Client')
+    def test_handler_gets_retry_settings(self, mock_client_class, monkeypatch):
+        """Test the handler retries history MERGEs with the configured settings."""
+        monkeypatch.setattr(cdc_pipeline, '_bigquery_clients', {})
+        dofn = ProcessSCDType2Changes(
+            'test-project', 'dataset', 'accounts_history', 'Account',
+            max_retry_attempts=5,
+            retry_delay_seconds=2
+        )
+        dofn.setup()
+
+        assert dofn.handler.max_retry_attempts == 5
+        assert dofn.handler.retry_delay_seconds == 2
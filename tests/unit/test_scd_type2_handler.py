@@ -6,7 +6,8 @@ pattern for history tracking of CDC events.
 """
 
 import json
-from unittest.mock import Mock
+from datetime import datetime, timezone
+from unittest.mock import Mock, patch
 
 from pipelines.utils.scd_type2_handler import SCDType2Handler
 
@@ -126,6 +127,18 @@ class TestChangeDetection:
         assert changes['has_changes'] is False
         assert len(changes['changed_fields']) == 0
 
+    def test_detect_changes_tracked_fields(self):
+        """Test only tracked fields are compared."""
+        mock_client = Mock()
+        handler = SCDType2Handler(mock_client, 'test-project', 'test_dataset')
+
+        before = {'id': '001ABC', 'name': 'Acme', 'phone': '555-0100', 'system_modstamp': 'a'}
+        after = {'id': '001ABC', 'name': 'Acme Corp', 'phone': '555-0199', 'system_modstamp': 'b'}
+
+        changes = handler.detect_changes(before, after, tracked_fields=['name', 'system_modstamp'])
+
+        assert changes['changed_fields'] == ['name']
+
     def test_detect_changes_ignores_metadata(self):
         """Test metadata fields are ignored."""
         mock_client = Mock()
@@ -302,6 +315,94 @@ class TestCloseCurrentRecord:
         assert success is False
 
 
+class TestCloseCurrentRecords:
+    """Test batched closing of current records."""
+
+    def test_close_current_records_single_merge(self):
+        """Test all records are closed by one MERGE, keeping each record's first valid_to."""
+        mock_client = Mock()
+        mock_job = Mock()
+        mock_job.result.return_value = None
+        mock_client.query.return_value = mock_job
+
+        handler = SCDType2Handler(mock_client, 'test-project', 'test_dataset')
+
+        success = handler.close_current_records('Account', [
+            {'record_id': '001ABC', 'valid_to': '2025-10-30T11:00:00Z'},
+            {'record_id': '001XYZ', 'valid_to': '2025-10-30T11:30:00Z'},
+            {'record_id': '001ABC', 'valid_to': '2025-10-30T12:00:00Z'},
+        ])
+
+        assert success is True
+        mock_client.query.assert_called_once()
+        assert 'MERGE' in mock_client.query.call_args[0][0]
+        records = mock_client.query.call_args[1]['job_config'].query_parameters[0].values
+        assert [record.struct_values for record in records] == [
+            {'record_id': '001ABC', 'valid_to': datetime(2025, 10, 30, 11, 0, tzinfo=timezone.utc)},
+            {'record_id': '001XYZ', 'valid_to': datetime(2025, 10, 30, 11, 30, tzinfo=timezone.utc)},
+        ]
+
+    def test_close_current_records_empty(self):
+        """Test no query is run without records to close."""
+        mock_client = Mock()
+
+        handler = SCDType2Handler(mock_client, 'test-project', 'test_dataset')
+
+        assert handler.close_current_records('Account', []) is True
+        mock_client.query.assert_not_called()
+
+    def test_close_current_records_failure(self):
+        """Test handling failure when closing records."""
+        mock_client = Mock()
+        mock_client.query.side_effect = Exception("Merge failed")
+
+        handler = SCDType2Handler(mock_client, 'test-project', 'test_dataset')
+
+        success = handler.close_current_records('Account', [
+            {'record_id': '001ABC', 'valid_to': '2025-10-30T11:00:00Z'}
+        ])
+
+        assert success is False
+
+
+class TestGetCurrentRecordIds:
+    """Test batched current record lookup."""
+
+    def test_get_current_record_ids(self):
+        """Test all record IDs are looked up in a single query."""
+        mock_client = Mock()
+        mock_job = Mock()
+        mock_job.result.return_value = [{'id': '001ABC'}]
+        mock_client.query.return_value = mock_job
+
+        handler = SCDType2Handler(mock_client, 'test-project', 'test_dataset')
+
+        current_ids = handler.get_current_record_ids('Account', ['001ABC', '001XYZ'])
+
+        assert current_ids == {'001ABC'}
+        mock_client.query.assert_called_once()
+        job_config = mock_client.query.call_args[1]['job_config']
+        assert job_config.query_parameters[0].values == ['001ABC', '001XYZ']
+
+    def test_get_current_record_ids_empty(self):
+        """Test no query is run without record IDs."""
+        mock_client = Mock()
+
+        handler = SCDType2Handler(mock_client, 'test-project', 'test_dataset')
+
+        assert handler.get_current_record_ids('Account', []) == set()
+        mock_client.query.assert_not_called()
+
+    def test_get_current_record_ids_failure(self):
+        """Test query failures are treated as no current records."""
+        mock_client = Mock()
+        mock_client.query.side_effect = Exception("Query failed")
+
+        handler = SCDType2Handler(mock_client, 'test-project', 'test_dataset')
+
+        assert handler.get_current_record_ids('Account', ['001ABC']) == set()
+
+
 class TestInsertHistoryRecords:
     """Test inserting history records."""
 
@@ -346,6 +447,165 @@ class TestInsertHistoryRecords:
 
         assert success is False
 
+    def test_insert_history_records_large_batch_uses_load_job(self):
+        """Test large batches are written with one NDJSON load job."""
+        mock_client = Mock()
+        handler = SCDType2Handler(mock_client, 'test-project', 'test_dataset')
+
+        records = [
+            handler.create_history_record(
+                record_id=f'001{i:015d}',
+                record_data={'id': f'001{i:015d}', 'name': 'Acme'},
+                valid_from='2025-10-30T10:00:00Z',
+                change_type='UPDATE',
+                changed_fields=['name']
+            )
+            for i in range(SCDType2Handler.LOAD_JOB_MIN_ROWS)
+        ]
+
+        success = handler.insert_history_records('Account', records)
+
+        assert success is True
+        mock_client.insert_rows_json.assert_not_called()
+        source, table_id = mock_client.load_table_from_file.call_args[0]
+        assert table_id == 'test-project.test_dataset.account_history'
+
+        lines = source.getvalue().split(b'\n')
+        assert len(lines) == len(records)
+        first = json.loads(lines[0])
+        assert first['id'] == records[0]['id']
+        # JSON columns are loaded as nested values, not JSON text
+        assert first['record_data'] == {'id': records[0]['id'], 'name': 'Acme'}
+        assert first['changed_fields'] == ['name']
+
+    def test_insert_history_records_load_job_failure(self):
+        """Test a failed load job is reported as a failed insert."""
+        mock_client = Mock()
+        mock_client.load_table_from_file.return_value.result.side_effect = Exception("Load failed")
+
+        handler = SCDType2Handler(mock_client, 'test-project', 'test_dataset')
+
+        records = [{'id': '001ABC'}] * SCDType2Handler.LOAD_JOB_MIN_ROWS
+
+        assert handler.insert_history_records('Account', records) is False
+
+
+class TestApplyHistoryChanges:
+    """Test fused closing and inserting of history records."""
+
+    CLOSES = [{'record_id': '001ABC', 'valid_to': '2025-10-30T11:00:00Z'}]
+    NEW_RECORDS = [{'id': '001ABC', 'valid_from': '2025-10-30T11:00:00Z', 'record_data': '{}'}]
+
+    @staticmethod
+    def _client() -> Mock:
+        """Mock client whose history table has an empty schema."""
+        mock_client = Mock()
+        mock_client.get_table.return_value.schema = []
+        return mock_client
+
+    def test_closes_and_inserts_in_one_merge(self):
+        """Test new versions are staged and merged with the closes in one statement."""
+        mock_client = self._client()
+        handler = SCDType2Handler(mock_client, 'test-project', 'test_dataset')
+
+        success = handler.apply_history_changes('Account', self.CLOSES, self.NEW_RECORDS)
+
+        assert success is True
+        staging_id = mock_client.load_table_from_file.call_args[0][1]
+        assert staging_id.startswith('test-project.test_dataset.account_history_staging_')
+        staging = mock_client.create_table.call_args[0][0]
+        assert f'{staging.project}.{staging.dataset_id}.{staging.table_id}' == staging_id
+        mock_client.query.assert_called_once()
+        query = mock_client.query.call_args[0][0]
+        assert 'MERGE' in query and staging_id in query
+        mock_client.insert_rows_json.assert_not_called()
+        mock_client.delete_table.assert_called_once_with(staging_id, not_found_ok=True)
+
+    def test_failed_load_skips_merge(self):
+        """Test nothing is merged when staging fails, and the staging table is dropped."""
+        mock_client = self._client()
+        mock_client.load_table_from_file.return_value.result.side_effect = Exception("Load failed")
+        handler = SCDType2Handler(mock_client, 'test-project', 'test_dataset')
+
+        success = handler.apply_history_changes('Account', self.CLOSES, self.NEW_RECORDS)
+
+        assert success is False
+        mock_client.query.assert_not_called()
+        mock_client.delete_table.assert_called_once()
+
+    def test_closes_only(self):
+        """Test batches without new versions only run the close MERGE."""
+        mock_client = self._client()
+        handler = SCDType2Handler(mock_client, 'test-project', 'test_dataset')
+
+        assert handler.apply_history_changes('Account', self.CLOSES, []) is True
+        mock_client.query.assert_called_once()
+        mock_client.create_table.assert_not_called()
+
+    def test_new_records_only(self):
+        """Test batches without closes insert directly into the history table."""
+        mock_client = self._client()
+        mock_client.insert_rows_json.return_value = []
+        handler = SCDType2Handler(mock_client, 'test-project', 'test_dataset')
+
+        assert handler.apply_history_changes('Account', [], self.NEW_RECORDS) is True
+        mock_client.insert_rows_json.assert_called_once()
+        mock_client.query.assert_not_called()
+
+
+class TestConcurrentUpdateRetries:
+    """Test retries of history DML aborted by concurrent updates."""
+
+    CLOSES = [{'record_id': '001ABC', 'valid_to': '2025-10-30T11:00:00Z'}]
+    CONCURRENT_UPDATE = Exception(
+        "Could not serialize access to table account_history due to concurrent update"
+    )
+
+    @patch('pipelines.utils.scd_type2_handler.time.sleep')
+    def test_retries_concurrent_update(self, mock_sleep):
+        """Test a MERGE aborted by a concurrent update is retried with backoff."""
+        mock_client = Mock()
+        mock_client.query.return_value.result.side_effect = [self.CONCURRENT_UPDATE, []]
+        handler = SCDType2Handler(mock_client, 'test-project', 'test_dataset', retry_delay_seconds=2)
+
+        assert handler.close_current_records('Account', self.CLOSES) is True
+        assert mock_client.query.call_count == 2
+        mock_sleep.assert_called_once_with(2)
+
+    @patch('pipelines.utils.scd_type2_handler.time.sleep')
+    def test_other_errors_not_retried(self, mock_sleep):
+        """Test errors other than concurrent updates fail at once."""
+        mock_client = Mock()
+        mock_client.query.return_value.result.side_effect = Exception("Table not found")
+        handler = SCDType2Handler(mock_client, 'test-project', 'test_dataset')
+
+        assert handler.close_current_records('Account', self.CLOSES) is False
+        mock_client.query.assert_called_once()
+        mock_sleep.assert_not_called()
+
+    @patch('pipelines.utils.scd_type2_handler.time.sleep')
+    def test_gives_up_after_max_attempts(self, mock_sleep):
+        """Test retries stop after the configured number of attempts."""
+        mock_client = Mock()
+        mock_client.query.return_value.result.side_effect = self.CONCURRENT_UPDATE
+        handler = SCDType2Handler(mock_client, 'test-project', 'test_dataset', max_retry_attempts=2)
+
+        assert handler.close_current_records('Account', self.CLOSES) is False
+        assert mock_client.query.call_count == 3
+        assert [c.args[0] for c in mock_sleep.call_args_list] == [5.0, 10.0]
+
+    def test_failed_apply_reports_record_ids(self, sample_cdc_insert_event):
+        """Test records whose history could not be applied are reported."""
+        mock_client = Mock()
+        mock_client.query.return_value.result.return_value = []
+        handler = SCDType2Handler(mock_client, 'test-project', 'test_dataset')
+
+        with patch.object(SCDType2Handler, 'apply_history_changes', return_value=False):
+            stats = handler.process_hourly_changes([sample_cdc_insert_event], 'Account')
+
+        assert stats['failed_record_ids'] == [sample_cdc_insert_event['record_id']]
+        assert stats['errors'] == 1
+
 
 class TestHourlyBatchProcessing:
     """Test hourly batch processing."""
@@ -436,6 +696,32 @@ class TestHourlyBatchProcessing:
 
         assert stats['errors'] > 0
 
+    def test_process_hourly_changes_shared_ingestion_timestamp(self):
+        """Test history records in one batch share an ingestion timestamp."""
+        mock_client = Mock()
+        mock_client.insert_rows_json.return_value = []
+        mock_job = Mock()
+        mock_job.result.return_value = []
+        mock_client.query.return_value = mock_job
+
+        handler = SCDType2Handler(mock_client, 'test-project', 'test_dataset')
+
+        events = [
+            {
+                'record_id': record_id,
+                'event_type': 'INSERT',
+                'event_timestamp': '2025-10-30T10:00:00Z',
+                'after': {'id': record_id, 'name': 'Test'}
+            }
+            for record_id in ('001ABC', '001XYZ')
+        ]
+
+        handler.process_hourly_changes(events, 'Account')
+
+        records = mock_client.insert_rows_json.call_args[0][1]
+        assert len({record['ingestion_timestamp'] for record in records}) == 1
+        assert all(record['changed_fields'] == '[]' for record in records)
+
     def test_process_hourly_changes_empty_events(self):
         """Test processing empty event list."""
         mock_client = Mock()